@@ -6,360 +6,362 @@ Requirements:
 - SQLAlchemy
 - tkinter (built-in)
 - pymysql
-- Faker (for dummy data generation)
+- Faker (for synthetic data generation: python code.py generate --students N)
+- numpy (optional, for cohort grade analytics)
+- pyarrow (optional, for Parquet export)
+- pytest (for the tests: python -m pytest)
 
 Install dependencies:
 pip install sqlalchemy pymysql faker
+
+This file is the GUI and the command line. The database layer and the queries
+are in the university_records package, next to the command line tools
+(generate, benchmark, advise-indexes, export, batch, serve), which are only
+imported when their command runs.
 """
 
+import time
+STARTED_AT = time.perf_counter()  # for the startup benchmark
+
+import argparse
 import tkinter as tk
-from tkinter import ttk, messagebox, scrolledtext
-from sqlalchemy import (
-    create_engine, Column, Integer, String, Text, Date, DECIMAL,
-    ForeignKey, TIMESTAMP, func, text
+from tkinter import ttk, messagebox, filedialog
+from sqlalchemy import func, text, event
+import itertools
+import json
+import os
+import sys
+
+from university_records.config import (
+    ANALYTICS_SNAPSHOT_FILE, BENCHMARK_REPEATS, BENCHMARK_SCALES, CALL_OVERHEAD_CALLS,
+    EXPORT_FORMATS, EXPORT_TIMEOUT_SECONDS, QUERY_WORKERS, REFERENCE_REFRESH_SECONDS,
+    RESULTS_PAGE_SIZE, SERVICE_HOST, SERVICE_MAX_PENDING, SERVICE_PORT, STREAM_CHUNK_SIZE
 )
-from sqlalchemy.orm import declarative_base, sessionmaker, relationship
-from datetime import datetime, date
-import random
-from faker import Faker
-
-# DATABASE CONFIGURATION - according to your MySQL settings
-DATABASE_CONFIG = {
-    'user': 'root',
-    'password': 'Abcd1234',
-    'host': 'localhost',
-    'database': 'university_records'
-}
-
-# Create database connection string
-DATABASE_URL = (
-    f"mysql+pymysql://{DATABASE_CONFIG['user']}:"
-    f"{DATABASE_CONFIG['password']}@{DATABASE_CONFIG['host']}/"
-    f"{DATABASE_CONFIG['database']}?charset=utf8mb4"
+from university_records.models import (
+    Base, CURRENT_SEMESTER, LEADERBOARD_METRICS, MIGRATION_FALLBACKS, SCHEMA_MIGRATIONS,
+    SCHEMA_VERSION, StudentGrade, backfill_enrollment_terms, backfill_name_search,
+    check_schema_version, migrate_current_grades, rebuild_research_leaderboard
 )
+from university_records.analytics import create_analytics_snapshot
+from university_records.results import ResultSet, result_columns, result_values
+from university_records.queries import DatabaseQueries
+from university_records.database import DatabaseManager, get_database
+from university_records.cache import QUERY_TABLES, QueryCache
+from university_records.instrumentation import QueryInstrumentation
+from university_records.reference import ReferenceDataCache, reference_cache_path
+from university_records.runner import QueryRunner
 
-# Create engine and session
-try:
-    engine = create_engine(DATABASE_URL, echo=False)
-    Session = sessionmaker(bind=engine)
-    Base = declarative_base()
-    print("Database engine created successfully")
-except Exception as e:
-    print(f"Error creating database engine: {e}")
-    engine = None
-    Session = None
-
-# DATABASE MODELS (SQLAlchemy ORM)
-class Department(Base):
-    __tablename__ = 'Departments'
-    Department_ID = Column(Integer, primary_key=True, autoincrement=True)
-    Name = Column(String(100), nullable=False)
-    Faculty = Column(String(100), nullable=False)
-    Research_Areas = Column(Text)
-    created_at = Column(TIMESTAMP, default=datetime.now)
-
-class Program(Base):
-    __tablename__ = 'Programs'
-    Program_ID = Column(Integer, primary_key=True, autoincrement=True)
-    Name = Column(String(150), nullable=False)
-    Degree_awarded = Column(String(100), nullable=False)
-    Program_Duration = Column(Text)
-    Course_Requirements = Column(Text)
-    Enrollment_details = Column(Text)
-    created_at = Column(TIMESTAMP, default=datetime.now)
-
-class Course(Base):
-    __tablename__ = 'Courses'
-    Course_ID = Column(Integer, primary_key=True, autoincrement=True)
-    Course_Code = Column(String(20), nullable=False, unique=True)
-    Name = Column(String(150), nullable=False)
-    Description = Column(Text)
-    Department_ID = Column(Integer, ForeignKey('Departments.Department_ID'))
-    Level = Column(String(20))
-    Credits = Column(Integer, nullable=False)
-    Prerequisites = Column(Text)
-    Schedule = Column(String(100))
-    Material = Column(Text)
-    created_at = Column(TIMESTAMP, default=datetime.now)
-
-class Lecturer(Base):
-    __tablename__ = 'Lecturers'
-    Lecturer_ID = Column(Integer, primary_key=True, autoincrement=True)
-    Name = Column(String(255), nullable=False)
-    Department_ID = Column(Integer, ForeignKey('Departments.Department_ID'))
-    Academic_Qualifications = Column(Text)
-    Expertise = Column(Text)
-    Course_load = Column(Text)
-    Research_interests = Column(Text)
-
-class NonAcademicStaff(Base):
-    __tablename__ = 'Non_academic_staff'
-    Staff_ID = Column(Integer, primary_key=True, autoincrement=True)
-    Name = Column(String(255), nullable=False)
-    Job_Title = Column(String(100))
-    Department_ID = Column(Integer, ForeignKey('Departments.Department_ID'))
-    Employment_type = Column(String(100))
-    Contact_details = Column(Text)
-    Salary = Column(DECIMAL(12, 2))
-    Emergency_contact_info = Column(String(255))
-
-class Student(Base):
-    __tablename__ = 'Students'
-    Student_id = Column(Integer, primary_key=True, autoincrement=True)
-    Name = Column(String(100), nullable=False)
-    Date_of_birth = Column(Date, nullable=False)
-    Contact_info = Column(String(150))
-    Program_id = Column(Integer, ForeignKey('Programs.Program_ID'))
-    Year_of_study = Column(Integer)
-    Current_Grades = Column(Text)
-    Disciplinary_records = Column(Text)
-    Graduation_status = Column(String(20), default='Active')
-    Advisor_id = Column(Integer, ForeignKey('Lecturers.Lecturer_ID'))
-    created_at = Column(TIMESTAMP, default=datetime.now)
-    
-    # relationships
-    program = relationship('Program')
-
-class ResearchProject(Base):
-    __tablename__ = 'Research_Projects'
-    Project_ID = Column(Integer, primary_key=True, autoincrement=True)
-    Title = Column(String(255), nullable=False)
-    Principal_Investigator = Column(Integer, ForeignKey('Lecturers.Lecturer_ID'))
-    Funding_sources = Column(Text)
-    Outcomes = Column(Text)
-
-class CourseEnrollment(Base):
-    __tablename__ = 'Course_Enrollments'
-    Student_id = Column(Integer, ForeignKey('Students.Student_id'), primary_key=True)
-    Course_id = Column(Integer, ForeignKey('Courses.Course_ID'), primary_key=True)
-    Enrollment_date = Column(Date, default=date.today)
-    Semester = Column(String(20))
-    Academic_year = Column(String(10))
-    Status = Column(String(20), default='Enrolled')
-
-class CourseInstructor(Base):
-    __tablename__ = 'Course_Instructors'
-    Course_Instructor_ID = Column(Integer, autoincrement=True, unique=True)
-    Course_ID = Column(Integer, ForeignKey('Courses.Course_ID'), primary_key=True)
-    Lecturer_ID = Column(Integer, ForeignKey('Lecturers.Lecturer_ID'), primary_key=True)
-
-# QUERY FUNCTIONS
-class DatabaseQueries:
-    def __init__(self, session):
-        self.session = session
-
-    def query_1_students_in_course_by_lecturer(self, course_code=None, lecturer_name=None):
-        """Find all students enrolled in a specific course taught by a particular lecturer"""
-        try:
-            query = self.session.query(
-                Student.Name,
-                Student.Contact_info,
-                Course.Course_Code,
-                Course.Name.label('Course_Name'),
-                Lecturer.Name.label('Lecturer_Name')
-            ).join(CourseEnrollment, Student.Student_id == CourseEnrollment.Student_id
-            ).join(Course, CourseEnrollment.Course_id == Course.Course_ID
-            ).join(CourseInstructor, Course.Course_ID == CourseInstructor.Course_ID
-            ).join(Lecturer, CourseInstructor.Lecturer_ID == Lecturer.Lecturer_ID)
-            
-            # work with only one or both parameters
-            conditions = []
-            if course_code:
-                conditions.append(Course.Course_Code == course_code)
-            if lecturer_name:
-                conditions.append(Lecturer.Name.like(f'%{lecturer_name}%'))
-                
-            if conditions:
-                query = query.filter(*conditions)
-                results = query.all()
-                return results
-            else:
-                return []
-                
-        except Exception as e:
-            print(f"Query 1 error: {e}")
-            return []
 
-    def query_2_high_performing_final_year_students(self):
-        """List all students with average grade above 70% who are in their final year"""
-        try:
-            # Directly use SQL query to ensure data accuracy
-            sql = """
-            SELECT s.Name, p.Name as Program, s.Year_of_study, s.Contact_info,
-                   s.Current_Grades
-            FROM Students s
-            JOIN Programs p ON s.Program_id = p.Program_ID
-            WHERE s.Year_of_study = 4
-            """
-            results = self.session.execute(text(sql)).fetchall()
-            
-            high_performers = []
-            for row in results:
-                if row.Current_Grades:
-                    try:
-                        grades = [float(g.strip()) for g in row.Current_Grades.split(',') 
-                                 if g.strip().replace('.', '').isdigit()]
-                        if grades and sum(grades) / len(grades) > 70:
-                            high_performers.append({
-                                'Name': row.Name,
-                                'Program': row.Program,
-                                'Average_Grade': round(sum(grades) / len(grades), 2),
-                                'Year': row.Year_of_study,
-                                'Contact': row.Contact_info
-                            })
-                    except ValueError:
-                        continue
-            
-            # if no results, return test data
-            if not high_performers:
-                high_performers = [
-                    {
-                        'Name': 'John Smith',
-                        'Program': 'Computer Science',
-                        'Average_Grade': 85.5,
-                        'Year': 4,
-                        'Contact': 'john.smith@university.edu'
-                    },
-                    {
-                        'Name': 'Emily Johnson',
-                        'Program': 'Engineering',
-                        'Average_Grade': 78.2,
-                        'Year': 4,
-                        'Contact': 'emily.johnson@university.edu'
-                    }
-                ]
-            
-            return high_performers
-        except Exception as e:
-            print(f"Query 2 error: {e}")
-            # return test data on error
-            return [
-                {
-                    'Name': 'Test Student 1',
-                    'Program': 'Computer Science',
-                    'Average_Grade': 85.5,
-                    'Year': 4,
-                    'Contact': 'test1@university.edu'
-                },
-                {
-                    'Name': 'Test Student 2',
-                    'Program': 'Engineering',
-                    'Average_Grade': 78.2,
-                    'Year': 4,
-                    'Contact': 'test2@university.edu'
-                }
-            ]
-
-    def query_3_students_not_enrolled(self, semester='Fall 2025'):
-        """Identify students who haven't registered for any courses in the current semester"""
-        try:
-            enrolled_students = self.session.query(
-                CourseEnrollment.Student_id
-            ).filter(CourseEnrollment.Semester == semester).distinct().subquery()
-
-            results = self.session.query(
-                Student.Name,
-                Student.Contact_info,
-                Student.Year_of_study,
-                Program.Name.label('Program_Name')
-            ).outerjoin(enrolled_students, Student.Student_id == enrolled_students.c.Student_id
-            ).join(Program, Student.Program_id == Program.Program_ID
-            ).filter(enrolled_students.c.Student_id.is_(None)).all()
-            return results
-        except Exception as e:
-            print(f"Query 3 error: {e}")
-            return []
+# GUI APPLICATION
+class ResultsGrid(tk.Frame):
+    """Paged table view for query results based on ttk.Treeview.
+
+    Only the rows the user has scrolled to are inserted into the Treeview, the
+    next page is added when the scrollbar gets near the bottom. Sorting works
+    on the rows already held in memory, so it never re-runs the query.
+    """
+    def __init__(self, parent, page_size=RESULTS_PAGE_SIZE, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.page_size = page_size
+
+        self.summary_label = tk.Label(self, text="", font=('Arial', 9), fg='black', anchor='w')
+        self.summary_label.pack(fill=tk.X)
+
+        table_frame = tk.Frame(self)
+        table_frame.pack(fill=tk.BOTH, expand=True)
+
+        self.tree = ttk.Treeview(table_frame, show='headings', selectmode='extended')
+        self.vsb = ttk.Scrollbar(table_frame, orient=tk.VERTICAL, command=self.tree.yview)
+        hsb = ttk.Scrollbar(table_frame, orient=tk.HORIZONTAL, command=self.tree.xview)
+        self.tree.configure(yscrollcommand=self._on_yscroll, xscrollcommand=hsb.set)
+
+        self.tree.grid(row=0, column=0, sticky='nsew')
+        self.vsb.grid(row=0, column=1, sticky='ns')
+        hsb.grid(row=1, column=0, sticky='ew')
+        table_frame.rowconfigure(0, weight=1)
+        table_frame.columnconfigure(0, weight=1)
+
+        self._reset()
+
+    def _reset(self):
+        self.columns = []
+        self.rows = ResultSet(())   # every row pulled from the source so far
+        self.source = None          # iterator with rows not pulled yet
+        self.total = None           # row count, if the source knows it
+        self.rendered = 0           # rows inserted into the Treeview
+        self.sort_column = None
+        self.sort_reverse = False
+        self.loading = False        # rows are still arriving through append()
+
+    def clear(self):
+        """Remove all rows and columns"""
+        self.tree.delete(*self.tree.get_children())
+        self.tree['columns'] = ()
+        self.summary_label.config(text="")
+        self._reset()
+
+    def show(self, results):
+        """Display results - a ResultSet, or any iterable of dicts, SQLAlchemy rows or objects"""
+        self.clear()
+        if isinstance(results, ResultSet):
+            # already columnar - page through a view of it instead of copying the rows
+            if not results:
+                self.summary_label.config(text="No results found.")
+                return
+            self._set_columns(list(results.columns))
+            self.rows = results[:]
+            self._render_next_page()
+            return
+        self.total = len(results) if hasattr(results, '__len__') else None
+        self.source = iter(results)
 
-    def query_6_courses_by_department(self, department_name):
-        """List all courses taught by lecturers in a specific department"""
-        try:
-            results = self.session.query(
-                Course.Course_Code,
-                Course.Name.label('Course_Name'),
-                Course.Credits,
-                Lecturer.Name.label('Lecturer_Name'),
-                Department.Name.label('Department')
-            ).join(CourseInstructor, Course.Course_ID == CourseInstructor.Course_ID
-            ).join(Lecturer, CourseInstructor.Lecturer_ID == Lecturer.Lecturer_ID
-            ).join(Department, Lecturer.Department_ID == Department.Department_ID
-            ).filter(Department.Name.like(f'%{department_name}%')).all()
-            return results
-        except Exception as e:
-            print(f"Query 6 error: {e}")
-            return []
+        first = next(self.source, None)
+        if first is None:
+            self.source = None
+            self.summary_label.config(text="No results found.")
+            return
 
-    def query_7_top_research_supervisors(self, limit=10):
-        """Identify lecturers who have supervised the most student research projects"""
-        try:
-            results = self.session.query(
-                Lecturer.Name,
-                Department.Name.label('Department'),
-                func.count(ResearchProject.Project_ID).label('Project_Count')
-            ).join(ResearchProject, Lecturer.Lecturer_ID == ResearchProject.Principal_Investigator
-            ).join(Department, Lecturer.Department_ID == Department.Department_ID
-            ).group_by(Lecturer.Lecturer_ID, Lecturer.Name, Department.Name
-            ).order_by(func.count(ResearchProject.Project_ID).desc()
-            ).limit(limit).all()
-            return results
-        except Exception as e:
-            print(f"Query 7 error: {e}")
-            return []
+        self._set_columns(result_columns(first))
+        self.rows = ResultSet(self.columns, [result_values(first, self.columns)])
+        self._render_next_page()
 
-    def query_10_staff_by_department(self, department_name):
-        """Find all staff members employed in a specific department"""
-        try:
-            results = self.session.query(
-                NonAcademicStaff.Name,
-                NonAcademicStaff.Job_Title,
-                NonAcademicStaff.Employment_type,
-                NonAcademicStaff.Contact_details,
-                Department.Name.label('Department')
-            ).join(Department, NonAcademicStaff.Department_ID == Department.Department_ID
-            ).filter(Department.Name.like(f'%{department_name}%')).all()
-            return results
-        except Exception as e:
-            print(f"Query 10 error: {e}")
-            return []
+    def begin(self):
+        """Start a result that will arrive in chunks through append()"""
+        self.clear()
+        self.loading = True
+        self.summary_label.config(text="Loading...")
 
-    def get_available_courses(self):
-        """Get list of available course codes"""
-        try:
-            results = self.session.query(Course.Course_Code).distinct().all()
-            return [row[0] for row in results]
-        except Exception as e:
-            print(f"Error getting courses: {e}")
-            return ["CS101", "MATH201", "ENG305", "CS499", "LIT102"]  # 返回默認值
+    def append(self, rows):
+        """Add a chunk of streamed rows"""
+        if not rows:
+            return
+        if not self.columns:
+            self._set_columns(result_columns(rows[0]))
+            self.rows = ResultSet(self.columns)
+        self.rows.extend([result_values(row, self.columns) for row in rows])
+
+        # fill the first page straight away, later pages only when scrolled to
+        if self.rendered < self.page_size or float(self.tree.yview()[1]) >= 0.95:
+            self._render_next_page()
+        else:
+            self._update_summary()
+
+    def finish(self):
+        """All chunks have arrived"""
+        self.loading = False
+        if not self.rows:
+            self.summary_label.config(text="No results found.")
+        else:
+            self._update_summary()
+
+    def _set_columns(self, columns):
+        self.columns = columns
+        self.tree['columns'] = self.columns
+        for column in self.columns:
+            self.tree.heading(column, text=column,
+                              command=lambda c=column: self.sort_by(c))
+            self.tree.column(column, width=150, minwidth=60, stretch=True)
+
+    def _pull(self, count=None):
+        """Pull up to count more rows out of the source (all of them if count is None)"""
+        if self.source is None:
+            return
+        rows = list(itertools.islice(self.source, count))
+        if count is None or len(rows) < count:
+            self.source = None
+        self.rows.extend([result_values(row, self.columns) for row in rows])
+
+    def _render_next_page(self):
+        """Insert the next page of rows into the Treeview"""
+        end = self.rendered + self.page_size
+        if end > len(self.rows):
+            self._pull(end - len(self.rows))
+
+        for values in self.rows[self.rendered:end]:
+            self.tree.insert('', tk.END, values=[
+                '' if value is None else value for value in values])
+        self.rendered = min(end, len(self.rows))
+        self._update_summary()
+
+    def _update_summary(self):
+        if self.total is not None:
+            total = self.total
+        elif self.loading:
+            self.summary_label.config(
+                text=f"Loading... {len(self.rows)} result(s) so far, showing {self.rendered}")
+            return
+        elif self.source is None:
+            total = len(self.rows)
+        else:
+            total = None
+
+        if total is None:
+            text = f"Showing {self.rendered} result(s) - scroll for more"
+        elif self.rendered < total:
+            text = f"Found {total} result(s) - showing {self.rendered}, scroll for more"
+        else:
+            text = f"Found {total} result(s)"
+        self.summary_label.config(text=text)
+
+    def _has_more(self):
+        return self.rendered < len(self.rows) or self.source is not None
+
+    def _on_yscroll(self, first, last):
+        self.vsb.set(first, last)
+        # lazily add the next page once the user gets close to the bottom
+        if float(last) >= 0.95 and self._has_more():
+            self.after_idle(self._load_more)
+
+    def _load_more(self):
+        if float(self.tree.yview()[1]) >= 0.95 and self._has_more():
+            self._render_next_page()
+
+    def sort_by(self, column):
+        """Sort on a column in memory - click the same heading again to reverse"""
+        if column not in self.columns:
+            return
+        self.sort_reverse = (not self.sort_reverse) if self.sort_column == column else False
+        self.sort_column = column
+
+        # the whole result is needed to sort correctly
+        self._pull()
+        index = self.columns.index(column)
 
-    def get_available_lecturers(self):
-        """Get list of available lecturer names"""
         try:
-            results = self.session.query(Lecturer.Name).distinct().all()
-            return [row[0] for row in results]
-        except Exception as e:
-            print(f"Error getting lecturers: {e}")
-            return ["Dr. Alan Turing", "Prof. Ada Lovelace", "Dr. Isaac Newton"]  # 返回默認值
+            # empty values always go to the end
+            self.rows = self.rows.sorted_by(column, key=lambda value: (value is None,
+                                                                       '' if value is None else value),
+                                            reverse=self.sort_reverse)
+        except TypeError:
+            # mixed types in one column - compare as text
+            self.rows = self.rows.sorted_by(column, key=str, reverse=self.sort_reverse)
+
+        for col in self.columns:
+            arrow = (' ▼' if self.sort_reverse else ' ▲') if col == column else ''
+            self.tree.heading(col, text=col + arrow)
+
+        # redraw only as many rows as were visible before
+        shown = max(self.rendered, self.page_size)
+        self.tree.delete(*self.tree.get_children())
+        self.rendered = 0
+        while self.rendered < min(shown, len(self.rows)):
+            self._render_next_page()
+
+
+class AutocompleteEntry(tk.Entry):
+    """Entry with a type-ahead dropdown fed by the ReferenceDataCache"""
+    def __init__(self, parent, reference, kind, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.reference = reference
+        self.kind = kind
+        self.popup = None
+        self.listbox = None
+        self.bind('<KeyRelease>', self._on_key)
+        self.bind('<Down>', self._focus_list)
+        self.bind('<Escape>', lambda e: self._hide())
+        self.bind('<FocusOut>', lambda e: self.after(150, self._hide_unless_focused))
+
+    def _on_key(self, event):
+        if event.keysym in ('Down', 'Up', 'Return', 'Escape', 'Tab'):
+            return
+        matches = self.reference.complete(self.kind, self.get())
+        if not matches or matches == [self.get()]:
+            self._hide()
+            return
+        self._show(matches)
+
+    def _show(self, matches):
+        if self.popup is None:
+            self.popup = tk.Toplevel(self)
+            self.popup.overrideredirect(True)
+            self.listbox = tk.Listbox(self.popup, font=self.cget('font'), height=6,
+                                      exportselection=False)
+            self.listbox.pack(fill=tk.BOTH, expand=True)
+            self.listbox.bind('<ButtonRelease-1>', self._select)
+            self.listbox.bind('<Return>', self._select)
+            self.listbox.bind('<Escape>', lambda e: self._hide())
+
+        self.listbox.delete(0, tk.END)
+        for match in matches:
+            self.listbox.insert(tk.END, match)
+        self.listbox.config(height=min(len(matches), 6))
+
+        # sit just below the entry
+        width = max(self.winfo_width(), 200)
+        self.popup.geometry(f"{width}x{min(len(matches), 6) * 18 + 4}"
+                            f"+{self.winfo_rootx()}+{self.winfo_rooty() + self.winfo_height()}")
+        self.popup.lift()
+
+    def _focus_list(self, event):
+        if self.listbox is not None and self.listbox.size():
+            self.listbox.focus_set()
+            self.listbox.selection_clear(0, tk.END)
+            self.listbox.selection_set(0)
+            self.listbox.activate(0)
+        return 'break'
+
+    def _select(self, event):
+        selection = self.listbox.curselection()
+        if selection:
+            self.delete(0, tk.END)
+            self.insert(0, self.listbox.get(selection[0]))
+        self._hide()
+        self.focus_set()
+        self.icursor(tk.END)
+
+    def _hide_unless_focused(self):
+        if self.listbox is None or self.focus_get() is not self.listbox:
+            self._hide()
+
+    def _hide(self):
+        if self.popup is not None:
+            self.popup.destroy()
+            self.popup = None
+            self.listbox = None
+
 
-# GUI APPLICATION
 class UniversityDatabaseGUI:
     def __init__(self, root):
         self.root = root
         self.root.title("University Records Management System - Queries 1,2,3,6,7,10")
         self.root.geometry("1100x650")  # added height for better display
         
-        # Initialize database session
+        # Database access - every query runs on its own short-lived pooled session
         try:
-            self.session = Session()
-            self.queries = DatabaseQueries(self.session)
-            print("Database session created successfully")
+            self.database = get_database()
         except Exception as e:
-            print(f"Error creating database session: {e}")
-            self.session = None
-            self.queries = None
+            print(f"Error creating database engine: {e}")
+            self.database = None
             messagebox.showerror("Database Error", f"Cannot connect to database: {e}")
 
         # Setup GUI
+        self.last_query = None
         self.setup_ui()
 
+        # Background query execution - keeps the window responsive while MySQL works
+        self.runner = None
+        self.instrumentation = None
+        if self.database:
+            # repeated queries with the same parameters are answered from memory
+            self.cache = QueryCache()
+            self.cache.watch(self.database.engine)
+            # timings, row counts and SQL for the diagnostics panel
+            self.instrumentation = QueryInstrumentation()
+            self.instrumentation.watch(*self.database.engines())
+            self.runner = QueryRunner(self.root, self.database, on_status=self.update_status,
+                                      cache=self.cache, instrumentation=self.instrumentation)
+
+        # course codes, lecturers, departments and semesters for autocomplete -
+        # warm start from the local file, then catch up in the background
+        self.reference = ReferenceDataCache(
+            reference_cache_path(self.database.engine.url if self.database else None))
+        self.reference.load_file()
+        self.refresh_reference_data()
+
+        # connection and schema check run after the window is up
+        self.schema_version = None
+        self.check_database()
+
     def setup_ui(self):
         """Setup the user interface"""
         # Main container using grid
@@ -399,7 +401,9 @@ class UniversityDatabaseGUI:
             ("3. Students Not Enrolled This Semester", self.show_query_3_form),
             ("6. Courses by Department", self.show_query_6_form),
             ("7. Top Research Supervisors", self.show_query_7_form),
-            ("10. Staff by Department", self.show_query_10_form)
+            ("10. Staff by Department", self.show_query_10_form),
+            ("Department Dashboard", self.show_dashboard_form),
+            ("Cohort Grade Analytics", self.show_cohort_form)
         ]
 
         for query_text, command in queries_info:
@@ -448,16 +452,9 @@ class UniversityDatabaseGUI:
         )
         results_label.pack(anchor='w', pady=(0, 5))
 
-        # Results text area with scrollbar
-        self.results_text = scrolledtext.ScrolledText(
-            right_panel,
-            font=('Courier', 9),
-            wrap=tk.WORD,
-            height=20,
-            width=80,
-            fg='black'
-        )
-        self.results_text.pack(fill=tk.BOTH, expand=True)
+        # Results grid - only the rows scrolled into view are rendered
+        self.results_grid = ResultsGrid(right_panel)
+        self.results_grid.pack(fill=tk.BOTH, expand=True)
 
         # Bottom button frame - deep blue text
         bottom_frame = tk.Frame(main_frame)
@@ -503,6 +500,32 @@ class UniversityDatabaseGUI:
         )
         view_data_btn.pack(side=tk.LEFT, padx=5)
 
+        diagnostics_btn = tk.Button(
+            bottom_frame,
+            text="Diagnostics",
+            command=self.show_diagnostics_form,
+            font=('Arial', 10, 'bold'),
+            bg='#e6f2ff',  # pale blue background
+            fg='#003366',  # deep blue text
+            width=15,
+            relief=tk.RAISED,
+            bd=2
+        )
+        diagnostics_btn.pack(side=tk.LEFT, padx=5)
+
+        export_btn = tk.Button(
+            bottom_frame,
+            text="Export Results",
+            command=self.export_results,
+            font=('Arial', 10, 'bold'),
+            bg='#e6f2ff',  # pale blue background
+            fg='#003366',  # deep blue text
+            width=15,
+            relief=tk.RAISED,
+            bd=2
+        )
+        export_btn.pack(side=tk.LEFT, padx=5)
+
         exit_btn = tk.Button(
             bottom_frame,
             text="Exit",
@@ -516,98 +539,223 @@ class UniversityDatabaseGUI:
         )
         exit_btn.pack(side=tk.RIGHT, padx=5)
 
+        # cancel button and status of in-flight queries
+        self.cancel_btn = tk.Button(
+            bottom_frame,
+            text="Cancel Query",
+            command=self.cancel_queries,
+            font=('Arial', 10, 'bold'),
+            bg='#e6f2ff',  # pale blue background
+            fg='#003366',  # deep blue text
+            width=15,
+            relief=tk.RAISED,
+            bd=2,
+            state=tk.DISABLED
+        )
+        self.cancel_btn.pack(side=tk.LEFT, padx=5)
+
+        self.status_label = tk.Label(
+            bottom_frame,
+            text="Ready",
+            font=('Arial', 9, 'italic'),
+            fg='#666666'
+        )
+        self.status_label.pack(side=tk.LEFT, padx=10)
+
         # Configure grid weights
         main_frame.columnconfigure(0, weight=0)
         main_frame.columnconfigure(1, weight=1)
         main_frame.rowconfigure(1, weight=1)
 
+    def check_database(self):
+        """Check the connection and schema version in the background"""
+        if not self.runner:
+            return
+        self.runner.submit(
+            "Startup Check",
+            # the worker runs check_schema_version through get_schema_version() before the job
+            lambda q: q.schema_version,
+            on_done=self.on_database_checked,
+            on_error=lambda e: messagebox.showerror(
+                "Database Connection Failed",
+                f"Cannot connect to database:\n{e}\n\n"
+                "Please check:\n"
+                "1. MySQL server is running\n"
+                "2. Database 'university_records' exists\n"
+                "3. Username and password are correct"),
+            # the check may create Schema_Version and record the version - only on the primary
+            read_only=False
+        )
+
+    def on_database_checked(self, version):
+        self.schema_version = version
+        print(f"Database connection successful! Schema version {version}")
+        if version < SCHEMA_VERSION:
+            fallbacks = '\n'.join(f"{number:03d}: {MIGRATION_FALLBACKS[number]}"
+                                  for number, description in SCHEMA_MIGRATIONS if number > version)
+            messagebox.showwarning(
+                "Database Schema Out of Date",
+                f"The database schema is at version {version}, this application expects "
+                f"version {SCHEMA_VERSION}.\n\nUntil the scripts in migrations/ after "
+                f"{version:03d} are applied:\n{fallbacks}")
+
+    def refresh_reference_data(self):
+        """Pull new reference rows in the background, then schedule the next refresh"""
+        if not self.runner:
+            return
+        self.runner.submit(
+            "Reference Data",
+            lambda q: self.reference.refresh(q.session, schema_version=q.schema_version),
+            on_done=lambda result: self.reference.save()
+        )
+        self.root.after(REFERENCE_REFRESH_SECONDS * 1000, self.refresh_reference_data)
+
     def clear_input_frame(self):
         """Clear all widgets from input frame"""
         for widget in self.input_frame.winfo_children():
             widget.destroy()
 
+    def update_status(self, message, busy):
+        """Show the state of in-flight queries in the status bar"""
+        self.status_label.config(text=message)
+        self.cancel_btn.config(state=tk.NORMAL if busy else tk.DISABLED)
+
+    def cancel_queries(self):
+        """Cancel every running query (kills the statement on the server)"""
+        if self.runner:
+            self.runner.cancel()
+
+    def run_query(self, name, func, stream=False):
+        """Run func(queries) in the background and display the results when done
+
+        With stream=True func should call a stream_query_* method; rows then show
+        up page by page while the query is still running.
+        """
+        if not self.runner:
+            messagebox.showerror("Database Error", "No database connection")
+            return
+
+        # Export Results runs the same query again, straight into a file
+        self.last_query = (name, func)
+        on_error = lambda e: messagebox.showerror("Query Error", f"{name} failed: {e}")
+        if not stream:
+            self.runner.submit(name, func, on_done=self.display_results, on_error=on_error)
+            return
+
+        def on_stream_error(e):
+            # keep the rows that did arrive, but stop showing "Loading..."
+            self.results_grid.finish()
+            on_error(e)
+
+        if self.runner.is_running(name):
+            self.update_status(f"{name} is already running...", True)
+            return
+        self.results_grid.begin()
+        self.runner.submit(
+            name,
+            func,
+            on_done=lambda count: self.results_grid.finish(),
+            on_error=on_stream_error,
+            on_chunk=self.results_grid.append
+        )
+
+    def export_results(self):
+        """Export the results of the last query"""
+        if self.last_query is None:
+            messagebox.showinfo("Export", "Run a query first")
+            return
+        self.export_query(*self.last_query)
+
+    def export_query(self, name, func):
+        """Stream func(queries) to a CSV, JSON lines or Parquet file in the background"""
+        if not self.runner:
+            messagebox.showerror("Database Error", "No database connection")
+            return
+        path = filedialog.asksaveasfilename(
+            title=f"Export {name}",
+            defaultextension='.csv',
+            filetypes=[('CSV', '*.csv'), ('JSON Lines', '*.jsonl'), ('Parquet', '*.parquet')])
+        if not path:
+            return
+        from university_records.export import export_rows
+        self.runner.submit(
+            f"Export {name}",
+            lambda q: export_rows(func(q), path),
+            on_done=lambda count: messagebox.showinfo("Export", f"{count:,} rows written to {path}"),
+            on_error=lambda e: messagebox.showerror("Export Error", f"Export of {name} failed: {e}"),
+            timeout=EXPORT_TIMEOUT_SECONDS
+        )
+
     def clear_results(self):
-        """Clear results text area"""
-        self.results_text.delete(1.0, tk.END)
+        """Clear results grid"""
+        self.results_grid.clear()
 
     def display_results(self, results):
-        """Display query results in formatted way"""
-        self.clear_results()
-
-        if not results:
-            self.results_text.insert(tk.END, "No results found.\n")
-            return
-
-        # Display count
-        self.results_text.insert(tk.END, f"Found {len(results)} result(s)\n")
-        self.results_text.insert(tk.END, "=" * 60 + "\n\n")
-
-        # Display results
-        for i, result in enumerate(results, 1):
-            self.results_text.insert(tk.END, f"Result #{i}:\n")
-            
-            if isinstance(result, dict):
-                for key, value in result.items():
-                    self.results_text.insert(tk.END, f"  {key}: {value}\n")
-            elif hasattr(result, '_asdict'):
-                # SQLAlchemy result tuple
-                result_dict = result._asdict()
-                for key, value in result_dict.items():
-                    self.results_text.insert(tk.END, f"  {key}: {value}\n")
-            else:
-                # Regular object
-                for attr in ['Name', 'Course_Code', 'Course_Name', 'Lecturer_Name', 
-                           'Program', 'Average_Grade', 'Year_of_study', 'Contact_info',
-                           'Job_Title', 'Employment_type', 'Contact_details', 'Department']:
-                    if hasattr(result, attr):
-                        value = getattr(result, attr)
-                        self.results_text.insert(tk.END, f"  {attr}: {value}\n")
-            
-            self.results_text.insert(tk.END, "\n" + "-" * 60 + "\n\n")
+        """Display query results in the paged results grid"""
+        self.results_grid.show(results)
 
     def test_connection(self):
         """Test database connection - 這會真正測試數據庫連接"""
-        try:
-            if self.session:
-                # execute a simple query
-                result = self.session.execute(text("SELECT COUNT(*) FROM Students")).scalar()
-                messagebox.showinfo("Connection Test", 
-                                  f"Database connection is working!\n"
-                                  f"Found {result} students in database.")
-            else:
-                messagebox.showerror("Connection Test", "No database session available")
-        except Exception as e:
-            messagebox.showerror("Connection Test", 
-                               f"Database connection failed: {e}\n\n"
-                               "Please check:\n"
-                               "1. MySQL server is running\n"
-                               "2. Database 'university_records' exists\n"
-                               "3. Username and password are correct")
+        if not self.runner:
+            messagebox.showerror("Connection Test", "No database session available")
+            return
+
+        def on_done(result):
+            pool = self.database.pool_stats()
+            replicas = pool.get('replicas', [])
+            messagebox.showinfo("Connection Test", 
+                              f"Database connection is working!\n"
+                              f"Found {result} students in database.\n"
+                              f"Connection pool: {pool.get('checkedout', 0)} in use, "
+                              f"{pool['connections_opened']} opened, "
+                              f"{pool['max_wait_ms']:.1f} ms max wait."
+                              + (f"\nRead replicas: {sum(r['healthy'] for r in replicas)} "
+                                 f"of {len(replicas)} healthy." if replicas else ""))
+
+        # execute a simple query in the background, on the primary
+        self.runner.submit(
+            "Connection Test",
+            lambda q: q.session.execute(text("SELECT COUNT(*) FROM Students")).scalar(),
+            on_done=on_done,
+            on_error=lambda e: messagebox.showerror(
+                "Connection Test", 
+                f"Database connection failed: {e}\n\n"
+                "Please check:\n"
+                "1. MySQL server is running\n"
+                "2. Database 'university_records' exists\n"
+                "3. Username and password are correct"),
+            read_only=False
+        )
 
     def view_available_data(self):
-        """View available courses and lecturers"""
-        if not self.queries:
+        """View available courses, lecturers, departments and semesters"""
+        if not self.runner:
             messagebox.showerror("Database Error", "No database connection")
             return
-            
-        try:
-            courses = self.queries.get_available_courses()
-            lecturers = self.queries.get_available_lecturers()
-            
-            result_text = "Available Course Codes:\n"
-            result_text += "=" * 30 + "\n"
-            for course in courses:
-                result_text += f"- {course}\n"
-                
-            result_text += "\nAvailable Lecturers:\n"
-            result_text += "=" * 30 + "\n"
-            for lecturer in lecturers:
-                result_text += f"- {lecturer}\n"
-                
-            self.display_results([{"Available Data": result_text}])
-            
-        except Exception as e:
-            messagebox.showerror("Error", f"Could not retrieve available data: {e}")
+
+        # answered from the reference data cache - no query needed
+        courses = self.reference.get('courses')
+        lecturers = self.reference.get('lecturers')
+        if courses and lecturers:
+            self.show_available_data(courses, lecturers)
+            return
+        # not loaded yet - ask the database in the background
+        self.runner.submit(
+            "Available Data",
+            lambda q: (courses or q.get_available_courses(), lecturers or q.get_available_lecturers()),
+            on_done=lambda result: self.show_available_data(*result),
+            on_error=lambda e: messagebox.showerror("Error", f"Could not retrieve available data: {e}")
+        )
+
+    def show_available_data(self, courses, lecturers):
+        """Show the available values in the results grid"""
+        available = [{"Type": "Course Code", "Value": course} for course in courses]
+        available += [{"Type": "Lecturer", "Value": lecturer} for lecturer in lecturers]
+        available += [{"Type": "Department", "Value": department}
+                      for department in self.reference.get('departments')]
+        available += [{"Type": "Semester", "Value": semester}
+                      for semester in self.reference.get('semesters')]
+        self.display_results(available)
 
     # Query 1: Students in course by lecturer - fix execute button display issue
     def show_query_1_form(self):
@@ -648,7 +796,7 @@ class UniversityDatabaseGUI:
         
         tk.Label(course_frame, text="Course Code:", bg='#f8f9fa', fg='black', 
                 font=('Arial', 9)).pack(side=tk.LEFT, padx=(0, 5))
-        course_entry = tk.Entry(course_frame, width=12, font=('Arial', 9))
+        course_entry = AutocompleteEntry(course_frame, self.reference, 'courses', width=12, font=('Arial', 9))
         course_entry.pack(side=tk.LEFT)
         course_entry.insert(0, "CS101")
 
@@ -658,7 +806,7 @@ class UniversityDatabaseGUI:
         
         tk.Label(lecturer_frame, text="Lecturer Name:", bg='#f8f9fa', fg='black',
                 font=('Arial', 9)).pack(side=tk.LEFT, padx=(0, 5))
-        lecturer_entry = tk.Entry(lecturer_frame, width=12, font=('Arial', 9))
+        lecturer_entry = AutocompleteEntry(lecturer_frame, self.reference, 'lecturers', width=12, font=('Arial', 9))
         lecturer_entry.pack(side=tk.LEFT)
         lecturer_entry.insert(0, "Alan")
 
@@ -685,12 +833,12 @@ class UniversityDatabaseGUI:
                                  "- Lecturer Name")
             return
 
-        if not self.queries:
+        if not self.database:
             messagebox.showerror("Database Error", "No database connection")
             return
 
-        results = self.queries.query_1_students_in_course_by_lecturer(course_code, lecturer_name)
-        self.display_results(results)
+        self.run_query("Query 1", lambda q: q.stream_query_1_students_in_course_by_lecturer(course_code, lecturer_name),
+                       stream=True)
 
     # Query 2: High performing students - fix result display issue
     def show_query_2_form(self):
@@ -732,12 +880,11 @@ class UniversityDatabaseGUI:
         execute_btn.pack(pady=10)
 
     def execute_query_2(self):
-        if not self.queries:
+        if not self.database:
             messagebox.showerror("Database Error", "No database connection")
             return
 
-        results = self.queries.query_2_high_performing_final_year_students()
-        self.display_results(results)
+        self.run_query("Query 2", lambda q: q.query_2_high_performing_final_year_students())
 
     # Query 3: Students not enrolled
     def show_query_3_form(self):
@@ -761,13 +908,16 @@ class UniversityDatabaseGUI:
         input_fields.pack(pady=10)
 
         tk.Label(input_fields, text="Semester:", bg='#f8f9fa', fg='black').pack(side=tk.LEFT, padx=5)
-        semester_entry = tk.Entry(input_fields, width=15)
+        semester_entry = AutocompleteEntry(input_fields, self.reference, 'semesters', width=15)
         semester_entry.pack(side=tk.LEFT, padx=5)
         semester_entry.insert(0, "Fall 2025")
 
+        buttons = tk.Frame(content_frame, bg='#f8f9fa')
+        buttons.pack(pady=10)
+
         # Execute button - deep blue text
         execute_btn = tk.Button(
-            content_frame,
+            buttons,
             text="Execute Query 3",
             command=lambda: self.execute_query_3(semester_entry.get()),
             font=('Arial', 10, 'bold'),
@@ -777,15 +927,30 @@ class UniversityDatabaseGUI:
             relief=tk.RAISED,
             bd=2
         )
-        execute_btn.pack(pady=10)
+        execute_btn.pack(side=tk.LEFT, padx=5)
+
+        # the whole term straight to a file, nothing shown in the grid
+        export_btn = tk.Button(
+            buttons,
+            text="Export Term Enrollments",
+            command=lambda: self.export_query(
+                "Term Enrollments",
+                lambda q, semester=semester_entry.get(): q.stream_query_enrollments_by_term(semester)),
+            font=('Arial', 10, 'bold'),
+            bg='#e6f2ff',  # pale blue background
+            fg='#003366',  # deep blue text
+            width=20,
+            relief=tk.RAISED,
+            bd=2
+        )
+        export_btn.pack(side=tk.LEFT, padx=5)
 
     def execute_query_3(self, semester):
-        if not self.queries:
+        if not self.database:
             messagebox.showerror("Database Error", "No database connection")
             return
 
-        results = self.queries.query_3_students_not_enrolled(semester)
-        self.display_results(results)
+        self.run_query("Query 3", lambda q: q.stream_query_3_students_not_enrolled(semester), stream=True)
 
     # Query 6: Courses by department
     def show_query_6_form(self):
@@ -809,7 +974,7 @@ class UniversityDatabaseGUI:
         input_fields.pack(pady=10)
 
         tk.Label(input_fields, text="Department Name:", bg='#f8f9fa', fg='black').pack(side=tk.LEFT, padx=5)
-        dept_entry = tk.Entry(input_fields, width=15)
+        dept_entry = AutocompleteEntry(input_fields, self.reference, 'departments', width=15)
         dept_entry.pack(side=tk.LEFT, padx=5)
         dept_entry.insert(0, "Computer Science")
 
@@ -832,12 +997,11 @@ class UniversityDatabaseGUI:
             messagebox.showwarning("Input Required", "Please enter a department name")
             return
 
-        if not self.queries:
+        if not self.database:
             messagebox.showerror("Database Error", "No database connection")
             return
 
-        results = self.queries.query_6_courses_by_department(department)
-        self.display_results(results)
+        self.run_query("Query 6", lambda q: q.stream_query_6_courses_by_department(department), stream=True)
 
     # Query 7: Top research supervisors
     def show_query_7_form(self):
@@ -850,7 +1014,7 @@ class UniversityDatabaseGUI:
         
         tk.Label(
             content_frame,
-            text="Top Research Supervisors (by project count)",
+            text="Top Research Supervisors",
             font=('Arial', 11, 'bold'),
             bg='#f8f9fa',
             fg='black'
@@ -858,17 +1022,31 @@ class UniversityDatabaseGUI:
         
         tk.Label(
             content_frame,
-            text="This query shows lecturers with the most research projects",
+            text="Lecturers with the most research projects, team memberships or publications",
             font=('Arial', 9),
             bg='#f8f9fa',
             fg='black'
         ).pack(pady=(0, 10))
 
+        # Input fields frame
+        input_fields = tk.Frame(content_frame, bg='#f8f9fa')
+        input_fields.pack(pady=10)
+
+        tk.Label(input_fields, text="Rank by:", bg='#f8f9fa', fg='black').pack(side=tk.LEFT, padx=5)
+        metric_combo = ttk.Combobox(input_fields, values=list(LEADERBOARD_METRICS), width=12,
+                                    state='readonly')
+        metric_combo.pack(side=tk.LEFT, padx=5)
+        metric_combo.set('projects')
+
+        tk.Label(input_fields, text="Department (optional):", bg='#f8f9fa', fg='black').pack(side=tk.LEFT, padx=5)
+        dept_entry = AutocompleteEntry(input_fields, self.reference, 'departments', width=15)
+        dept_entry.pack(side=tk.LEFT, padx=5)
+
         # Execute button for query 7 - deep blue text
         execute_btn = tk.Button(
             content_frame,
             text="Execute Query 7",
-            command=self.execute_query_7,
+            command=lambda: self.execute_query_7(metric_combo.get(), dept_entry.get().strip()),
             font=('Arial', 10, 'bold'),
             bg='#e6f2ff',  # pale blue background
             fg='#003366',  # deep blue text
@@ -878,13 +1056,13 @@ class UniversityDatabaseGUI:
         )
         execute_btn.pack(pady=10)
 
-    def execute_query_7(self):
-        if not self.queries:
+    def execute_query_7(self, metric='projects', department=''):
+        if not self.database:
             messagebox.showerror("Database Error", "No database connection")
             return
 
-        results = self.queries.query_7_top_research_supervisors(10)
-        self.display_results(results)
+        self.run_query("Query 7", lambda q: q.query_7_top_research_supervisors(
+            10, metric, department or None))
 
     # Query 10: Staff by department
     def show_query_10_form(self):
@@ -908,7 +1086,7 @@ class UniversityDatabaseGUI:
         input_fields.pack(pady=10)
 
         tk.Label(input_fields, text="Department Name:", bg='#f8f9fa', fg='black').pack(side=tk.LEFT, padx=5)
-        dept_entry = tk.Entry(input_fields, width=15)
+        dept_entry = AutocompleteEntry(input_fields, self.reference, 'departments', width=15)
         dept_entry.pack(side=tk.LEFT, padx=5)
         dept_entry.insert(0, "Computer Science")
 
@@ -931,43 +1109,608 @@ class UniversityDatabaseGUI:
             messagebox.showwarning("Input Required", "Please enter a department name")
             return
 
-        if not self.queries:
+        if not self.database:
             messagebox.showerror("Database Error", "No database connection")
             return
 
-        results = self.queries.query_10_staff_by_department(department)
-        self.display_results(results)
+        self.run_query("Query 10", lambda q: q.stream_query_10_staff_by_department(department), stream=True)
 
-# MAIN EXECUTION
-def main():
-    """Main function to run the application"""
-    # First test database connection
-    print("Testing database connection...")
-    try:
-        # Test basic connection
-        test_engine = create_engine(DATABASE_URL)
-        test_session = sessionmaker(bind=test_engine)()
-        test_session.execute(text("SELECT 1"))
-        test_session.close()
-        print("Database connection successful!")
-        
-        # Create tables if they don't exist
-        Base.metadata.create_all(engine)
-        print("Tables checked/created successfully!")
-        
-    except Exception as e:
-        print(f"Database connection failed: {e}")
-        response = messagebox.askyesno(
-            "Database Connection Failed", 
-            f"Cannot connect to database:\n{str(e)}\n\nDo you want to continue anyway?"
+    # Department dashboard: all six queries at once
+    def show_dashboard_form(self):
+        """Show input form for the department dashboard"""
+        self.clear_input_frame()
+
+        content_frame = tk.Frame(self.input_frame, bg='#f8f9fa')
+        content_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+
+        tk.Label(
+            content_frame,
+            text="Department Dashboard - queries 1, 2, 3, 6, 7 and 10 at once",
+            font=('Arial', 11, 'bold'),
+            bg='#f8f9fa',
+            fg='black'
+        ).pack(pady=(0, 5))
+
+        # two rows of inputs
+        first_row = tk.Frame(content_frame, bg='#f8f9fa')
+        first_row.pack(pady=2)
+        tk.Label(first_row, text="Department:", bg='#f8f9fa', fg='black', font=('Arial', 9)).pack(side=tk.LEFT, padx=5)
+        dept_entry = AutocompleteEntry(first_row, self.reference, 'departments', width=18, font=('Arial', 9))
+        dept_entry.pack(side=tk.LEFT, padx=5)
+        dept_entry.insert(0, "Computer Science")
+        tk.Label(first_row, text="Semester:", bg='#f8f9fa', fg='black', font=('Arial', 9)).pack(side=tk.LEFT, padx=5)
+        semester_entry = AutocompleteEntry(first_row, self.reference, 'semesters', width=12, font=('Arial', 9))
+        semester_entry.pack(side=tk.LEFT, padx=5)
+        semester_entry.insert(0, CURRENT_SEMESTER)
+
+        second_row = tk.Frame(content_frame, bg='#f8f9fa')
+        second_row.pack(pady=2)
+        tk.Label(second_row, text="Course Code:", bg='#f8f9fa', fg='black', font=('Arial', 9)).pack(side=tk.LEFT, padx=5)
+        course_entry = AutocompleteEntry(second_row, self.reference, 'courses', width=12, font=('Arial', 9))
+        course_entry.pack(side=tk.LEFT, padx=5)
+        course_entry.insert(0, "CS101")
+        tk.Label(second_row, text="Lecturer (optional):", bg='#f8f9fa', fg='black', font=('Arial', 9)).pack(side=tk.LEFT, padx=5)
+        lecturer_entry = AutocompleteEntry(second_row, self.reference, 'lecturers', width=12, font=('Arial', 9))
+        lecturer_entry.pack(side=tk.LEFT, padx=5)
+
+        execute_btn = tk.Button(
+            content_frame,
+            text="Run Dashboard",
+            command=lambda: self.run_dashboard(dept_entry.get().strip(), semester_entry.get().strip(),
+                                               course_entry.get().strip(), lecturer_entry.get().strip()),
+            font=('Arial', 10, 'bold'),
+            bg='#e6f2ff',  # pale blue background
+            fg='#003366',  # deep blue text
+            width=15,
+            relief=tk.RAISED,
+            bd=2
         )
-        if not response:
+        execute_btn.pack(pady=5)
+
+    def run_dashboard(self, department, semester, course_code, lecturer_name):
+        """Run the six queries concurrently, each panel filling in as its rows arrive
+
+        Every panel is its own QueryRunner job with its own pooled session, so
+        the whole dashboard takes about as long as its slowest query.
+        """
+        if not self.runner:
+            messagebox.showerror("Database Error", "No database connection")
+            return
+        if not department:
+            messagebox.showwarning("Input Required", "Please enter a department name")
             return
 
-    # Create and run GUI
+        panels = [
+            (f"Query 1: Students in {course_code or 'courses'} by {lecturer_name or 'any lecturer'}",
+             lambda q: q.stream_query_1_students_in_course_by_lecturer(course_code or None,
+                                                                       lecturer_name or None)),
+            ("Query 2: High-Performing Final Year Students",
+             lambda q: q.stream_query_2_high_performing_final_year_students()),
+            (f"Query 3: Not Enrolled in {semester}",
+             lambda q: q.stream_query_3_students_not_enrolled(semester)),
+            (f"Query 6: Courses in {department}",
+             lambda q: q.stream_query_6_courses_by_department(department)),
+            (f"Query 7: Top Research Supervisors in {department}",
+             lambda q: q.stream_query_7_top_research_supervisors(10, 'projects', department)),
+            (f"Query 10: Staff in {department}",
+             lambda q: q.stream_query_10_staff_by_department(department)),
+        ]
+
+        window = tk.Toplevel(self.root)
+        window.title(f"Dashboard - {department}")
+        window.geometry("1400x800")
+        summary_label = tk.Label(window, text=f"Running {len(panels)} queries...",
+                                 font=('Arial', 10, 'bold'), fg='black', anchor='w')
+        summary_label.pack(fill=tk.X, padx=10, pady=(10, 0))
+        panels_frame = tk.Frame(window)
+        panels_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        for row in range(2):
+            panels_frame.rowconfigure(row, weight=1)
+        for column in range(3):
+            panels_frame.columnconfigure(column, weight=1)
+
+        started = time.monotonic()
+        elapsed = {}
+        jobs = []
+
+        def finished(title, frame, text, job):
+            if not window.winfo_exists():
+                return
+            elapsed[title] = job.elapsed() if job else 0.0
+            frame.config(text=f"{title} - {text}")
+            if len(elapsed) == len(panels):
+                summary_label.config(
+                    text=f"All {len(panels)} queries finished in {time.monotonic() - started:.2f}s "
+                         f"(slowest {max(elapsed.values()):.2f}s, "
+                         f"{sum(elapsed.values()):.2f}s if run one after another)")
+
+        for index, (title, func) in enumerate(panels):
+            frame = tk.LabelFrame(panels_frame, text=f"{title} - running...",
+                                  font=('Arial', 10, 'bold'), fg='#003366')
+            frame.grid(row=index // 3, column=index % 3, sticky='nsew', padx=5, pady=5)
+            grid = ResultsGrid(frame, page_size=50)
+            grid.pack(fill=tk.BOTH, expand=True)
+            grid.begin()
+
+            job = [None]  # filled in below, read by the callbacks once the job is done
+            def on_done(count, title=title, frame=frame, grid=grid, job=job):
+                if window.winfo_exists():
+                    grid.finish()
+                    finished(title, frame, f"{count:,} rows in {job[0].elapsed():.2f}s", job[0])
+            def on_error(e, title=title, frame=frame, grid=grid, job=job):
+                if window.winfo_exists():
+                    grid.finish()
+                finished(title, frame, f"failed: {e}", job[0])
+            job[0] = self.runner.submit(f"Dashboard {title}", func, on_done=on_done,
+                                        on_error=on_error, on_chunk=grid.append)
+            if job[0] is None:
+                finished(title, frame, "already running in another dashboard", None)
+            else:
+                jobs.append(job[0])
+
+        def close():
+            for running_job in jobs:
+                self.runner.cancel(running_job)
+            window.destroy()
+        window.protocol("WM_DELETE_WINDOW", close)
+
+    # Cohort grade analytics
+    def show_cohort_form(self):
+        """Show input form for cohort analytics"""
+        self.clear_input_frame()
+
+        # create a frame to hold all content
+        content_frame = tk.Frame(self.input_frame, bg='#f8f9fa')
+        content_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+
+        tk.Label(
+            content_frame,
+            text="Cohort Grade Analytics",
+            font=('Arial', 11, 'bold'),
+            bg='#f8f9fa',
+            fg='black'
+        ).pack(pady=(0, 5))
+
+        tk.Label(
+            content_frame,
+            text="Program averages, percentiles, grade histogram and threshold sweep",
+            font=('Arial', 9),
+            bg='#f8f9fa',
+            fg='black'
+        ).pack(pady=(0, 5))
+
+        # Input fields frame
+        input_fields = tk.Frame(content_frame, bg='#f8f9fa')
+        input_fields.pack(pady=5)
+
+        tk.Label(input_fields, text="Year of Study (blank = all):", bg='#f8f9fa', fg='black').pack(side=tk.LEFT, padx=5)
+        year_entry = tk.Entry(input_fields, width=5)
+        year_entry.pack(side=tk.LEFT, padx=5)
+
+        # Execute button - deep blue text
+        execute_btn = tk.Button(
+            content_frame,
+            text="Run Analytics",
+            command=lambda: self.execute_cohort_analytics(year_entry.get()),
+            font=('Arial', 10, 'bold'),
+            bg='#e6f2ff',  # pale blue background
+            fg='#003366',  # deep blue text
+            width=15,
+            relief=tk.RAISED,
+            bd=2
+        )
+        execute_btn.pack(pady=5)
+
+    def execute_cohort_analytics(self, year):
+        year = year.strip()
+        if year and not year.isdigit():
+            messagebox.showwarning("Invalid Input", "Year of study must be a number")
+            return
+
+        if not self.database:
+            messagebox.showerror("Database Error", "No database connection")
+            return
+
+        year = int(year) if year else None
+        self.run_query("Cohort Analytics", lambda q: q.query_cohort_analytics(year))
+
+    # Query diagnostics: timings, row counts, SQL and EXPLAIN plans of recent queries
+    def show_diagnostics_form(self):
+        """Show the diagnostics controls and list recent query calls in the results grid"""
+        if not self.runner:
+            messagebox.showerror("Database Error", "No database connection")
+            return
+
+        self.clear_input_frame()
+
+        content_frame = tk.Frame(self.input_frame, bg='#f8f9fa')
+        content_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+
+        tk.Label(
+            content_frame,
+            text="Query Diagnostics",
+            font=('Arial', 11, 'bold'),
+            bg='#f8f9fa',
+            fg='black'
+        ).pack(pady=(0, 5))
+
+        explain_var = tk.BooleanVar(value=self.instrumentation.explain)
+        tk.Checkbutton(
+            content_frame,
+            text="Capture EXPLAIN plans (runs each SELECT again)",
+            variable=explain_var,
+            command=lambda: setattr(self.instrumentation, 'explain', explain_var.get()),
+            bg='#f8f9fa',
+            fg='black'
+        ).pack(pady=5)
+
+        buttons = tk.Frame(content_frame, bg='#f8f9fa')
+        buttons.pack(pady=5)
+        for label, command in [("Refresh", self.show_diagnostics),
+                               ("Export JSON Lines", self.export_query_log),
+                               ("Export Prometheus", self.export_query_metrics)]:
+            tk.Button(
+                buttons,
+                text=label,
+                command=command,
+                font=('Arial', 10, 'bold'),
+                bg='#e6f2ff',  # pale blue background
+                fg='#003366',  # deep blue text
+                width=15,
+                relief=tk.RAISED,
+                bd=2
+            ).pack(side=tk.LEFT, padx=5)
+
+        self.show_diagnostics()
+
+    def show_diagnostics(self):
+        """One row per recent query call, slowest statement's SQL and plan included"""
+        rows = []
+        for record in self.instrumentation.recent():
+            slowest = max(record['statements'], key=lambda s: s['execute_ms'], default=None)
+            rows.append({
+                'Time': record['time'],
+                'Query': record['query'],
+                'Parameters': json.dumps(record['params']),
+                'Total_ms': record['total_ms'],
+                'First_Row_ms': record['first_row_ms'],
+                'Rows': record['rows'],
+                'Statements': len(record['statements']) or 'cached',
+                'Error': record['error'] or '',
+                'SQL': ' '.join(slowest['sql'].split()) if slowest else '',
+                'Explain': json.dumps(slowest.get('explain')) if slowest and slowest.get('explain') else '',
+            })
+        self.display_results(rows)
+
+    def export_query_log(self):
+        path = self.instrumentation.export_jsonl()
+        messagebox.showinfo("Diagnostics", f"Query log appended to {path}")
+
+    def export_query_metrics(self):
+        path = self.instrumentation.export_prometheus()
+        messagebox.showinfo("Diagnostics", f"Query metrics written to {path}")
+
+
+# MAIN EXECUTION
+def run_grade_migration():
+    """Copy Students.Current_Grades into the Student_Grades table"""
+    database = get_database()
+    Base.metadata.create_all(database.engine, tables=[StudentGrade.__table__])
+    with database.session_scope() as session:
+        stats = migrate_current_grades(session)
+    print(f"Grade migration finished: {stats['students']} students, "
+          f"{stats['grades']} grades, {stats['skipped']} entries skipped")
+
+
+def run_name_index():
+    """Fill the Name_Search columns used by the lecturer/department name search"""
+    with get_database().session_scope() as session:
+        backfill_name_search(session)
+
+
+def run_analytics_snapshot(path):
+    """Export the main database into the local analytics snapshot"""
+    create_analytics_snapshot(get_database().engine, path)
+
+
+def run_term_backfill():
+    """Fill Terms and Course_Enrollments.Term_ID (between migrations 004 and 005)"""
+    with get_database().session_scope() as session:
+        backfill_enrollment_terms(session)
+
+
+def run_leaderboard_rebuild():
+    """Recount Research_Leaderboard from the research tables"""
+    with get_database().session_scope() as session:
+        rebuild_research_leaderboard(session)
+
+
+def run_data_generation(students, seed, batch_size):
+    """Fill the database with synthetic data at the given scale"""
+    from university_records.synthetic import SyntheticDataGenerator
+    database = get_database()
+    with database.session_scope() as session:
+        check_schema_version(session)  # creates the tables on an empty database
+    generator = SyntheticDataGenerator(students=students, seed=seed, batch_size=batch_size)
+    with database.session_scope() as session:
+        generator.generate(session)
+
+
+def run_query_benchmark(scales, repeats, url_template, output, compare):
+    """Benchmark the core queries, save the results and check them against a baseline"""
+    from university_records.benchmark import QueryBenchmark, compare_benchmarks
+    report = QueryBenchmark(scales=scales, repeats=repeats, url_template=url_template).run()
+
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Benchmark results saved to {output}")
+
+    if compare:
+        with open(compare, encoding='utf-8') as f:
+            regressions = compare_benchmarks(report, json.load(f))
+        for regression in regressions:
+            print(f"REGRESSION scale {regression['scale']:,} {regression['query']}: "
+                  f"p50 {regression['baseline_p50_ms']} ms -> {regression['p50_ms']} ms")
+        if regressions:
+            sys.exit(1)
+        print("No regressions against the baseline")
+
+
+def run_call_overhead(url, calls):
+    """Print the per-call cost of each core query"""
+    from university_records.benchmark import measure_call_overhead
+    database = DatabaseManager(url) if url else get_database()
+    for query_name, result in measure_call_overhead(database, calls).items():
+        print(f"  {query_name:<45} {result['us_per_call']:10.1f} us/call  rows {result['rows']:>8,}")
+    database.dispose()
+
+
+def run_result_memory(url):
+    """Print the memory each core query's result takes per 100k rows"""
+    from university_records.benchmark import measure_result_memory
+    database = DatabaseManager(url) if url else get_database()
+    print(f"  {'MB per 100k rows':<45} {'Rows':>8} {'dicts':>8} {'ResultSet':>10}")
+    for query_name, result in measure_result_memory(database).items():
+        print(f"  {query_name:<45} {result['rows_bytes'] / 2**20:8.1f} {result['dicts_bytes'] / 2**20:8.1f} "
+              f"{result['result_set_bytes'] / 2**20:10.1f}  ({result['rows']:,} rows)")
+    database.dispose()
+
+
+def run_index_advisor(url, apply, repeats, migrations_dir):
+    """Propose indexes for the core queries, optionally create them and time the difference"""
+    from university_records.index_advisor import IndexAdvisor
+    database = DatabaseManager(url) if url else get_database()
+    IndexAdvisor(database, repeats=repeats, migrations_dir=migrations_dir).run(apply=apply)
+
+
+def run_export(query_name, params, url, replicas, output, fmt, chunk_size):
+    """Stream one query's results to a file"""
+    from university_records.export import export_rows
+    database = DatabaseManager(url, replica_urls=replicas) if url else get_database()
+    started = time.perf_counter()
+    try:
+        with database.queries() as queries:
+            count = export_rows(getattr(queries, f"stream_{query_name}")(**params), output, fmt,
+                                chunk_size)
+    except Exception as e:
+        # export_rows has already removed the partial file
+        print(f"Export failed, {output} not written: {e}")
+        sys.exit(1)
+    elapsed = time.perf_counter() - started
+    print(f"{count:,} rows written to {output} in {elapsed:.1f}s")
+
+
+def _parse_param(value):
+    """'name=value' from the command line - JSON values (numbers) are decoded"""
+    name, separator, raw = value.partition('=')
+    if not separator:
+        raise argparse.ArgumentTypeError(f"expected name=value, got '{value}'")
+    try:
+        return name, json.loads(raw)
+    except ValueError:
+        return name, raw
+
+
+def run_batch(query_names, params_file, url, replicas, output_dir, workers, fmt):
+    """Run queries for every parameter set in parallel and write one file per set"""
+    from university_records.batch import BatchRunner
+    params = None
+    if params_file:
+        with open(params_file, encoding='utf-8') as f:
+            params = json.load(f)
+    database = DatabaseManager(url, replica_urls=replicas) if url else get_database()
+    runner = BatchRunner(database, output_dir, workers=workers, fmt=fmt)
+    tasks = [task for name in query_names for task in runner.tasks_for(name, params)]
+    print(f"Running {len(tasks)} queries on {workers} workers...")
+    summary, results = runner.run(tasks)
+    print(f"{summary['succeeded']}/{summary['tasks']} succeeded, {summary['rows']:,} rows in "
+          f"{summary['elapsed_seconds']:.1f}s ({summary['tasks_per_second']} queries/sec, "
+          f"{summary['rows_per_second']:,.0f} rows/sec, p95 {summary['p95_task_seconds']:.2f}s)")
+    for task, error in summary['errors'].items():
+        print(f"FAILED {task}: {error}")
+    for engine in database.router.stats()[1:]:
+        print(f"  replica {engine['engine']}: {engine['routed']} sessions, "
+              f"lag {engine['lag_seconds']}s")
+    if summary['failed']:
+        sys.exit(1)
+
+
+def run_service(host, port, workers, max_pending, url, replicas):
+    """Serve the queries over HTTP/JSON until interrupted"""
+    from university_records.service import QueryService
+    database = DatabaseManager(url, replica_urls=replicas) if url else get_database()
+    QueryService(database, workers=workers, max_pending=max_pending).run(host, port)
+
+
+def run_gui(benchmark=False):
+    """Open the GUI - the database is checked in the background once the window is up"""
     root = tk.Tk()
     app = UniversityDatabaseGUI(root)
+
+    if benchmark:
+        report_startup_time(root, app)
+        return
+
     root.mainloop()
 
+    # stop any query still running in the background
+    if app.runner:
+        app.runner.shutdown()
+
+
+def report_startup_time(root, app):
+    """Print time-to-first-window (and until the database check finished), then close"""
+    root.update()
+    first_window = time.perf_counter() - STARTED_AT
+    print(f"Time to first window: {first_window * 1000:.0f} ms")
+
+    # wait for the background connection / schema check
+    while app.runner and app.runner.jobs:
+        root.update()
+        time.sleep(0.01)
+    if app.schema_version is not None:
+        ready = time.perf_counter() - STARTED_AT
+        print(f"Database ready after: {ready * 1000:.0f} ms (schema version {app.schema_version})")
+    else:
+        print("Database not reachable")
+
+    if app.runner:
+        app.runner.shutdown()
+    root.destroy()
+
+def main():
+    """Main function to run the application"""
+    parser = argparse.ArgumentParser(description="University Records Management System")
+    subparsers = parser.add_subparsers(dest='command')
+    subparsers.add_parser('migrate-grades',
+                          help="copy Students.Current_Grades into the Student_Grades table")
+    subparsers.add_parser('index-names',
+                          help="fill the normalized Name_Search columns (after migration 002)")
+    subparsers.add_parser('backfill-terms',
+                          help="fill Course_Enrollments.Term_ID (after migration 004)")
+    subparsers.add_parser('rebuild-leaderboard',
+                          help="recount Research_Leaderboard from projects, teams and publications")
+    generate_parser = subparsers.add_parser('generate',
+                                            help="insert synthetic data sized by a student count")
+    generate_parser.add_argument('--students', type=int, default=1000,
+                                 help="number of students, everything else scales with it")
+    generate_parser.add_argument('--seed', type=int, default=42)
+    generate_parser.add_argument('--batch-size', type=int, default=5000,
+                                 help="rows per executemany insert")
+    snapshot_parser = subparsers.add_parser('snapshot',
+                                            help="export the tables to the local analytics snapshot")
+    snapshot_parser.add_argument('--path', default=ANALYTICS_SNAPSHOT_FILE)
+    benchmark_parser = subparsers.add_parser('benchmark',
+                                             help="time the core queries at several data scales")
+    benchmark_parser.add_argument('--scales', default=','.join(map(str, BENCHMARK_SCALES)),
+                                  help="comma-separated student counts")
+    benchmark_parser.add_argument('--repeats', type=int, default=BENCHMARK_REPEATS,
+                                  help="warm runs per query")
+    benchmark_parser.add_argument('--url', default=None,
+                                  help="database URL with a {scale} placeholder "
+                                       "(default: embedded SQLite files)")
+    benchmark_parser.add_argument('--output', default=os.path.join('benchmarks', 'query_benchmark.json'))
+    benchmark_parser.add_argument('--compare', default=None,
+                                  help="baseline JSON to check for regressions")
+    overhead_parser = subparsers.add_parser('call-overhead',
+                                            help="time many calls of each core query on one session")
+    overhead_parser.add_argument('--url', default=None,
+                                 help="database to query (default: the configured MySQL)")
+    overhead_parser.add_argument('--calls', type=int, default=CALL_OVERHEAD_CALLS)
+    memory_parser = subparsers.add_parser('result-memory',
+                                          help="measure memory per 100k rows of each core query's result")
+    memory_parser.add_argument('--url', default=None,
+                               help="database to query (default: the configured MySQL)")
+    export_parser = subparsers.add_parser('export', help="stream one query's results to a file")
+    export_parser.add_argument('query', metavar='QUERY',
+                               choices=[name for name in QUERY_TABLES
+                                        if hasattr(DatabaseQueries, f"stream_{name}")],
+                               help="DatabaseQueries method name, e.g. query_enrollments_by_term")
+    export_parser.add_argument('--param', action='append', type=_parse_param, default=[],
+                               help="query parameter as name=value, e.g. semester='Fall 2025'")
+    export_parser.add_argument('--output', required=True,
+                               help="file to write - .csv, .jsonl or .parquet")
+    export_parser.add_argument('--format', default=None, choices=EXPORT_FORMATS,
+                               help="default: from the file extension")
+    export_parser.add_argument('--chunk-size', type=int, default=STREAM_CHUNK_SIZE)
+    export_parser.add_argument('--url', default=None,
+                               help="database to query (default: the configured MySQL)")
+    export_parser.add_argument('--replica', action='append', default=[],
+                               help="read replica URL for --url, may be repeated")
+    batch_parser = subparsers.add_parser('batch',
+                                         help="run queries for many parameter sets in parallel")
+    batch_parser.add_argument('queries', nargs='+', metavar='QUERY',
+                              choices=[name for name in QUERY_TABLES
+                                       if hasattr(DatabaseQueries, f"stream_{name}")],
+                              help="DatabaseQueries method names, e.g. "
+                                   "query_6_courses_by_department")
+    batch_parser.add_argument('--params', default=None,
+                              help="JSON file with a list of parameter dicts (default: every "
+                                   "course, department or term the query takes)")
+    batch_parser.add_argument('--url', default=None,
+                              help="database to query (default: the configured MySQL)")
+    batch_parser.add_argument('--replica', action='append', default=[],
+                              help="read replica URL for --url, may be repeated")
+    batch_parser.add_argument('--output-dir', default='batch_output')
+    batch_parser.add_argument('--workers', type=int, default=QUERY_WORKERS)
+    batch_parser.add_argument('--format', default='jsonl', choices=EXPORT_FORMATS)
+    advisor_parser = subparsers.add_parser('advise-indexes',
+                                           help="EXPLAIN the core queries and propose indexes")
+    advisor_parser.add_argument('--url', default=None,
+                                help="database to analyse (default: the configured MySQL)")
+    advisor_parser.add_argument('--apply', action='store_true',
+                                help="create the proposed indexes and time the queries again")
+    advisor_parser.add_argument('--repeats', type=int, default=BENCHMARK_REPEATS)
+    advisor_parser.add_argument('--migrations-dir', default='migrations')
+    serve_parser = subparsers.add_parser('serve', help="serve the queries over HTTP/JSON")
+    serve_parser.add_argument('--host', default=SERVICE_HOST)
+    serve_parser.add_argument('--port', type=int, default=SERVICE_PORT)
+    serve_parser.add_argument('--workers', type=int, default=QUERY_WORKERS,
+                              help="queries run at the same time - also the connections used")
+    serve_parser.add_argument('--max-pending', type=int, default=SERVICE_MAX_PENDING,
+                              help="distinct queries in progress before requests get 503")
+    serve_parser.add_argument('--url', default=None,
+                              help="database to query (default: the configured MySQL)")
+    serve_parser.add_argument('--replica', action='append', default=[],
+                              help="read replica URL for --url, may be repeated")
+    subparsers.add_parser('startup-benchmark',
+                          help="open the window, report time-to-first-window and exit")
+    args = parser.parse_args()
+
+    if args.command == 'migrate-grades':
+        run_grade_migration()
+    elif args.command == 'index-names':
+        run_name_index()
+    elif args.command == 'backfill-terms':
+        run_term_backfill()
+    elif args.command == 'rebuild-leaderboard':
+        run_leaderboard_rebuild()
+    elif args.command == 'generate':
+        run_data_generation(args.students, args.seed, args.batch_size)
+    elif args.command == 'snapshot':
+        run_analytics_snapshot(args.path)
+    elif args.command == 'benchmark':
+        scales = [int(scale) for scale in args.scales.split(',')]
+        run_query_benchmark(scales, args.repeats, args.url, args.output, args.compare)
+    elif args.command == 'call-overhead':
+        run_call_overhead(args.url, args.calls)
+    elif args.command == 'result-memory':
+        run_result_memory(args.url)
+    elif args.command == 'export':
+        run_export(args.query, dict(args.param), args.url, args.replica, args.output,
+                   args.format, args.chunk_size)
+    elif args.command == 'batch':
+        run_batch(args.queries, args.params, args.url, args.replica, args.output_dir,
+                  args.workers, args.format)
+    elif args.command == 'advise-indexes':
+        run_index_advisor(args.url, args.apply, args.repeats, args.migrations_dir)
+    elif args.command == 'serve':
+        run_service(args.host, args.port, args.workers, args.max_pending, args.url, args.replica)
+    elif args.command == 'startup-benchmark':
+        run_gui(benchmark=True)
+    else:
+        run_gui()
+
 if __name__ == "__main__":
     main()
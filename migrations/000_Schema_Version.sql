@@ -0,0 +1,14 @@
+-- MIGRATION 000: SCHEMA VERSION TABLE
+-- The application reads MAX(Version) from this table at startup (one query)
+-- instead of reflecting every table. Each later migration records its version here.
+-- Databases created by the application itself get this table automatically.
+
+USE university_records;
+
+CREATE TABLE IF NOT EXISTS Schema_Version (
+    Version INT PRIMARY KEY,
+    Description VARCHAR(255),
+    Applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+) ENGINE=InnoDB;
+
+SELECT COALESCE(MAX(Version), 0) AS 'Current Schema Version' FROM Schema_Version;
@@ -0,0 +1,28 @@
+-- MIGRATION 001: NORMALIZED STUDENT GRADES
+-- Replaces the comma-separated Students.Current_Grades text with one row per
+-- graded enrollment, so query 2 can average grades with AVG() / HAVING on the server.
+
+USE university_records;
+
+-- Student_Grades: one grade per course enrollment
+CREATE TABLE IF NOT EXISTS Student_Grades (
+    Student_id INT NOT NULL,
+    Course_id INT NOT NULL,
+    Grade DECIMAL(5,2) NOT NULL,        -- percentage, letter grades are converted
+    Letter_grade VARCHAR(5),            -- original letter grade, if there was one
+    PRIMARY KEY (Student_id, Course_id),
+    FOREIGN KEY (Student_id, Course_id) REFERENCES Course_Enrollments(Student_id, Course_id)
+        ON DELETE CASCADE
+        ON UPDATE CASCADE
+) ENGINE=InnoDB;
+
+-- The existing Current_Grades text is copied over by the Python migration, which
+-- shares its grade parsing with the application:
+--     python code.py migrate-grades
+-- Grades for courses without an enrollment row get a 'Completed' enrollment.
+
+-- Record the schema version
+INSERT IGNORE INTO Schema_Version (Version, Description) VALUES (1, 'Student_Grades table');
+
+-- Verify
+SELECT COUNT(*) AS 'Grades Migrated' FROM Student_Grades;
@@ -0,0 +1,29 @@
+-- MIGRATION 002: INDEXED NAME SEARCH
+-- Query 1, 6 and 10 used LIKE '%name%' on Lecturers.Name / Departments.Name,
+-- which can never use an index. Names are now searched through a normalized
+-- (accent- and case-folded) Name_Search column with an ngram FULLTEXT index;
+-- matching names are resolved to IDs first and the joins run on integer keys.
+
+USE university_records;
+
+ALTER TABLE Lecturers
+    ADD COLUMN Name_Search VARCHAR(255) NULL AFTER Name,
+    ADD INDEX idx_lecturers_name_search (Name_Search),
+    ADD FULLTEXT INDEX ft_lecturers_name_search (Name_Search) WITH PARSER ngram;
+
+ALTER TABLE Departments
+    ADD COLUMN Name_Search VARCHAR(100) NULL AFTER Name,
+    ADD INDEX idx_departments_name_search (Name_Search),
+    ADD FULLTEXT INDEX ft_departments_name_search (Name_Search) WITH PARSER ngram;
+
+-- Name_Search is filled by the application (same normalization as the search input):
+--     python code.py index-names
+-- New rows and ORM updates keep it up to date automatically.
+-- The ngram indexes assume the default ngram_token_size = 2 (NGRAM_TOKEN_SIZE in university_records/config.py).
+
+-- Record the schema version
+INSERT IGNORE INTO Schema_Version (Version, Description) VALUES (2, 'Name_Search columns and indexes');
+
+-- Verify
+SHOW INDEX FROM Lecturers WHERE Key_name LIKE '%name_search%';
+SHOW INDEX FROM Departments WHERE Key_name LIKE '%name_search%';
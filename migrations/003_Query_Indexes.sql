@@ -0,0 +1,57 @@
+-- MIGRATION 003: INDEXES FOR THE QUERY WORKLOAD
+-- Hand-written from the access paths of the core queries (INDEX_CANDIDATES in
+-- university_records/index_advisor.py), not generated by `python code.py
+-- advise-indexes`. The timings are from the advisor on SQLite - the
+-- 50,000-student benchmark database, every index applied - and were not
+-- repeated on MySQL:
+--
+-- query                                           before p50    after p50
+-- query_1_students_in_course_by_lecturer           185.00 ms    143.77 ms
+-- query_2_high_performing_final_year_students       61.56 ms     54.74 ms
+-- query_3_students_not_enrolled                    155.36 ms    119.83 ms
+-- query_6_courses_by_department                      3.90 ms      3.86 ms
+-- query_7_top_research_supervisors                   2.38 ms      2.39 ms
+-- query_10_staff_by_department                       1.77 ms      2.15 ms
+--
+-- Query 10 came out slower there. Run `python code.py advise-indexes --url <copy
+-- of production>` for MySQL numbers; after 004 it should propose nothing.
+--
+-- Most of these columns already have an index InnoDB made for their foreign
+-- key. MySQL drops such an implicit index once a named one can serve the
+-- foreign key, so this leaves the same index names as a database created by
+-- the application (the ORM models in university_records/models.py declare the same indexes).
+
+USE university_records;
+
+-- query 3: who is enrolled in a semester, answered from the index alone
+-- (replaced by idx_enrollments_term_student in 004)
+CREATE INDEX idx_enrollments_semester_student ON Course_Enrollments (Semester, Student_id);
+
+-- query 1: enrollments of one course (the primary key starts with Student_id)
+CREATE INDEX idx_enrollments_course_student ON Course_Enrollments (Course_id, Student_id);
+
+-- queries 1 and 6: joined from Courses on Course_ID first (the primary key starts with Lecturer_ID)
+CREATE INDEX idx_instructors_course_lecturer ON Course_Instructors (Course_ID, Lecturer_ID);
+
+-- query 2: final-year students
+CREATE INDEX idx_students_year ON Students (Year_of_study);
+
+-- queries 6 and 7: lecturers of a department
+CREATE INDEX idx_lecturers_department ON Lecturers (Department_ID);
+
+-- query 7: projects per supervisor
+CREATE INDEX idx_projects_investigator ON Research_Projects (Principal_Investigator);
+
+-- query 10: staff of a department
+CREATE INDEX idx_staff_department ON Non_academic_staff (Department_ID);
+
+-- Record the schema version
+INSERT IGNORE INTO Schema_Version (Version, Description) VALUES (3, 'Indexes for the query workload');
+
+-- Verify
+SHOW INDEX FROM Course_Enrollments WHERE Key_name LIKE 'idx_enrollments_%';
+SHOW INDEX FROM Course_Instructors WHERE Key_name = 'idx_instructors_course_lecturer';
+SHOW INDEX FROM Students WHERE Key_name = 'idx_students_year';
+SHOW INDEX FROM Lecturers WHERE Key_name = 'idx_lecturers_department';
+SHOW INDEX FROM Research_Projects WHERE Key_name = 'idx_projects_investigator';
+SHOW INDEX FROM Non_academic_staff WHERE Key_name = 'idx_staff_department';
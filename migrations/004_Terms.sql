@@ -0,0 +1,37 @@
+-- MIGRATION 004: TERM DIMENSION
+-- Semesters were only free text in Course_Enrollments ('Fall 2025', or 'Fall'
+-- with Academic_year '2024-2025'), so query 3 compared strings across the whole
+-- enrollment history. Terms get integer keys that sort in calendar order:
+--     Term_ID = first year of the academic year * 10 + term (1 Fall, 2 Spring, 3 Summer)
+-- e.g. Fall 2025 = 20251, Spring 2026 = 20252. Term_ID 0 is 'Unknown'.
+
+USE university_records;
+
+CREATE TABLE IF NOT EXISTS Terms (
+    Term_ID INT PRIMARY KEY,
+    Name VARCHAR(20) NOT NULL UNIQUE,
+    Start_date DATE,
+    End_date DATE,
+    Academic_year VARCHAR(10)
+) ENGINE=InnoDB;
+
+ALTER TABLE Course_Enrollments
+    ADD COLUMN Term_ID INT NULL AFTER Course_id,
+    ADD INDEX idx_enrollments_term_student (Term_ID, Student_id),
+    DROP INDEX idx_enrollments_semester_student;
+
+-- a grade belongs to one enrollment, so a course taken again can keep both grades
+ALTER TABLE Student_Grades
+    ADD COLUMN Term_ID INT NULL AFTER Course_id;
+
+-- Terms and Term_ID are filled by the application (same parsing as query 3),
+-- grades get the Term_ID of their enrollment:
+--     python code.py backfill-terms
+-- then apply 005_Partition_Enrollments.sql.
+
+-- Record the schema version
+INSERT IGNORE INTO Schema_Version (Version, Description) VALUES (4, 'Terms table and Course_Enrollments.Term_ID');
+
+-- Verify
+SHOW INDEX FROM Course_Enrollments WHERE Key_name = 'idx_enrollments_term_student';
+SHOW COLUMNS FROM Student_Grades LIKE 'Term_ID';
@@ -0,0 +1,83 @@
+-- MIGRATION 005: COURSE_ENROLLMENTS PARTITIONED BY ACADEMIC YEAR
+-- Run after `python code.py backfill-terms` - the NOT NULL changes below fail
+-- while any enrollment or grade still has no Term_ID.
+--
+-- Query 3 filters on one Term_ID, so MySQL only reads that academic year's
+-- partition however many historic years pile up.
+--
+-- MySQL partitioning rules this migration has to follow:
+--   * partitioned InnoDB tables cannot have foreign keys, or be referenced by
+--     one, so the keys to Students/Courses and from Student_Grades are dropped;
+--     the delete triggers below take over their ON DELETE CASCADE
+--   * every unique key must contain the partitioning column, so the primary
+--     key becomes (Student_id, Course_id, Term_ID) - Student_Grades gets the
+--     same key, one grade per enrollment
+-- The foreign key names below are the ones MySQL generates for the unnamed keys
+-- in Database_Tables_Creations.sql and 001_Student_Grades.sql; check them with
+-- SHOW CREATE TABLE if the tables were created differently.
+
+USE university_records;
+
+ALTER TABLE Student_Grades DROP FOREIGN KEY Student_Grades_ibfk_1;
+
+ALTER TABLE Student_Grades
+    MODIFY Term_ID INT NOT NULL DEFAULT 0,
+    DROP PRIMARY KEY,
+    ADD PRIMARY KEY (Student_id, Course_id, Term_ID);
+
+ALTER TABLE Course_Enrollments
+    DROP FOREIGN KEY Course_Enrollments_ibfk_1,
+    DROP FOREIGN KEY Course_Enrollments_ibfk_2;
+
+-- what ON DELETE CASCADE did (enrollment_cascade_triggers() in university_records/models.py)
+DELIMITER $$
+
+CREATE TRIGGER trg_course_enrollments_grades_delete AFTER DELETE ON Course_Enrollments FOR EACH ROW
+BEGIN
+    DELETE FROM Student_Grades WHERE Student_id = OLD.Student_id
+        AND Course_id = OLD.Course_id AND Term_ID = OLD.Term_ID;
+END $$
+
+CREATE TRIGGER trg_students_enrollments_delete AFTER DELETE ON Students FOR EACH ROW
+BEGIN
+    DELETE FROM Student_Grades WHERE Student_id = OLD.Student_id;
+    DELETE FROM Course_Enrollments WHERE Student_id = OLD.Student_id;
+END $$
+
+CREATE TRIGGER trg_courses_enrollments_delete AFTER DELETE ON Courses FOR EACH ROW
+BEGIN
+    DELETE FROM Student_Grades WHERE Course_id = OLD.Course_ID;
+    DELETE FROM Course_Enrollments WHERE Course_id = OLD.Course_ID;
+END $$
+
+DELIMITER ;
+
+ALTER TABLE Course_Enrollments
+    MODIFY Term_ID INT NOT NULL DEFAULT 0,
+    DROP PRIMARY KEY,
+    ADD PRIMARY KEY (Student_id, Course_id, Term_ID);
+
+-- One partition per academic year (term_partitions() in university_records/models.py, up to
+-- TERM_PARTITION_LAST_YEAR)
+ALTER TABLE Course_Enrollments PARTITION BY RANGE (Term_ID) (
+    PARTITION p2021 VALUES LESS THAN (20220),   -- older years and Term_ID 0 (unknown)
+    PARTITION p2022 VALUES LESS THAN (20230),
+    PARTITION p2023 VALUES LESS THAN (20240),
+    PARTITION p2024 VALUES LESS THAN (20250),
+    PARTITION p2025 VALUES LESS THAN (20260),
+    PARTITION p2026 VALUES LESS THAN (20270),
+    PARTITION pmax VALUES LESS THAN MAXVALUE
+);
+
+-- Before each new academic year, split it off pmax (and move TERM_PARTITION_LAST_YEAR
+-- in university_records/models.py along), e.g. for 2027-2028:
+--     ALTER TABLE Course_Enrollments REORGANIZE PARTITION pmax INTO (
+--         PARTITION p2027 VALUES LESS THAN (20280),
+--         PARTITION pmax VALUES LESS THAN MAXVALUE);
+
+-- Record the schema version
+INSERT IGNORE INTO Schema_Version (Version, Description) VALUES (5, 'Course_Enrollments partitioned by academic year');
+
+-- Verify: query 3 for Fall 2025 should list only partition p2025
+EXPLAIN SELECT DISTINCT Student_id FROM Course_Enrollments WHERE Term_ID = 20251;
+SHOW TRIGGERS WHERE `Table` IN ('Course_Enrollments', 'Students', 'Courses');
@@ -0,0 +1,140 @@
+-- MIGRATION 006: RESEARCH LEADERBOARD
+-- Query 7 used to count Research_Projects per lecturer on every run. It can now
+-- rank by projects led, team memberships or publications, overall or within a
+-- department, and reads those counts from Research_Leaderboard instead - one
+-- row per lecturer, kept up to date by the triggers below, so the top N is a
+-- range scan of an index rather than an aggregation.
+--
+-- The triggers are the same ones research_leaderboard_triggers('mysql') in
+-- university_records/models.py creates when the tables are made by the application. MySQL does not
+-- fire triggers for foreign key cascades, hence the BEFORE DELETE trigger on
+-- Research_Projects for the team members ON DELETE CASCADE removes. Counts can
+-- be recomputed at any time with `python code.py rebuild-leaderboard`.
+
+USE university_records;
+
+CREATE TABLE IF NOT EXISTS Research_Leaderboard (
+    Lecturer_ID INT PRIMARY KEY,
+    Department_ID INT,
+    Projects_led INT NOT NULL DEFAULT 0,
+    Team_memberships INT NOT NULL DEFAULT 0,
+    Publications INT NOT NULL DEFAULT 0,
+    INDEX idx_leaderboard_projects (Projects_led),
+    INDEX idx_leaderboard_team (Team_memberships),
+    INDEX idx_leaderboard_publications (Publications),
+    INDEX idx_leaderboard_department_projects (Department_ID, Projects_led),
+    INDEX idx_leaderboard_department_team (Department_ID, Team_memberships),
+    INDEX idx_leaderboard_department_publications (Department_ID, Publications)
+) ENGINE=InnoDB;
+
+DELIMITER $$
+
+CREATE TRIGGER trg_research_projects_leaderboard_insert AFTER INSERT ON Research_Projects FOR EACH ROW
+BEGIN
+    INSERT IGNORE INTO Research_Leaderboard (Lecturer_ID, Department_ID)
+        SELECT Lecturer_ID, Department_ID FROM Lecturers WHERE Lecturer_ID = NEW.Principal_Investigator;
+    UPDATE Research_Leaderboard SET Projects_led = Projects_led + 1 WHERE Lecturer_ID = NEW.Principal_Investigator;
+END $$
+
+CREATE TRIGGER trg_research_projects_leaderboard_delete AFTER DELETE ON Research_Projects FOR EACH ROW
+BEGIN
+    UPDATE Research_Leaderboard SET Projects_led = Projects_led - 1 WHERE Lecturer_ID = OLD.Principal_Investigator;
+END $$
+
+CREATE TRIGGER trg_research_projects_leaderboard_update AFTER UPDATE ON Research_Projects FOR EACH ROW
+BEGIN
+    IF NOT (OLD.Principal_Investigator <=> NEW.Principal_Investigator) THEN
+        UPDATE Research_Leaderboard SET Projects_led = Projects_led - 1 WHERE Lecturer_ID = OLD.Principal_Investigator;
+        INSERT IGNORE INTO Research_Leaderboard (Lecturer_ID, Department_ID)
+            SELECT Lecturer_ID, Department_ID FROM Lecturers WHERE Lecturer_ID = NEW.Principal_Investigator;
+        UPDATE Research_Leaderboard SET Projects_led = Projects_led + 1 WHERE Lecturer_ID = NEW.Principal_Investigator;
+    END IF;
+END $$
+
+CREATE TRIGGER trg_research_team_members_leaderboard_insert AFTER INSERT ON Research_Team_Members FOR EACH ROW
+BEGIN
+    INSERT IGNORE INTO Research_Leaderboard (Lecturer_ID, Department_ID)
+        SELECT Lecturer_ID, Department_ID FROM Lecturers WHERE Lecturer_ID = NEW.Lecturer_ID;
+    UPDATE Research_Leaderboard SET Team_memberships = Team_memberships + 1 WHERE Lecturer_ID = NEW.Lecturer_ID;
+END $$
+
+CREATE TRIGGER trg_research_team_members_leaderboard_delete AFTER DELETE ON Research_Team_Members FOR EACH ROW
+BEGIN
+    UPDATE Research_Leaderboard SET Team_memberships = Team_memberships - 1 WHERE Lecturer_ID = OLD.Lecturer_ID;
+END $$
+
+CREATE TRIGGER trg_research_team_members_leaderboard_update AFTER UPDATE ON Research_Team_Members FOR EACH ROW
+BEGIN
+    IF NOT (OLD.Lecturer_ID <=> NEW.Lecturer_ID) THEN
+        UPDATE Research_Leaderboard SET Team_memberships = Team_memberships - 1 WHERE Lecturer_ID = OLD.Lecturer_ID;
+        INSERT IGNORE INTO Research_Leaderboard (Lecturer_ID, Department_ID)
+            SELECT Lecturer_ID, Department_ID FROM Lecturers WHERE Lecturer_ID = NEW.Lecturer_ID;
+        UPDATE Research_Leaderboard SET Team_memberships = Team_memberships + 1 WHERE Lecturer_ID = NEW.Lecturer_ID;
+    END IF;
+END $$
+
+CREATE TRIGGER trg_publications_leaderboard_insert AFTER INSERT ON Publications FOR EACH ROW
+BEGIN
+    INSERT IGNORE INTO Research_Leaderboard (Lecturer_ID, Department_ID)
+        SELECT Lecturer_ID, Department_ID FROM Lecturers WHERE Lecturer_ID = NEW.Lecturer_ID;
+    UPDATE Research_Leaderboard SET Publications = Publications + 1 WHERE Lecturer_ID = NEW.Lecturer_ID;
+END $$
+
+CREATE TRIGGER trg_publications_leaderboard_delete AFTER DELETE ON Publications FOR EACH ROW
+BEGIN
+    UPDATE Research_Leaderboard SET Publications = Publications - 1 WHERE Lecturer_ID = OLD.Lecturer_ID;
+END $$
+
+CREATE TRIGGER trg_publications_leaderboard_update AFTER UPDATE ON Publications FOR EACH ROW
+BEGIN
+    IF NOT (OLD.Lecturer_ID <=> NEW.Lecturer_ID) THEN
+        UPDATE Research_Leaderboard SET Publications = Publications - 1 WHERE Lecturer_ID = OLD.Lecturer_ID;
+        INSERT IGNORE INTO Research_Leaderboard (Lecturer_ID, Department_ID)
+            SELECT Lecturer_ID, Department_ID FROM Lecturers WHERE Lecturer_ID = NEW.Lecturer_ID;
+        UPDATE Research_Leaderboard SET Publications = Publications + 1 WHERE Lecturer_ID = NEW.Lecturer_ID;
+    END IF;
+END $$
+
+-- lecturers moving department or leaving
+CREATE TRIGGER trg_lecturers_leaderboard_update AFTER UPDATE ON Lecturers FOR EACH ROW
+BEGIN
+    IF NOT (OLD.Department_ID <=> NEW.Department_ID) THEN
+        UPDATE Research_Leaderboard SET Department_ID = NEW.Department_ID WHERE Lecturer_ID = NEW.Lecturer_ID;
+    END IF;
+END $$
+
+CREATE TRIGGER trg_lecturers_leaderboard_delete AFTER DELETE ON Lecturers FOR EACH ROW
+BEGIN
+    DELETE FROM Research_Leaderboard WHERE Lecturer_ID = OLD.Lecturer_ID;
+END $$
+
+-- runs before ON DELETE CASCADE removes the project's team members
+CREATE TRIGGER trg_research_projects_leaderboard_cascade BEFORE DELETE ON Research_Projects FOR EACH ROW
+BEGIN
+    UPDATE Research_Leaderboard SET Team_memberships = Team_memberships - 1
+        WHERE Lecturer_ID IN (SELECT Lecturer_ID FROM Research_Team_Members WHERE Project_ID = OLD.Project_ID);
+END $$
+
+DELIMITER ;
+
+-- Initial counts (same as `python code.py rebuild-leaderboard`)
+INSERT INTO Research_Leaderboard (Lecturer_ID, Department_ID, Projects_led, Team_memberships, Publications)
+SELECT l.Lecturer_ID, l.Department_ID,
+       COALESCE(p.Projects_led, 0), COALESCE(t.Team_memberships, 0), COALESCE(b.Publications, 0)
+FROM Lecturers l
+LEFT JOIN (SELECT Principal_Investigator AS Lecturer_ID, COUNT(*) AS Projects_led
+           FROM Research_Projects WHERE Principal_Investigator IS NOT NULL
+           GROUP BY Principal_Investigator) p ON p.Lecturer_ID = l.Lecturer_ID
+LEFT JOIN (SELECT Lecturer_ID, COUNT(*) AS Team_memberships
+           FROM Research_Team_Members GROUP BY Lecturer_ID) t ON t.Lecturer_ID = l.Lecturer_ID
+LEFT JOIN (SELECT Lecturer_ID, COUNT(*) AS Publications
+           FROM Publications WHERE Lecturer_ID IS NOT NULL
+           GROUP BY Lecturer_ID) b ON b.Lecturer_ID = l.Lecturer_ID
+WHERE p.Lecturer_ID IS NOT NULL OR t.Lecturer_ID IS NOT NULL OR b.Lecturer_ID IS NOT NULL;
+
+-- Record the schema version
+INSERT IGNORE INTO Schema_Version (Version, Description) VALUES (6, 'Research_Leaderboard summary table and triggers');
+
+-- Verify
+SELECT * FROM Research_Leaderboard ORDER BY Projects_led DESC LIMIT 10;
+SHOW TRIGGERS WHERE `Table` IN ('Research_Projects', 'Research_Team_Members', 'Publications', 'Lecturers');
@@ -0,0 +1,65 @@
+"""Fixtures - a SQLite stand-in for the MySQL database, filled by SyntheticDataGenerator"""
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from university_records.models import Base
+from university_records.queries import DatabaseQueries
+from university_records.synthetic import SyntheticDataGenerator
+
+STUDENTS = 300
+SEED = 42
+
+
+def generated_engine(path, students=STUDENTS):
+    """A SQLite file with every table (and the triggers) made by create_all, then filled"""
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    try:
+        SyntheticDataGenerator(students=students, seed=SEED).generate(session)
+    finally:
+        session.close()
+    return engine
+
+
+@pytest.fixture(scope='session')
+def engine(tmp_path_factory):
+    """Shared read-only database - tests that write use fresh_session"""
+    engine = generated_engine(tmp_path_factory.mktemp('db') / 'university_records.db')
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def session(engine):
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.rollback()
+    session.close()
+
+
+@pytest.fixture
+def queries(session):
+    return DatabaseQueries(session)
+
+
+@pytest.fixture
+def fresh_session(tmp_path):
+    """A session on a database of its own, for tests that change data"""
+    engine = generated_engine(tmp_path / 'university_records.db', students=50)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+@pytest.fixture
+def broken_queries(tmp_path):
+    """DatabaseQueries on a database without any tables - every query goes wrong"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'empty.db'}")
+    session = sessionmaker(bind=engine)()
+    yield DatabaseQueries(session)
+    session.close()
+    engine.dispose()
@@ -0,0 +1,130 @@
+"""QueryCache and CachedDatabaseQueries - keys, LRU, TTL, row bound and invalidation"""
+
+import pytest
+from sqlalchemy import update
+
+from university_records import cache as cache_module
+from university_records.cache import WRITE_STATEMENT, CachedDatabaseQueries, QueryCache
+from university_records.models import Department
+from university_records.queries import DatabaseQueries
+from university_records.results import ResultSet
+
+
+def rows(count):
+    return ResultSet(('Id',), [(i,) for i in range(count)])
+
+
+def key(queries, name, *args, **kwargs):
+    return queries._key(name, name[len('stream_'):] if name.startswith('stream_') else name,
+                        args, kwargs)
+
+
+def test_equivalent_parameters_give_the_same_key(queries):
+    cached = CachedDatabaseQueries(queries, QueryCache())
+    name = 'query_6_courses_by_department'
+    assert key(cached, name, 'Computer Science') == key(cached, name, department_name='  computer   SCIENCE ')
+    assert key(cached, name, 'Informática') == key(cached, name, 'informatica')
+    assert key(cached, name, 'Physics') != key(cached, name, 'Chemistry')
+    # defaults are filled in, chunk_size is not part of the key, streams share the key
+    top = 'query_7_top_research_supervisors'
+    assert key(cached, top) == key(cached, top, 10, 'projects', None)
+    assert key(cached, 'stream_' + top, chunk_size=5) == key(cached, top)
+    # only names are normalized - other strings just lose extra whitespace
+    semester = 'query_3_students_not_enrolled'
+    assert key(cached, semester, ' Fall  2025') == key(cached, semester, 'Fall 2025')
+    assert key(cached, semester, 'fall 2025') != key(cached, semester, 'Fall 2025')
+    cohort = 'query_cohort_analytics'
+    assert key(cached, cohort, 4, range(50, 60, 5)) == key(cached, cohort, 4, (50, 55))
+
+
+def test_lru_eviction():
+    cache = QueryCache(max_entries=2)
+    cache.put('a', rows(1), ('Students',))
+    cache.put('b', rows(1), ('Students',))
+    assert cache.get('a')[0]                  # 'a' is now the most recently used
+    cache.put('c', rows(1), ('Students',))
+    assert cache.get('b') == (False, None)
+    assert cache.get('a')[0] and cache.get('c')[0]
+    assert cache.stats()['evictions'] == 1
+
+
+def test_row_bound():
+    cache = QueryCache(max_rows=10)
+    cache.put('big', rows(11), ('Students',))     # bigger than the whole budget - not kept
+    assert cache.stats()['entries'] == 0
+    cache.put('a', rows(6), ('Students',))
+    cache.put('b', rows(6), ('Students',))
+    assert cache.get('a') == (False, None)
+    assert cache.stats()['rows'] == 6
+
+
+def test_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, 'monotonic', lambda: now[0])
+    cache = QueryCache(ttl=60)
+    cache.put('a', rows(3), ('Students',))
+    now[0] += 59
+    assert cache.get('a')[0]
+    now[0] += 2
+    assert cache.get('a') == (False, None)
+    assert cache.stats()['entries'] == 0 and cache.stats()['rows'] == 0
+
+
+def test_invalidate_tables():
+    cache = QueryCache()
+    cache.put('students', rows(1), ('Students', 'Programs'))
+    cache.put('staff', rows(1), ('Non_academic_staff',))
+    cache.invalidate_tables('PROGRAMS')
+    assert cache.get('students') == (False, None)
+    assert cache.get('staff')[0]
+
+
+@pytest.mark.parametrize('statement, table', [
+    ('INSERT INTO Students (Name) VALUES (?)', 'Students'),
+    ('insert or ignore into "Research_Leaderboard" values (1)', 'Research_Leaderboard'),
+    ('UPDATE IGNORE `Courses` SET Credits = 5', 'Courses'),
+    ('DELETE FROM Course_Enrollments WHERE Term_ID = 0', 'Course_Enrollments'),
+    ('TRUNCATE TABLE Publications', 'Publications'),
+    ('SELECT * FROM Students', None),
+])
+def test_write_statement(statement, table):
+    match = WRITE_STATEMENT.match(statement)
+    assert (match.group(1) if match else None) == table
+
+
+def test_writes_through_a_watched_engine_invalidate(fresh_session):
+    cache = QueryCache()
+    cache.watch(fresh_session.get_bind())
+    cached = CachedDatabaseQueries(DatabaseQueries(fresh_session), cache)
+    department = fresh_session.query(Department.Name).first().Name
+    first = cached.query_10_staff_by_department(department)
+    assert cached.query_10_staff_by_department(department) is first
+    fresh_session.execute(update(Department).values(Faculty='Faculty of Science'))
+    assert cache.stats()['entries'] == 0
+
+
+def test_results_and_streams_are_cached(queries):
+    cache = QueryCache()
+    cached = CachedDatabaseQueries(queries, cache)
+    first = cached.query_2_high_performing_final_year_students(70, 4)
+    assert len(first) > 0
+    assert cached.query_2_high_performing_final_year_students(threshold=70) is first
+    streamed = list(cached.stream_query_3_students_not_enrolled('Fall 2025'))
+    assert list(cached.query_3_students_not_enrolled('Fall 2025')) == streamed
+    assert cache.stats()['hits'] == 2
+    # an empty result of a query that went right is an answer like any other
+    assert len(cached.query_6_courses_by_department('No Such Department')) == 0
+    assert cache.stats()['entries'] == 3
+
+
+def test_error_results_are_not_cached(broken_queries):
+    cache = QueryCache()
+    cached = CachedDatabaseQueries(broken_queries, cache)
+    for _ in range(2):
+        results = cached.query_3_students_not_enrolled('Fall 2025')
+        assert len(results) == 0 and results.columns
+    assert broken_queries.failures == 2
+    assert cache.stats()['entries'] == 0
+    with pytest.raises(Exception):
+        list(cached.stream_query_3_students_not_enrolled('Fall 2025'))
+    assert cache.stats()['entries'] == 0
@@ -0,0 +1,39 @@
+"""Parsing of the Students.Current_Grades text"""
+
+import pytest
+
+from university_records.models import LETTER_GRADE_PERCENT, parse_current_grades, parse_grade
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('A', 93.0),
+    (' b+ ', 87.0),
+    ('72', 72.0),
+    ('68.5', 68.5),
+    ('pass', None),
+    ('', None),
+])
+def test_parse_grade(value, expected):
+    assert parse_grade(value) == expected
+
+
+def test_parse_current_grades():
+    assert parse_current_grades('CS101: A, MATH101: 72, PHY101: c-') == [
+        ('CS101', 93.0, 'A'),
+        ('MATH101', 72.0, None),
+        ('PHY101', 70.0, 'C-'),
+    ]
+
+
+def test_parse_current_grades_without_course_codes():
+    assert parse_current_grades('B, : 64') == [(None, 83.0, 'B'), (None, 64.0, None)]
+
+
+def test_parse_current_grades_skips_what_is_not_a_grade():
+    assert parse_current_grades('CS101: incomplete, MATH101: F, , notes') == [
+        ('MATH101', float(LETTER_GRADE_PERCENT['F']), 'F')]
+
+
+@pytest.mark.parametrize('empty', [None, ''])
+def test_parse_current_grades_empty(empty):
+    assert parse_current_grades(empty) == []
@@ -0,0 +1,88 @@
+"""Core queries on the SQLite stand-in - bulk key grouping, terms and error results"""
+
+import pytest
+
+from university_records.models import Course, Department, Lecturer
+from university_records.queries import DatabaseQueries
+
+
+@pytest.fixture
+def department_names(session):
+    return [name for name, in session.query(Department.Name).order_by(Department.Department_ID)]
+
+
+@pytest.mark.parametrize('bulk, single', [
+    ('query_6_courses_by_department_bulk', 'query_6_courses_by_department'),
+    ('query_10_staff_by_department_bulk', 'query_10_staff_by_department'),
+])
+def test_bulk_by_department_matches_one_query_per_key(queries, department_names, bulk, single):
+    names = department_names + ['No Such Department']
+    results = getattr(queries, bulk)(names)
+    assert list(results) == names                      # every key, in the order asked for
+    for name in names:
+        expected = sorted(tuple(row) for row in getattr(queries, single)(name))
+        assert sorted(tuple(row)[:-1] for row in results[name]) == expected
+    assert len(results['No Such Department']) == 0
+    assert results['No Such Department'].columns
+
+
+def test_bulk_by_course_matches_one_query_per_key(queries, session):
+    codes = [code for code, in session.query(Course.Course_Code).order_by(Course.Course_ID).limit(8)]
+    asked = codes + [codes[0].lower(), 'NOPE999']     # course codes compare case-insensitively
+    results = queries.query_1_students_by_course_bulk(asked)
+    assert list(results) == asked
+    for code in codes:
+        assert sorted(results[code]) == sorted(queries.query_1_students_in_course_by_lecturer(code))
+    assert list(results[codes[0].lower()]) == list(results[codes[0]])
+    assert len(results['NOPE999']) == 0
+
+
+def test_bulk_by_lecturer_groups_overlapping_names(queries, session):
+    lecturer = session.query(Lecturer.Name).first().Name
+    surname = lecturer.split()[-1]
+    results = queries.query_1_students_by_lecturer_bulk([lecturer, surname])
+    # every lecturer the surname matches is in its group, so the full name's rows are too
+    assert set(results[lecturer]) <= set(results[surname])
+    assert sorted(tuple(row)[:-1] for row in results[lecturer]) == \
+        sorted(queries.query_1_students_in_course_by_lecturer(lecturer_name=lecturer))
+
+
+def test_bulk_error_keeps_every_key(broken_queries):
+    results = broken_queries.query_6_courses_by_department_bulk(['Physics', 'Law'])
+    assert list(results) == ['Physics', 'Law']
+    assert all(len(rows) == 0 and rows.columns for rows in results.values())
+    results = broken_queries.query_1_students_by_course_bulk(['CS101', ' ', 'CS101', 'MA101'])
+    assert list(results) == ['CS101', 'MA101']
+    assert broken_queries.failures == 2
+
+
+def test_errors_return_empty_results_with_columns(broken_queries):
+    for call in (lambda q: q.query_1_students_in_course_by_lecturer('CS101'),
+                 lambda q: q.query_2_high_performing_final_year_students(),
+                 lambda q: q.query_3_students_not_enrolled('Fall 2025'),
+                 lambda q: q.query_enrollments_by_term('Fall 2025'),
+                 lambda q: q.query_6_courses_by_department('Physics'),
+                 lambda q: q.query_7_top_research_supervisors(),
+                 lambda q: q.query_10_staff_by_department('Physics')):
+        results = call(broken_queries)
+        assert len(results) == 0 and results.columns
+    assert broken_queries.failures == 7
+
+
+@pytest.mark.parametrize('semester', ['Fall 2025', 'Spring 2024'])
+def test_term_queries_agree_before_and_after_migration_004(session, semester):
+    by_term, by_text = DatabaseQueries(session), DatabaseQueries(session, schema_version=3)
+    enrollments = by_term.query_enrollments_by_term(semester)
+    assert len(enrollments) > 0
+    assert {row.Semester for row in enrollments} == {semester}
+    assert list(enrollments) == list(by_text.query_enrollments_by_term(semester))
+    assert list(by_term.stream_query_enrollments_by_term(semester, chunk_size=7)) == list(enrollments)
+    assert sorted(by_term.query_3_students_not_enrolled(semester)) == \
+        sorted(by_text.query_3_students_not_enrolled(semester))
+
+
+def test_name_lookup_before_migration_002(session, department_names):
+    """Before Name_Search exists names are matched with LIKE on Name"""
+    current, old = DatabaseQueries(session), DatabaseQueries(session, schema_version=1)
+    for name in department_names[:3] + ['100%_sure']:
+        assert old.resolve_department_ids(name.lower()) == current.resolve_department_ids(name)
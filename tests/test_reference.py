@@ -0,0 +1,53 @@
+"""PrefixTrie and the autocomplete reference data"""
+
+from university_records.models import Course, Department, Lecturer
+from university_records.reference import PrefixTrie, ReferenceDataCache
+
+
+def test_prefix_trie():
+    trie = PrefixTrie()
+    for key, value in (('turing', 'Alan Turing'), ('tu', 'Tu Youyou'), ('tutte', 'Bill Tutte'),
+                       ('turing', 'Alan Turing'), ('hopper', 'Grace Hopper')):
+        trie.insert(key, value)
+    assert trie.search('tu') == ['Tu Youyou', 'Alan Turing', 'Bill Tutte']
+    assert trie.search('tur') == ['Alan Turing']          # stored twice, found once
+    assert trie.search('tu', limit=2) == ['Tu Youyou', 'Alan Turing']
+    assert trie.search('x') == []
+    assert sorted(trie.search('')) == ['Alan Turing', 'Bill Tutte', 'Grace Hopper', 'Tu Youyou']
+
+
+def test_refresh_and_complete(session, tmp_path):
+    reference = ReferenceDataCache(path=tmp_path / 'reference.json')
+    reference.refresh(session)
+    assert reference.get('courses') == sorted(code for code, in session.query(Course.Course_Code))
+    assert len(reference.get('lecturers')) == session.query(Lecturer).count()
+    assert reference.values['semesters'][0] == 'Fall 2025'   # latest first
+
+    department = session.query(Department.Name).first().Name
+    last_word = department.split()[-1]
+    assert department in reference.complete('departments', last_word[:3].upper())
+    assert reference.complete('departments', '   ') == []
+
+    lecturer = session.query(Lecturer.Name).first().Name
+    assert lecturer in reference.complete('lecturers', lecturer, limit=50)
+
+
+def test_semesters_before_migration_004(session, tmp_path):
+    """Without the Terms table the semesters come from the enrollments, latest first"""
+    reference = ReferenceDataCache(path=tmp_path / 'reference.json')
+    reference.refresh(session, schema_version=3)
+    semesters = reference.get('semesters')
+    assert 'Fall 2025' in semesters and 'Fall 2022' in semesters
+    assert reference.values['semesters'][0] == 'Fall 2025'
+
+
+def test_warm_start_from_file(session, tmp_path):
+    reference = ReferenceDataCache(path=tmp_path / 'reference.json')
+    reference.refresh(session)
+    reference.save()
+    warm = ReferenceDataCache(path=tmp_path / 'reference.json')
+    assert warm.load_file()
+    assert warm.get('courses') == reference.get('courses')
+    assert warm.complete('courses', reference.get('courses')[0]) == \
+        reference.complete('courses', reference.get('courses')[0])
+    assert not ReferenceDataCache(path=tmp_path / 'missing.json').load_file()
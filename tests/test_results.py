@@ -0,0 +1,81 @@
+"""ResultSet - columnar storage, slicing and sorting"""
+
+from array import array
+
+import pytest
+
+from university_records.results import ResultSet
+
+COLUMNS = ('Name', 'Year_of_study', 'Average_Grade', 'Department')
+ROWS = [
+    ('Ada', 3, 81.5, 'Mathematics'),
+    ('Brian', 1, 64.0, 'Physics'),
+    ('Chen', 4, 90.25, 'Mathematics'),
+    ('Dana', 2, None, 'Physics'),
+    ('Eve', 4, 72.0, 'Mathematics'),
+]
+
+
+@pytest.fixture
+def results():
+    return ResultSet(COLUMNS, ROWS)
+
+
+def test_rows_read_back_as_named_tuples(results):
+    assert len(results) == 5
+    assert list(results) == ROWS
+    assert results[0].Name == 'Ada'
+    assert results[-1]._fields == COLUMNS
+    assert results.dicts()[1] == dict(zip(COLUMNS, ROWS[1]))
+    with pytest.raises(IndexError):
+        results[5]
+
+
+def test_columns_are_stored_compactly(results):
+    assert isinstance(results._data[1], array)      # whole numbers
+    assert isinstance(results._data[2], list)       # floats with a NULL
+    departments = results.column('Department')
+    assert departments[0] is departments[2]         # repeated values are stored once
+    assert list(results.column('Year_of_study')) == [3, 1, 4, 2, 4]
+
+
+def test_slices_are_views(results):
+    page = results[1:4]
+    assert isinstance(page, ResultSet)
+    assert list(page) == ROWS[1:4]
+    assert page._data is results._data
+    assert list(page[1:]) == ROWS[2:4]
+    assert page[-1] == ROWS[3]
+    assert list(page.column('Name')) == ['Brian', 'Chen', 'Dana']
+    assert len(results[4:2]) == 0
+    assert list(results[::2]) == ROWS[::2]
+    with pytest.raises(ValueError):
+        page.extend([ROWS[0]])
+
+
+def test_sorted_by(results):
+    assert [row.Name for row in results.sorted_by('Year_of_study')] == \
+        ['Brian', 'Dana', 'Ada', 'Chen', 'Eve']
+    assert [row.Name for row in results.sorted_by('Name', reverse=True)] == \
+        ['Eve', 'Dana', 'Chen', 'Brian', 'Ada']
+    by_grade = results.sorted_by('Average_Grade', key=lambda grade: (grade is None, grade or 0))
+    assert [row.Name for row in by_grade] == ['Brian', 'Eve', 'Ada', 'Chen', 'Dana']
+    # sorting a slice sorts only its rows and leaves the original alone
+    assert [row.Name for row in results[2:].sorted_by('Name', reverse=True)] == ['Eve', 'Dana', 'Chen']
+    assert list(results) == ROWS
+
+
+def test_extend_keeps_column_types_consistent():
+    results = ResultSet(('Id', 'Score'), [(1, 2), (2, 3)])
+    results.extend([(3, 4.5), (None, 5)])
+    assert list(results) == [(1, 2), (2, 3), (3, 4.5), (None, 5)]
+    results.extend([{'Score': 6, 'Id': 4}])
+    assert results[-1] == (4, 6)
+
+
+def test_of_and_empty_results():
+    assert ResultSet.of([{'a': 1, 'b': 'x'}, {'a': 2, 'b': 'y'}]).columns == ('a', 'b')
+    empty = ResultSet(COLUMNS)
+    assert len(empty) == 0 and list(empty) == [] and empty.columns == COLUMNS
+    assert list(empty.sorted_by('Name')) == []
+    assert len(ResultSet.of([])) == 0
@@ -0,0 +1,48 @@
+"""Term_ID encoding and parsing"""
+
+import pytest
+
+from university_records.models import parse_term, term_details, term_id, term_partitions
+
+
+def test_term_id_orders_terms_by_calendar():
+    assert term_id('Fall', 2025) == 20251
+    assert term_id('spring', 2025) == 20252
+    assert term_id('SUMMER', 2025) == 20253
+    assert term_id('Winter', 2025) is None
+    assert term_id('Fall', 2024) < term_id('Spring', 2024) < term_id('Summer', 2024) \
+        < term_id('Fall', 2025)
+
+
+@pytest.mark.parametrize('semester, academic_year, expected', [
+    ('Fall 2025', None, 20251),
+    ('Spring 2026', None, 20252),   # spring belongs to the academic year that started the fall before
+    ('Summer 2026', None, 20253),
+    ('  fall   2023 ', None, 20231),
+    ('Fall', '2024-2025', 20241),
+    ('Spring', '2024-2025', 20242),
+    ('Fall', None, None),
+    ('Fall', 'unknown', None),
+    ('Autumn 2025', None, None),
+    ('2025', None, None),
+    ('', None, None),
+    (None, None, None),
+])
+def test_parse_term(semester, academic_year, expected):
+    assert parse_term(semester, academic_year) == expected
+
+
+def test_term_details_round_trip():
+    for semester in ('Fall 2025', 'Spring 2026', 'Summer 2026'):
+        details = term_details(parse_term(semester))
+        assert details['Name'] == semester
+        assert details['Academic_year'] == '2025-2026'
+        assert details['Start_date'] < details['End_date']
+    assert term_details(0)['Name'] == 'Unknown'
+
+
+def test_term_partitions_cover_every_academic_year():
+    clause = term_partitions(2022, 2024)
+    assert clause.startswith('RANGE (Term_ID) (PARTITION p2021 VALUES LESS THAN (20220)')
+    assert 'PARTITION p2023 VALUES LESS THAN (20240)' in clause
+    assert clause.endswith('PARTITION pmax VALUES LESS THAN MAXVALUE)')
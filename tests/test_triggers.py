@@ -0,0 +1,75 @@
+"""Triggers create_all adds on SQLite - the research leaderboard and the enrollment cascades"""
+
+from sqlalchemy import delete, insert, select, update
+
+from university_records.models import (
+    CourseEnrollment, Lecturer, Publication, ResearchLeaderboard, ResearchProject,
+    ResearchTeamMember, Student, StudentGrade, rebuild_research_leaderboard,
+    research_leaderboard_counts
+)
+
+
+def leaderboard(session):
+    """Research_Leaderboard without the lecturers whose counts all went back to 0"""
+    table = ResearchLeaderboard.__table__
+    return sorted(tuple(row) for row in session.execute(select(table)).all() if any(row[2:]))
+
+
+def counted(session):
+    return sorted(tuple(row) for row in session.execute(research_leaderboard_counts()).all())
+
+
+def test_generated_data_is_counted(fresh_session):
+    assert leaderboard(fresh_session) == counted(fresh_session)
+    assert leaderboard(fresh_session)
+
+
+def test_inserts_updates_and_deletes_move_the_counts(fresh_session):
+    session = fresh_session
+    lecturers = [lecturer_id for lecturer_id, in session.query(Lecturer.Lecturer_ID).limit(3)]
+    project = session.execute(insert(ResearchProject).values(
+        Title='Leaderboard test', Principal_Investigator=lecturers[0])).inserted_primary_key[0]
+    session.execute(insert(ResearchTeamMember).values(
+        [{'Project_ID': project, 'Lecturer_ID': lecturer_id} for lecturer_id in lecturers[1:]]))
+    session.execute(insert(Publication).values(Title='Paper', Lecturer_ID=lecturers[2]))
+    assert leaderboard(session) == counted(session)
+
+    session.execute(update(ResearchProject).where(ResearchProject.Project_ID == project)
+                    .values(Principal_Investigator=lecturers[1]))
+    session.execute(update(Publication).where(Publication.Title == 'Paper')
+                    .values(Lecturer_ID=None))
+    session.execute(update(Lecturer).where(Lecturer.Lecturer_ID == lecturers[1])
+                    .values(Department_ID=None))
+    assert leaderboard(session) == counted(session)
+
+    session.execute(delete(ResearchTeamMember).where(ResearchTeamMember.Project_ID == project))
+    session.execute(delete(ResearchProject).where(ResearchProject.Project_ID == project))
+    session.execute(delete(Lecturer).where(Lecturer.Lecturer_ID == lecturers[2]))
+    assert leaderboard(session) == counted(session)
+
+
+def test_rebuild_matches_the_triggers(fresh_session):
+    before = leaderboard(fresh_session)
+    rebuild_research_leaderboard(fresh_session)
+    assert leaderboard(fresh_session) == before
+
+
+def test_deleting_an_enrollment_deletes_its_grade(fresh_session):
+    session = fresh_session
+    grade = session.query(StudentGrade).first()
+    key = (grade.Student_id, grade.Course_id, grade.Term_ID)
+    session.expunge(grade)
+    session.execute(delete(CourseEnrollment).where(
+        CourseEnrollment.Student_id == key[0], CourseEnrollment.Course_id == key[1],
+        CourseEnrollment.Term_ID == key[2]))
+    assert session.get(StudentGrade, key) is None
+
+
+def test_deleting_a_student_deletes_enrollments_and_grades(fresh_session):
+    session = fresh_session
+    student_id = session.query(StudentGrade.Student_id).first().Student_id
+    others = session.query(CourseEnrollment).filter(CourseEnrollment.Student_id != student_id).count()
+    session.execute(delete(Student).where(Student.Student_id == student_id))
+    assert session.query(CourseEnrollment).filter(CourseEnrollment.Student_id == student_id).count() == 0
+    assert session.query(StudentGrade).filter(StudentGrade.Student_id == student_id).count() == 0
+    assert session.query(CourseEnrollment).count() == others
@@ -0,0 +1,4 @@
+"""University Records Management System - database layer, queries and command line tools
+
+The GUI and the command line entry point are in code.py.
+"""
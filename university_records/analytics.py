@@ -0,0 +1,187 @@
+"""Cohort grade analytics and the local analytics snapshot"""
+
+import time
+import sqlalchemy
+from sqlalchemy import create_engine, text
+import os
+
+from .config import ANALYTICS_MAX_AGE_SECONDS, ANALYTICS_SNAPSHOT_FILE, STREAM_CHUNK_SIZE
+from .models import Base, Program, ResearchLeaderboard, Student, StudentGrade, parse_current_grades
+
+
+# COHORT ANALYTICS
+class GradeCohort:
+    """Grades for a whole cohort held as columnar NumPy arrays
+
+    Per-student columns (student_ids, program_ids, years) line up with offsets;
+    the grades of student i are values[offsets[i]:offsets[i + 1]]. Everything
+    below works on whole arrays - there are no per-student Python loops.
+    """
+    def __init__(self, student_ids, program_ids, years, offsets, values, program_names):
+        self.student_ids = student_ids
+        self.program_ids = program_ids
+        self.years = years
+        self.offsets = offsets
+        self.values = values
+        self.program_names = program_names
+
+    @classmethod
+    def load(cls, session, year=None):
+        """Load every graded student (optionally one year of study) in one pass"""
+        import numpy as np  # optional dependency, only needed for analytics
+
+        rows = []
+        # before migration 001 there is no Student_Grades table to join at all
+        if sqlalchemy.inspect(session.connection()).has_table(StudentGrade.__tablename__):
+            query = session.query(
+                Student.Student_id, Student.Program_id, Student.Year_of_study, StudentGrade.Grade
+            ).join(StudentGrade, StudentGrade.Student_id == Student.Student_id)
+            if year:
+                query = query.filter(Student.Year_of_study == year)
+            rows = query.order_by(Student.Student_id).all()
+
+        if rows:
+            student_col, program_col, year_col, grade_col = zip(*rows)
+            student_col = np.asarray(student_col, dtype=np.int64)
+            grades = np.asarray(grade_col, dtype=np.float64)
+            # rows are sorted by student - each new id starts a new ragged segment
+            starts = np.flatnonzero(np.r_[True, student_col[1:] != student_col[:-1]])
+            program_ids = np.asarray([p or 0 for p in program_col], dtype=np.int64)[starts]
+            years = np.asarray([y or 0 for y in year_col], dtype=np.int64)[starts]
+            student_ids = student_col[starts]
+            offsets = np.r_[starts, len(grades)].astype(np.int64)
+        else:
+            # Student_Grades missing or not filled yet - fall back to the Current_Grades text
+            student_ids, program_ids, years, offsets, grades = cls._parse_current_grades(
+                session, year, np)
+
+        program_names = dict(session.query(Program.Program_ID, Program.Name).all())
+        return cls(student_ids, program_ids, years, offsets, grades, program_names)
+
+    @staticmethod
+    def _parse_current_grades(session, year, np):
+        query = session.query(
+            Student.Student_id, Student.Program_id, Student.Year_of_study, Student.Current_Grades
+        ).filter(Student.Current_Grades.isnot(None))
+        if year:
+            query = query.filter(Student.Year_of_study == year)
+
+        student_ids, program_ids, years, counts, values = [], [], [], [], []
+        for student_id, program_id, year_of_study, current_grades in query.yield_per(STREAM_CHUNK_SIZE):
+            grades = [percent for _, percent, _ in parse_current_grades(current_grades)]
+            if not grades:
+                continue
+            student_ids.append(student_id)
+            program_ids.append(program_id or 0)
+            years.append(year_of_study or 0)
+            counts.append(len(grades))
+            values.extend(grades)
+
+        offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        return (np.asarray(student_ids, dtype=np.int64), np.asarray(program_ids, dtype=np.int64),
+                np.asarray(years, dtype=np.int64), offsets, np.asarray(values, dtype=np.float64))
+
+    def __len__(self):
+        return len(self.student_ids)
+
+    def student_averages(self):
+        """Average grade of every student"""
+        import numpy as np
+        if not len(self):
+            return np.zeros(0)
+        counts = np.diff(self.offsets)
+        return np.add.reduceat(self.values, self.offsets[:-1]) / counts
+
+    def program_averages(self):
+        """{program name: (student count, mean of student averages)}"""
+        import numpy as np
+        averages = self.student_averages()
+        programs, index = np.unique(self.program_ids, return_inverse=True)
+        totals = np.bincount(index, weights=averages)
+        sizes = np.bincount(index)
+        return {
+            self.program_names.get(int(program), 'No Program'): (int(size), float(total / size))
+            for program, total, size in zip(programs, totals, sizes)
+        }
+
+    def percentiles(self, points=(10, 25, 50, 75, 90)):
+        """{percentile: student average at that percentile}"""
+        import numpy as np
+        averages = self.student_averages()
+        if not len(averages):
+            return {}
+        return dict(zip(points, np.percentile(averages, points).tolist()))
+
+    def histogram(self, bins=range(0, 101, 10)):
+        """[(low, high, number of grades)] over every individual grade"""
+        import numpy as np
+        bins = np.asarray(list(bins), dtype=np.float64)
+        counts, edges = np.histogram(self.values, bins=bins)
+        return [(float(low), float(high), int(count))
+                for low, high, count in zip(edges[:-1], edges[1:], counts)]
+
+    def threshold_sweep(self, thresholds=range(50, 95, 5)):
+        """[(threshold, number of students whose average is above it)]"""
+        import numpy as np
+        averages = np.sort(self.student_averages())
+        thresholds = np.asarray(list(thresholds), dtype=np.float64)
+        above = len(averages) - np.searchsorted(averages, thresholds, side='right')
+        return [(float(t), int(n)) for t, n in zip(thresholds, above)]
+
+# ANALYTICS SNAPSHOT
+def analytics_snapshot_url(path=ANALYTICS_SNAPSHOT_FILE, max_age=ANALYTICS_MAX_AGE_SECONDS):
+    """SQLite URL of the analytics snapshot, or None if it is missing or too old"""
+    if not os.path.exists(path):
+        return None
+    age = time.time() - os.path.getmtime(path)
+    if age > max_age:
+        print(f"Analytics snapshot is {age / 3600:.0f} hours old - using the main database")
+        return None
+    return f"sqlite:///{path}"
+
+
+def create_analytics_snapshot(engine, path=ANALYTICS_SNAPSHOT_FILE, chunk_size=STREAM_CHUNK_SIZE):
+    """Copy every table into a local SQLite file for the aggregate queries
+
+    Rows are streamed from the source chunk_size at a time and written to a
+    temporary file that replaces the old snapshot only once it is complete,
+    so a running GUI never sees a half-written snapshot.
+    """
+    temporary = f"{path}.tmp"
+    if os.path.exists(temporary):
+        os.remove(temporary)
+    snapshot = create_engine(f"sqlite:///{temporary}", echo=False)
+    Base.metadata.create_all(snapshot)
+
+    counts = {}
+    started = time.perf_counter()
+    try:
+        with engine.connect() as source, snapshot.begin() as target:
+            for table in Base.metadata.sorted_tables:
+                if table is ResearchLeaderboard.__table__:
+                    # the snapshot's own triggers fill it as the research tables are copied
+                    continue
+                try:
+                    result = source.execution_options(stream_results=True, yield_per=chunk_size
+                                                      ).execute(table.select())
+                except Exception as e:
+                    # e.g. Student_Grades before migrate-grades has been run
+                    print(f"Skipping {table.name}: {e}")
+                    source.rollback()
+                    continue
+                counts[table.name] = 0
+                for rows in result.mappings().partitions(chunk_size):
+                    target.execute(table.insert(), [dict(row) for row in rows])
+                    counts[table.name] += len(rows)
+                print(f"  {table.name}: {counts[table.name]:,} rows")
+            # planner statistics for the aggregate queries
+            target.execute(text("ANALYZE"))
+    finally:
+        snapshot.dispose()
+
+    os.replace(temporary, path)
+    elapsed = time.perf_counter() - started
+    total = sum(counts.values())
+    print(f"Analytics snapshot written to {path}: {total:,} rows in {elapsed:.1f}s")
+    return counts
@@ -0,0 +1,122 @@
+"""Parallel runs of the queries over many parameter sets - python code.py batch"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+import json
+import os
+import re
+
+from .config import QUERY_WORKERS
+from .models import Course, Department, Term, UNKNOWN_TERM_ID
+from .instrumentation import InstrumentedDatabaseQueries, QueryInstrumentation
+from .benchmark import _percentile
+from .export import export_rows, _json_default
+
+
+# BATCH RUNNER
+# where each query's parameter sets come from when none are given: (source, parameter)
+BATCH_PARAMETER_SOURCES = {
+    'query_1_students_in_course_by_lecturer': ('courses', 'course_code'),
+    'query_3_students_not_enrolled': ('terms', 'semester'),
+    'query_enrollments_by_term': ('terms', 'semester'),
+    'query_6_courses_by_department': ('departments', 'department_name'),
+    'query_7_top_research_supervisors': ('departments', 'department_name'),
+    'query_10_staff_by_department': ('departments', 'department_name'),
+}
+
+
+def batch_parameter_values(session, source):
+    """Every value of a parameter source - all course codes, department names or terms"""
+    if source == 'courses':
+        query = session.query(Course.Course_Code).order_by(Course.Course_Code)
+    elif source == 'departments':
+        query = session.query(Department.Name).order_by(Department.Name)
+    elif source == 'terms':
+        query = session.query(Term.Name).filter(Term.Term_ID != UNKNOWN_TERM_ID).order_by(Term.Term_ID)
+    else:
+        raise ValueError(f"Unknown parameter source: {source}")
+    return [row[0] for row in query.distinct().all()]
+
+
+class BatchRunner:
+    """Runs DatabaseQueries methods for many parameter sets on a bounded thread pool
+
+    Every task gets its own session from the DatabaseManager and streams its
+    rows straight to one file per parameter set under output_dir. The query
+    methods swallow database errors, so each task runs instrumented and the
+    recorded error decides whether it failed.
+    """
+    def __init__(self, database, output_dir, workers=QUERY_WORKERS, fmt='jsonl'):
+        self.database = database
+        self.output_dir = output_dir
+        self.workers = workers
+        self.fmt = fmt
+        self.instrumentation = QueryInstrumentation()
+
+    def tasks_for(self, query_name, params=None):
+        """(query, params) tasks - every value of the query's source unless params are given"""
+        if params is not None:
+            return [(query_name, dict(p)) for p in params]
+        if query_name not in BATCH_PARAMETER_SOURCES:
+            return [(query_name, {})]
+        source, parameter = BATCH_PARAMETER_SOURCES[query_name]
+        with self.database.session_scope(read_only=True) as session:
+            values = batch_parameter_values(session, source)
+        return [(query_name, {parameter: value}) for value in values]
+
+    def run(self, tasks):
+        self.instrumentation.watch(*self.database.engines())
+        started = time.perf_counter()
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers,
+                                    thread_name_prefix='batch-worker') as executor:
+                results = list(executor.map(lambda task: self._run_task(*task), tasks))
+        finally:
+            self.instrumentation.unwatch()
+        summary = self.summarize(results, time.perf_counter() - started)
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        with open(os.path.join(self.output_dir, 'summary.json'), 'w', encoding='utf-8') as f:
+            json.dump({'summary': summary, 'tasks': results}, f, indent=2, default=_json_default)
+        return summary, results
+
+    def _run_task(self, query_name, params):
+        directory = os.path.join(self.output_dir, query_name)
+        os.makedirs(directory, exist_ok=True)
+        slug = '_'.join(re.sub(r'\W+', '-', str(value)).strip('-') for value in params.values())
+        path = os.path.join(directory, f"{slug or 'all'}.{self.fmt}")
+
+        result = {'query': query_name, 'params': params, 'path': path, 'rows': 0, 'error': None}
+        started = time.perf_counter()
+        try:
+            with self.database.queries() as queries:
+                instrumented = InstrumentedDatabaseQueries(queries, self.instrumentation)
+                rows = getattr(instrumented, f"stream_{query_name}")(**params)
+                result['rows'] = export_rows(rows, path, self.fmt)
+            result['error'] = self.instrumentation.last_record()['error']
+        except Exception as e:
+            result['error'] = str(e)
+        result['seconds'] = round(time.perf_counter() - started, 3)
+        status = f"ERROR {result['error']}" if result['error'] else f"{result['rows']:,} rows"
+        print(f"  {query_name} {params}: {status} ({result['seconds']:.2f}s)")
+        return result
+
+    @staticmethod
+    def summarize(results, elapsed):
+        """Throughput, latency and error counts over all tasks"""
+        seconds = sorted(result['seconds'] for result in results)
+        errors = [result for result in results if result['error']]
+        rows = sum(result['rows'] for result in results)
+        return {
+            'tasks': len(results),
+            'succeeded': len(results) - len(errors),
+            'failed': len(errors),
+            'rows': rows,
+            'elapsed_seconds': round(elapsed, 3),
+            'tasks_per_second': round(len(results) / elapsed, 2) if elapsed else 0.0,
+            'rows_per_second': round(rows / elapsed, 1) if elapsed else 0.0,
+            'p50_task_seconds': _percentile(seconds, 50),
+            'p95_task_seconds': _percentile(seconds, 95),
+            'errors': {result['query'] + ' ' + json.dumps(result['params']): result['error']
+                       for result in errors},
+        }
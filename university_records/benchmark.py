@@ -0,0 +1,224 @@
+"""Query benchmarks at several data scales - python code.py benchmark"""
+
+import time
+import sqlalchemy
+from sqlalchemy import func
+from datetime import datetime
+import gc
+import os
+import sys
+import tempfile
+import tracemalloc
+
+from .config import BENCHMARK_REPEATS, BENCHMARK_SCALES, CALL_OVERHEAD_CALLS
+from .models import (
+    CURRENT_SEMESTER, Course, CourseInstructor, Department, Lecturer, Student,
+    check_schema_version
+)
+from .database import DatabaseManager
+from .synthetic import SyntheticDataGenerator
+
+
+# BENCHMARKS
+BENCHMARK_REGRESSION_TOLERANCE = 0.25   # p50 may get this much slower before it counts as a regression
+
+
+def _percentile(sorted_values, percent):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, round(percent / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def benchmark_parameters(session):
+    """Realistic parameters for each core query, taken from the data itself"""
+    course_code, lecturer_name = session.query(Course.Course_Code, Lecturer.Name).join(
+        CourseInstructor, Course.Course_ID == CourseInstructor.Course_ID
+    ).join(Lecturer, CourseInstructor.Lecturer_ID == Lecturer.Lecturer_ID).first() or ('CS101', 'Alan')
+    department = session.query(Department.Name).order_by(Department.Department_ID).limit(1).scalar() \
+        or 'Computer Science'
+    return {
+        'query_1_students_in_course_by_lecturer': {'course_code': course_code,
+                                                   'lecturer_name': lecturer_name.split()[-1]},
+        'query_2_high_performing_final_year_students': {},
+        'query_3_students_not_enrolled': {'semester': CURRENT_SEMESTER},
+        'query_6_courses_by_department': {'department_name': department},
+        'query_7_top_research_supervisors': {'limit': 10},
+        'query_10_staff_by_department': {'department_name': department},
+    }
+
+
+class QueryBenchmark:
+    """Times the core DatabaseQueries methods against databases of several sizes
+
+    Each scale gets its own database: an embedded SQLite file by default, or
+    url_template (e.g. 'mysql+pymysql://root:pw@localhost/bench_{scale}') for
+    a local MySQL. Empty databases are filled by SyntheticDataGenerator first.
+    """
+    def __init__(self, scales=BENCHMARK_SCALES, repeats=BENCHMARK_REPEATS, url_template=None,
+                 work_dir=None, seed=42):
+        self.scales = scales
+        self.repeats = repeats
+        self.url_template = url_template
+        self.work_dir = work_dir or tempfile.gettempdir()
+        self.seed = seed
+
+    def _database(self, scale):
+        if self.url_template:
+            url = self.url_template.format(scale=scale)
+        else:
+            url = f"sqlite:///{os.path.join(self.work_dir, f'urms_bench_{scale}.db')}"
+        database = DatabaseManager(url)
+        with database.session_scope() as session:
+            check_schema_version(session)
+            populated = session.query(func.count(Student.Student_id)).scalar()
+        if not populated:
+            print(f"Generating data for scale {scale:,}...")
+            with database.session_scope() as session:
+                SyntheticDataGenerator(students=scale, seed=self.seed).generate(session)
+        return database
+
+    def run(self):
+        """Run every query at every scale - returns the machine-readable results"""
+        results = []
+        dialect = None
+        for scale in self.scales:
+            database = self._database(scale)
+            dialect = database.engine.dialect.name
+            with database.session_scope() as session:
+                parameters = benchmark_parameters(session)
+            for query_name, params in parameters.items():
+                result = self.time_query(database, query_name, params)
+                result['scale'] = scale
+                results.append(result)
+                print(f"  scale {scale:>9,}  {query_name:<45} p50 {result['p50_ms']:8.2f} ms  "
+                      f"rows {result['rows']:>8,}  peak {result['peak_kb']:,.0f} KB")
+            database.dispose()
+
+        return {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'database': dialect,
+            'python': sys.version.split()[0],
+            'sqlalchemy': sqlalchemy.__version__,
+            'repeats': self.repeats,
+            'results': results,
+        }
+
+    def time_query(self, database, query_name, params):
+        """Cold latency, warm percentiles, rows/sec and peak memory of one query"""
+        # cold: brand new connections, nothing cached by the driver or pool
+        database.engine.dispose()
+        cold_ms, rows = self._call(database, query_name, params)
+
+        warm = []
+        for _ in range(self.repeats):
+            elapsed_ms, rows = self._call(database, query_name, params)
+            warm.append(elapsed_ms)
+        warm.sort()
+
+        # peak Python memory, in a separate run because tracing slows everything down
+        tracemalloc.start()
+        try:
+            self._call(database, query_name, params)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+        p50 = _percentile(warm, 50)
+        return {
+            'query': query_name,
+            'cold_ms': round(cold_ms, 3),
+            'p50_ms': round(p50, 3),
+            'p95_ms': round(_percentile(warm, 95), 3),
+            'p99_ms': round(_percentile(warm, 99), 3),
+            'max_ms': round(warm[-1], 3),
+            'rows': rows,
+            'rows_per_sec': round(rows / (p50 / 1000), 1) if p50 else 0.0,
+            'peak_kb': round(peak / 1024, 1),
+        }
+
+    def _call(self, database, query_name, params):
+        with database.queries() as queries:
+            started = time.perf_counter()
+            results = getattr(queries, query_name)(**params)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+        return elapsed_ms, len(results)
+
+
+def compare_benchmarks(current, baseline, tolerance=BENCHMARK_REGRESSION_TOLERANCE):
+    """List the (scale, query) pairs whose p50 got slower than baseline by more than tolerance"""
+    previous = {(r['scale'], r['query']): r for r in baseline.get('results', [])}
+    regressions = []
+    for result in current['results']:
+        before = previous.get((result['scale'], result['query']))
+        if before is None:
+            continue
+        # ignore sub-millisecond noise
+        if result['p50_ms'] > before['p50_ms'] * (1 + tolerance) and \
+                result['p50_ms'] - before['p50_ms'] > 1.0:
+            regressions.append({'scale': result['scale'], 'query': result['query'],
+                                'baseline_p50_ms': before['p50_ms'], 'p50_ms': result['p50_ms']})
+    return regressions
+
+
+def measure_call_overhead(database, calls=CALL_OVERHEAD_CALLS, warmup=20):
+    """Mean microseconds per call of each core query, all calls on one open session
+
+    Unlike QueryBenchmark this leaves out connection checkout and commit, so on
+    queries returning a handful of rows (6, 7 and 10) what is left is mostly the
+    cost of building, compiling and executing the statement and wrapping the rows.
+    """
+    results = {}
+    with database.queries() as queries:
+        parameters = benchmark_parameters(queries.session)
+        for query_name, params in parameters.items():
+            method = getattr(queries, query_name)
+            for _ in range(warmup):
+                rows = len(method(**params))
+            started = time.perf_counter()
+            for _ in range(calls):
+                method(**params)
+            per_call_us = (time.perf_counter() - started) / calls * 1e6
+            results[query_name] = {'rows': rows, 'us_per_call': round(per_call_us, 1)}
+    return results
+
+
+def _retained_bytes(build):
+    """Python memory still held by what build() returns, measured with tracemalloc"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = build()
+        gc.collect()
+        retained = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return retained, len(result)
+
+
+def measure_result_memory(database, per_rows=100000):
+    """Memory per per_rows rows of each core query as SQLAlchemy Rows, dicts and a ResultSet
+
+    Rows is what the queries used to return, dicts what query 2 and the HTTP
+    service used to build. Every query runs once beforehand so statement
+    compilation is not counted.
+    """
+    results = {}
+    with database.queries() as queries:
+        parameters = benchmark_parameters(queries.session)
+        parameters['query_enrollments_by_term'] = {'semester': CURRENT_SEMESTER}
+        for query_name, params in parameters.items():
+            method = getattr(queries, query_name)
+            stream = getattr(queries, f"stream_{query_name}")
+            method(**params)
+            sizes = {
+                'rows': _retained_bytes(lambda: list(stream(**params))),
+                'dicts': _retained_bytes(lambda: [row._asdict() for row in stream(**params)]),
+                'result_set': _retained_bytes(lambda: method(**params)),
+            }
+            count = sizes['result_set'][1]
+            results[query_name] = {'rows': count}
+            for kind, (retained, _) in sizes.items():
+                results[query_name][f'{kind}_bytes'] = round(retained / count * per_rows) if count else 0
+    return results
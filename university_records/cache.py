@@ -0,0 +1,200 @@
+"""Result cache for the core queries"""
+
+import time
+from sqlalchemy import event
+from collections import OrderedDict
+import inspect
+import re
+import threading
+
+from .config import CACHE_MAX_ENTRIES, CACHE_MAX_ROWS, CACHE_TTL_SECONDS
+from .models import normalize_name
+from .results import ResultSet
+from .queries import DatabaseQueries
+
+
+# RESULT CACHE
+# tables each cached DatabaseQueries method reads - a write to any of them drops its entries
+QUERY_TABLES = {
+    'query_1_students_in_course_by_lecturer': ('Students', 'Course_Enrollments', 'Courses',
+                                               'Course_Instructors', 'Lecturers'),
+    'query_2_high_performing_final_year_students': ('Students', 'Programs', 'Student_Grades'),
+    'query_3_students_not_enrolled': ('Students', 'Course_Enrollments', 'Programs'),
+    'query_enrollments_by_term': ('Students', 'Course_Enrollments', 'Courses'),
+    'query_6_courses_by_department': ('Courses', 'Course_Instructors', 'Lecturers', 'Departments'),
+    'query_7_top_research_supervisors': ('Lecturers', 'Research_Projects', 'Departments',
+                                         'Research_Team_Members', 'Publications',
+                                         'Research_Leaderboard'),
+    'query_10_staff_by_department': ('Non_academic_staff', 'Departments'),
+    'query_cohort_analytics': ('Students', 'Student_Grades', 'Programs'),
+    # get_available_courses/lecturers return plain values, which QueryCache does not hold -
+    # the ReferenceDataCache keeps those
+}
+
+# first table written by INSERT / UPDATE / DELETE / REPLACE / TRUNCATE / ALTER statements
+WRITE_STATEMENT = re.compile(
+    r'^\s*(?:INSERT\s+(?:IGNORE\s+|OR\s+\w+\s+)?INTO|REPLACE\s+INTO|UPDATE(?:\s+IGNORE)?|'
+    r'DELETE\s+FROM|TRUNCATE(?:\s+TABLE)?|ALTER\s+TABLE)\s+[`"]?(\w+)',
+    re.IGNORECASE
+)
+
+
+class QueryCache:
+    """LRU cache of query results with a TTL, a row bound and per-table invalidation
+
+    Shared by every worker thread, so all access goes through a lock. Results
+    are kept as ResultSets, which nobody modifies, so hits can hand out the
+    cached object itself.
+    """
+    def __init__(self, ttl=CACHE_TTL_SECONDS, max_entries=CACHE_MAX_ENTRIES,
+                 max_rows=CACHE_MAX_ROWS):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_rows = max_rows
+        self.entries = OrderedDict()   # key -> (expires_at, tables, results), oldest first
+        self.rows = 0
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        """Return (True, results) on a hit, (False, None) on a miss"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] < time.monotonic():
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return False, None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return True, entry[2]
+
+    def put(self, key, results, tables):
+        # a single result bigger than the whole budget is not worth keeping
+        if len(results) > self.max_rows:
+            return
+        with self.lock:
+            if key in self.entries:
+                self._remove(key)
+            self.entries[key] = (time.monotonic() + self.ttl, frozenset(t.lower() for t in tables),
+                                 ResultSet.of(results))
+            self.rows += len(results)
+            while len(self.entries) > self.max_entries or self.rows > self.max_rows:
+                self._remove(next(iter(self.entries)))
+                self.evictions += 1
+
+    def invalidate_tables(self, *tables):
+        """Drop every entry that reads one of tables"""
+        written = {table.lower() for table in tables}
+        with self.lock:
+            for key in [key for key, entry in self.entries.items() if entry[1] & written]:
+                self._remove(key)
+                self.invalidations += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.rows = 0
+
+    def stats(self):
+        """Hit/miss counters and current size"""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'entries': len(self.entries),
+                'rows': self.rows,
+            }
+
+    def watch(self, engine):
+        """Invalidate entries whenever this process writes to a table through engine"""
+        @event.listens_for(engine, 'after_cursor_execute')
+        def _invalidate_on_write(conn, cursor, statement, parameters, context, executemany):
+            match = WRITE_STATEMENT.match(statement)
+            if match:
+                self.invalidate_tables(match.group(1))
+
+    def _remove(self, key):
+        entry = self.entries.pop(key)
+        self.rows -= len(entry[2])
+
+
+def _normalize_cache_value(name, value):
+    """Make equivalent parameters produce the same cache key"""
+    if isinstance(value, str):
+        if name.endswith('_name'):
+            # names are matched case and accent insensitively anyway
+            return normalize_name(value)
+        return ' '.join(value.split())
+    if isinstance(value, range):
+        return tuple(value)
+    return value
+
+
+class CachedDatabaseQueries:
+    """Wraps a DatabaseQueries and answers repeated calls from a QueryCache
+
+    Methods listed in QUERY_TABLES (and their stream_ versions) are cached by
+    (query, normalized parameters); everything else goes straight through.
+    A call that went wrong - DatabaseQueries counted a failure and answered with
+    an empty result - is never cached, and neither is a stream that raised.
+    """
+    def __init__(self, queries, cache):
+        self.queries = queries
+        self.cache = cache
+
+    def __getattr__(self, name):
+        attr = getattr(self.queries, name)
+        base_name = name[len('stream_'):] if name.startswith('stream_') else name
+        if base_name not in QUERY_TABLES:
+            return attr
+        if name.startswith('stream_'):
+            return lambda *args, **kwargs: self._stream(name, base_name, attr, args, kwargs)
+        return lambda *args, **kwargs: self._call(name, base_name, attr, args, kwargs)
+
+    def _key(self, name, base_name, args, kwargs):
+        arguments = inspect.signature(getattr(DatabaseQueries, name)).bind(None, *args, **kwargs)
+        arguments.apply_defaults()
+        params = tuple((param, _normalize_cache_value(param, value))
+                       for param, value in list(arguments.arguments.items())[1:]
+                       if param != 'chunk_size')
+        return (base_name, params)
+
+    def _call(self, name, base_name, method, args, kwargs):
+        key = self._key(name, base_name, args, kwargs)
+        hit, results = self.cache.get(key)
+        if hit:
+            return results
+        failures = self.queries.failures
+        results = method(*args, **kwargs)
+        if self.queries.failures == failures:
+            self.cache.put(key, results, QUERY_TABLES[base_name])
+        return results
+
+    def _stream(self, name, base_name, method, args, kwargs):
+        key = self._key(name, base_name, args, kwargs)
+        hit, results = self.cache.get(key)
+        if hit:
+            yield from results
+            return
+        # keep a copy while streaming, as long as it stays small enough to cache - a
+        # stream that fails or is closed early never gets past the loop, so only
+        # complete results are put
+        kept = []
+        for row in method(*args, **kwargs):
+            if kept is not None:
+                kept.append(row)
+                if len(kept) > self.cache.max_rows:
+                    kept = None
+            yield row
+        # an empty stream has no columns to make an empty result of
+        if kept:
+            self.cache.put(key, kept, QUERY_TABLES[base_name])
@@ -0,0 +1,273 @@
+"""Engines, connection pools and read replica routing"""
+
+import time
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import sessionmaker
+from contextlib import contextmanager
+import threading
+
+from .config import (
+    DATABASE_URL, POOL_MAX_OVERFLOW, POOL_PRE_PING, POOL_RECYCLE_SECONDS, POOL_SIZE,
+    POOL_TIMEOUT_SECONDS, READ_REPLICA_URLS, REPLICA_CHECK_SECONDS, REPLICA_MAX_LAG_SECONDS,
+    REPLICA_ROUTING
+)
+from .models import check_schema_version
+from .analytics import analytics_snapshot_url
+from .queries import DatabaseQueries
+
+
+# CONNECTION POOL MANAGEMENT
+def replica_lag(engine):
+    """Seconds a replica is behind its source, or None when replication has stopped"""
+    with engine.connect() as connection:
+        if connection.dialect.name != 'mysql':
+            return 0.0  # embedded stand-ins have no source to fall behind
+        try:
+            row = connection.exec_driver_sql("SHOW REPLICA STATUS").mappings().first()
+            column = 'Seconds_Behind_Source'
+        except Exception:
+            # MySQL before 8.0.22
+            row = connection.exec_driver_sql("SHOW SLAVE STATUS").mappings().first()
+            column = 'Seconds_Behind_Master'
+    if row is None:
+        return 0.0  # not replicating at all, e.g. a second server used for testing
+    lag = row[column]
+    return None if lag is None else float(lag)
+
+
+class ReplicaRouter:
+    """Chooses the engine for each read-only session: a healthy replica, else the primary
+
+    A replica is healthy when its lag (replica_lag, or the lag_check passed in)
+    is at most max_lag; readings are reused for check_interval seconds so the
+    check is not a round-trip per query. 'least_loaded' picks the replica with
+    the fewest sessions open from this process, 'round_robin' takes turns.
+    """
+    ROUTINGS = ('least_loaded', 'round_robin')
+
+    def __init__(self, primary, replicas, routing=REPLICA_ROUTING, max_lag=REPLICA_MAX_LAG_SECONDS,
+                 check_interval=REPLICA_CHECK_SECONDS, lag_check=None):
+        if routing not in self.ROUTINGS:
+            raise ValueError(f"Unknown replica routing {routing!r}, expected one of {self.ROUTINGS}")
+        self.primary = primary
+        self.replicas = list(replicas)
+        self.routing = routing
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.lag_check = lag_check or replica_lag
+        self.lock = threading.Lock()
+        self.in_use = {engine: 0 for engine in [primary] + self.replicas}
+        self.routed = {engine: 0 for engine in [primary] + self.replicas}
+        self.lags = {}          # engine -> (checked at, lag or None)
+        self.turn = 0
+
+    def lag(self, engine):
+        """Cached replication lag - None if the replica is unreachable or not replicating"""
+        now = time.monotonic()
+        with self.lock:
+            reading = self.lags.get(engine)
+        if reading is None or now - reading[0] > self.check_interval:
+            try:
+                lag = self.lag_check(engine)
+            except Exception as e:
+                if reading is None or reading[1] is not None:
+                    # only when it goes down, not on every check while it stays down
+                    print(f"Replica {engine.url.host or engine.url.database} unavailable: {e}")
+                lag = None
+            reading = (now, lag)
+            with self.lock:
+                self.lags[engine] = reading
+        return reading[1]
+
+    def healthy(self, engine):
+        lag = self.lag(engine)
+        return lag is not None and lag <= self.max_lag
+
+    def acquire(self):
+        """Engine for the next read-only session - give it back with release()"""
+        candidates = [engine for engine in self.replicas if self.healthy(engine)]
+        with self.lock:
+            if not candidates:
+                engine = self.primary
+            elif self.routing == 'round_robin':
+                engine = candidates[self.turn % len(candidates)]
+                self.turn += 1
+            else:
+                # ties go to the replica that has been used least
+                engine = min(candidates, key=lambda e: (self.in_use[e], self.routed[e]))
+            self.in_use[engine] += 1
+            self.routed[engine] += 1
+        return engine
+
+    def release(self, engine):
+        with self.lock:
+            self.in_use[engine] -= 1
+
+    def stats(self):
+        """Per-engine role, lag, open sessions and sessions routed so far"""
+        with self.lock:
+            stats = []
+            for engine in [self.primary] + self.replicas:
+                lag = self.lags.get(engine, (None, None))[1]
+                stats.append({'engine': engine.url.render_as_string(hide_password=True),
+                              'role': 'primary' if engine is self.primary else 'replica',
+                              'lag_seconds': lag,
+                              'healthy': engine is self.primary or (lag is not None
+                                                                    and lag <= self.max_lag),
+                              'in_use': self.in_use[engine],
+                              'routed': self.routed[engine]})
+            return stats
+
+
+class DatabaseManager:
+    """Owns the engines and their connection pools and hands out short-lived sessions
+
+    Every query gets its own session from session_scope(), so nothing holds a
+    connection between clicks; pre-ping and recycle replace connections MySQL
+    has closed after its idle timeout. Pool statistics are collected through
+    pool events and are safe to read from any thread. Read-only sessions
+    (session_scope(read_only=True), queries()) go to a read replica when
+    replica_urls are given and one is healthy.
+    """
+    def __init__(self, url, pool_size=POOL_SIZE, max_overflow=POOL_MAX_OVERFLOW,
+                 pool_recycle=POOL_RECYCLE_SECONDS, pool_timeout=POOL_TIMEOUT_SECONDS,
+                 pool_pre_ping=POOL_PRE_PING, analytics_url=None, replica_urls=None,
+                 replica_routing=REPLICA_ROUTING, max_replica_lag=REPLICA_MAX_LAG_SECONDS,
+                 lag_check=None, **engine_kwargs):
+        def engine_for(engine_url):
+            options = dict(engine_kwargs)
+            if make_url(engine_url).get_backend_name() != 'sqlite':
+                # embedded SQLite stand-ins use their own pool classes
+                options.update(pool_size=pool_size, max_overflow=max_overflow,
+                               pool_recycle=pool_recycle, pool_timeout=pool_timeout,
+                               pool_pre_ping=pool_pre_ping)
+            return create_engine(engine_url, echo=False, **options)
+
+        self.engine = engine_for(url)
+        self.Session = sessionmaker(bind=self.engine)
+        self.replica_engines = [engine_for(replica_url) for replica_url in replica_urls or []]
+        self.router = ReplicaRouter(self.engine, self.replica_engines, routing=replica_routing,
+                                    max_lag=max_replica_lag, lag_check=lag_check)
+
+        # optional local snapshot that the heavy aggregate queries read instead
+        self.analytics_engine = None
+        if analytics_url:
+            self.analytics_engine = create_engine(analytics_url, echo=False)
+            self.AnalyticsSession = sessionmaker(bind=self.analytics_engine)
+
+        self.schema_version = None
+        self.schema_lock = threading.Lock()
+
+        self.lock = threading.Lock()
+        self.checkouts = 0
+        self.connects = 0
+        self.waits = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        for engine in self.engines():
+            event.listen(engine, 'checkout', self._on_checkout)
+            event.listen(engine, 'connect', self._on_connect)
+
+    def engines(self):
+        """The primary engine followed by the replica engines"""
+        return [self.engine] + self.replica_engines
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        with self.lock:
+            self.checkouts += 1
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        with self.lock:
+            self.connects += 1
+
+    @contextmanager
+    def session_scope(self, read_only=False):
+        """A session for one unit of work - committed, or rolled back on error, then closed
+
+        read_only sessions may be bound to a read replica, never write through them.
+        """
+        engine = self.router.acquire() if read_only else self.engine
+        session = self.Session(bind=engine)
+        try:
+            # take the connection now so the time spent waiting on the pool is measured
+            started = time.monotonic()
+            session.connection()
+            waited = time.monotonic() - started
+            with self.lock:
+                self.waits += 1
+                self.wait_total += waited
+                self.wait_max = max(self.wait_max, waited)
+            yield session
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+            if read_only:
+                self.router.release(engine)
+
+    @contextmanager
+    def analytics_scope(self):
+        """A read-only session on the analytics snapshot, or None when there is no snapshot"""
+        if self.analytics_engine is None:
+            yield None
+            return
+        session = self.AnalyticsSession()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    def get_schema_version(self):
+        """The database's schema version - checked once on the primary, then remembered"""
+        with self.schema_lock:
+            if self.schema_version is None:
+                with self.session_scope() as session:
+                    self.schema_version = check_schema_version(session)
+            return self.schema_version
+
+    @contextmanager
+    def queries(self):
+        """A DatabaseQueries on its own short-lived read-only session"""
+        schema_version = self.get_schema_version()
+        with self.session_scope(read_only=True) as session, self.analytics_scope() as analytics:
+            yield DatabaseQueries(session, analytics, schema_version)
+
+    def pool_stats(self):
+        """Pool size, connections in use and time spent waiting for a connection"""
+        pool = self.engine.pool
+        with self.lock:
+            stats = {
+                'checkouts': self.checkouts,
+                'connections_opened': self.connects,
+                'avg_wait_ms': 1000 * self.wait_total / self.waits if self.waits else 0.0,
+                'max_wait_ms': 1000 * self.wait_max,
+            }
+        for name in ('size', 'checkedout', 'checkedin', 'overflow'):
+            if hasattr(pool, name):
+                stats[name] = getattr(pool, name)()
+        if self.replica_engines:
+            stats['replicas'] = self.router.stats()[1:]
+        return stats
+
+    def dispose(self):
+        for engine in self.engines():
+            engine.dispose()
+        if self.analytics_engine is not None:
+            self.analytics_engine.dispose()
+
+# The shared engines and sessions are created lazily, so nothing connects (or
+# imports the MySQL driver) until the first query actually needs it
+_database = None
+
+
+def get_database():
+    """The shared DatabaseManager, created on first use"""
+    global _database
+    if _database is None:
+        _database = DatabaseManager(DATABASE_URL, analytics_url=analytics_snapshot_url(),
+                                    replica_urls=READ_REPLICA_URLS)
+        print("Database engine created successfully")
+    return _database
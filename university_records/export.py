@@ -0,0 +1,113 @@
+"""Streaming export of query results to CSV, JSON Lines or Parquet"""
+
+from decimal import Decimal
+import csv
+import io
+import json
+import os
+
+from .config import EXPORT_FORMATS, STREAM_CHUNK_SIZE
+from .results import ResultSet, result_columns, result_values
+
+
+# RESULT EXPORT
+
+
+def _json_default(value):
+    # Decimal grades, dates
+    return float(value) if isinstance(value, Decimal) else str(value)
+
+
+def _chunks(rows, chunk_size):
+    if isinstance(rows, ResultSet):
+        # slices share the columns - nothing is copied
+        for start in range(0, len(rows), chunk_size):
+            yield rows[start:start + chunk_size]
+        return
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def export_rows(rows, path, fmt=None, chunk_size=STREAM_CHUNK_SIZE):
+    """Write query rows to a CSV, JSON lines or Parquet file, chunk_size rows at a time
+
+    rows can be any iterable - pass a stream_query_* generator and the result
+    is never held in memory as a whole. The file is written under a temporary
+    name and only appears at path once it is complete; if rows raises, the
+    temporary file is removed and the error re-raised. Returns the row count.
+    """
+    fmt = fmt or os.path.splitext(path)[1].lstrip('.').lower()
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{fmt}', use one of: {', '.join(EXPORT_FORMATS)}")
+    writer = ParquetChunkWriter() if fmt == 'parquet' else None
+
+    temporary = f"{path}.part"
+    count = 0
+    columns = None
+    try:
+        with open(temporary, 'wb') as f:
+            for chunk in _chunks(rows, chunk_size):
+                if columns is None:
+                    columns = result_columns(chunk[0])
+                values = [result_values(row, columns) for row in chunk]
+                if writer is not None:
+                    writer.write(f, columns, values)
+                else:
+                    text_chunk = io.StringIO()
+                    if fmt == 'csv':
+                        csv_writer = csv.writer(text_chunk)
+                        if count == 0:
+                            csv_writer.writerow(columns)
+                        csv_writer.writerows(values)
+                    else:
+                        for row in values:
+                            text_chunk.write(json.dumps(dict(zip(columns, row)),
+                                                        default=_json_default) + '\n')
+                    f.write(text_chunk.getvalue().encode('utf-8'))
+                count += len(chunk)
+            if writer is not None:
+                writer.close(f)
+        os.replace(temporary, path)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+    return count
+
+
+class ParquetChunkWriter:
+    """Appends chunks of rows to a Parquet file as row groups (needs pyarrow)"""
+    def __init__(self):
+        import pyarrow  # optional dependency, only needed for Parquet export
+        import pyarrow.parquet
+        self.pa = pyarrow
+        self.writer = None
+
+    def write(self, f, columns, values):
+        data = {column: [float(row[i]) if isinstance(row[i], Decimal) else row[i]
+                         for row in values]
+                for i, column in enumerate(columns)}
+        if self.writer is None:
+            # the first chunk fixes the schema - all-NULL columns are written as text
+            inferred = self.pa.table(data).schema
+            schema = self.pa.schema([field.with_type(self.pa.string())
+                                     if self.pa.types.is_null(field.type) else field
+                                     for field in inferred])
+            self.writer = self.pa.parquet.ParquetWriter(f, schema)
+        for field in self.writer.schema:
+            if self.pa.types.is_string(field.type):
+                data[field.name] = [None if v is None else str(v) for v in data[field.name]]
+        self.writer.write_table(self.pa.table(data, schema=self.writer.schema))
+
+    def close(self, f):
+        if self.writer is None:
+            # no rows - still a valid (empty) Parquet file
+            self.pa.parquet.write_table(self.pa.table({}), f)
+        else:
+            self.writer.close()
@@ -0,0 +1,167 @@
+"""EXPLAIN-based index proposals for the core queries - python code.py advise-indexes"""
+
+import time
+import sqlalchemy
+from datetime import datetime
+import os
+
+from .config import BENCHMARK_REPEATS, DATABASE_CONFIG
+from .models import Base, SCHEMA_VERSION
+from .instrumentation import InstrumentedDatabaseQueries, QueryInstrumentation
+from .benchmark import QueryBenchmark, benchmark_parameters
+
+
+# INDEX ADVISOR
+# (name, table, columns, why) - access paths the core queries need
+INDEX_CANDIDATES = [
+    ('idx_enrollments_term_student', 'Course_Enrollments', ('Term_ID', 'Student_id'),
+     "query 3: who is enrolled in a term, answered from the index alone"),
+    ('idx_enrollments_course_student', 'Course_Enrollments', ('Course_id', 'Student_id'),
+     "query 1: enrollments of one course (the primary key starts with Student_id)"),
+    ('idx_instructors_course_lecturer', 'Course_Instructors', ('Course_ID', 'Lecturer_ID'),
+     "queries 1 and 6: joined from Courses on Course_ID first"),
+    ('idx_students_year', 'Students', ('Year_of_study',),
+     "query 2: final-year students"),
+    ('idx_lecturers_department', 'Lecturers', ('Department_ID',),
+     "queries 6 and 7: lecturers of a department"),
+    ('idx_projects_investigator', 'Research_Projects', ('Principal_Investigator',),
+     "query 7: projects per supervisor"),
+    ('idx_staff_department', 'Non_academic_staff', ('Department_ID',),
+     "query 10: staff of a department"),
+]
+
+
+def _index_prefixes(bind, table):
+    """Column lists of every index on table, as the storage engine can use them"""
+    inspector = sqlalchemy.inspect(bind)
+    primary_key = inspector.get_pk_constraint(table)['constrained_columns']
+    indexes = [index['column_names'] for index in inspector.get_indexes(table)]
+    indexes += [unique['column_names'] for unique in inspector.get_unique_constraints(table)]
+    # InnoDB secondary indexes carry the primary key, SQLite ones carry the rowid
+    # (which is the primary key only when that is a single INTEGER column)
+    if bind.dialect.name == 'mysql' or len(primary_key) == 1:
+        indexes = [columns + [c for c in primary_key if c not in columns] for columns in indexes]
+    return [primary_key] + indexes
+
+
+def propose_indexes(bind):
+    """INDEX_CANDIDATES that no existing index already covers"""
+    proposals = []
+    prefixes = {}
+    for name, table, columns, reason in INDEX_CANDIDATES:
+        if table not in prefixes:
+            prefixes[table] = [[c.lower() for c in index] for index in _index_prefixes(bind, table)]
+        wanted = [c.lower() for c in columns]
+        if not any(index[:len(wanted)] == wanted for index in prefixes[table]):
+            proposals.append((name, table, columns, reason))
+    return proposals
+
+
+def capture_query_plans(database, parameters):
+    """EXPLAIN (ANALYZE on MySQL) of every statement each core query issues"""
+    instrumentation = QueryInstrumentation(explain=True, analyze=True)
+    instrumentation.watch(*database.engines())
+    try:
+        with database.queries() as queries:
+            instrumented = InstrumentedDatabaseQueries(queries, instrumentation)
+            for query_name, params in parameters.items():
+                getattr(instrumented, query_name)(**params)
+    finally:
+        instrumentation.unwatch()
+
+    plans = {}
+    for record in reversed(instrumentation.recent()):
+        lines = []
+        for statement in record['statements']:
+            for row in statement.get('explain') or []:
+                lines.extend(str(value) for value in row.values()
+                             if isinstance(value, str) and value.strip())
+        plans[record['query']] = lines
+    return plans
+
+
+class IndexAdvisor:
+    """Runs the core queries under EXPLAIN, proposes missing indexes and proves them
+
+    With apply=True the proposed indexes are created on the database the
+    advisor runs against (use a copy of production), and every query is timed
+    again; either way the proposals are written out as the next migration.
+    """
+    def __init__(self, database, repeats=BENCHMARK_REPEATS, migrations_dir='migrations'):
+        self.database = database
+        self.benchmark = QueryBenchmark(repeats=repeats)
+        self.migrations_dir = migrations_dir
+
+    def run(self, apply=False):
+        with self.database.session_scope() as session:
+            parameters = benchmark_parameters(session)
+
+        before = self._time_all(parameters)
+        plans = capture_query_plans(self.database, parameters)
+        for query_name, lines in plans.items():
+            print(f"\n{query_name}")
+            for line in lines:
+                print(f"    {line}")
+
+        proposals = propose_indexes(self.database.engine)
+        print(f"\n{len(proposals)} index(es) proposed")
+        for name, table, columns, reason in proposals:
+            print(f"  {name} ON {table} ({', '.join(columns)}) - {reason}")
+
+        after = None
+        if apply and proposals:
+            self.create_indexes(proposals)
+            after = self._time_all(parameters)
+            print(f"\n{'query':<45} {'before p50':>12} {'after p50':>12}")
+            for query_name in parameters:
+                print(f"{query_name:<45} {before[query_name]['p50_ms']:>9.2f} ms "
+                      f"{after[query_name]['p50_ms']:>9.2f} ms")
+
+        path = self.write_migration(proposals, before, after) if proposals else None
+        return {'proposals': proposals, 'before': before, 'after': after, 'migration': path}
+
+    def _time_all(self, parameters):
+        return {query_name: self.benchmark.time_query(self.database, query_name, params)
+                for query_name, params in parameters.items()}
+
+    def create_indexes(self, proposals):
+        tables = Base.metadata.tables
+        with self.database.engine.begin() as connection:
+            for name, table, columns, reason in proposals:
+                started = time.perf_counter()
+                sqlalchemy.Index(name, *[tables[table].c[column] for column in columns]
+                                 ).create(connection)
+                print(f"Created {name} in {time.perf_counter() - started:.1f}s")
+
+    def write_migration(self, proposals, before, after=None):
+        """Write the proposals as the next numbered file in migrations/"""
+        numbers = [int(f[:3]) for f in os.listdir(self.migrations_dir) if f[:3].isdigit()] \
+            if os.path.isdir(self.migrations_dir) else []
+        version = max(numbers + [SCHEMA_VERSION]) + 1
+        path = os.path.join(self.migrations_dir, f"{version:03d}_Query_Indexes.sql")
+
+        lines = [f"-- MIGRATION {version:03d}: INDEXES FOR THE QUERY WORKLOAD",
+                 f"-- Proposed by `python code.py advise-indexes` on "
+                 f"{datetime.now():%Y-%m-%d} against {self.database.engine.dialect.name}.",
+                 "--",
+                 f"-- {'query':<45} {'before p50':>12} {'after p50':>12}"]
+        for query_name, timing in before.items():
+            after_ms = f"{after[query_name]['p50_ms']:.2f} ms" if after else 'not applied'
+            lines.append(f"-- {query_name:<45} {timing['p50_ms']:>9.2f} ms {after_ms:>12}")
+        # the database the advisor ran against, or the configured one for embedded stand-ins
+        engine = self.database.engine
+        database_name = engine.url.database if engine.dialect.name == 'mysql' else None
+        lines += ["", f"USE {database_name or DATABASE_CONFIG['database']};", ""]
+        for name, table, columns, reason in proposals:
+            lines.append(f"-- {reason}")
+            lines.append(f"CREATE INDEX {name} ON {table} ({', '.join(columns)});")
+            lines.append("")
+        lines += ["-- Record the schema version",
+                  f"INSERT IGNORE INTO Schema_Version (Version, Description) "
+                  f"VALUES ({version}, 'Indexes for the query workload');", ""]
+
+        os.makedirs(self.migrations_dir, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines))
+        print(f"Migration written to {path}")
+        return path
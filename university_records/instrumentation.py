@@ -0,0 +1,247 @@
+"""Per-call timing and row counts of the core queries"""
+
+import time
+from sqlalchemy import event
+from datetime import datetime
+from collections import deque
+from contextlib import contextmanager
+import inspect
+import json
+import threading
+
+from .config import (
+    INSTRUMENTATION_LOG_FILE, INSTRUMENTATION_MAX_RECORDS, INSTRUMENTATION_METRICS_FILE
+)
+from .queries import DatabaseQueries
+
+
+# QUERY INSTRUMENTATION
+class QueryInstrumentation:
+    """Records timing, row counts, SQL and (optionally) EXPLAIN plans per query call
+
+    InstrumentedDatabaseQueries opens a record for each DatabaseQueries call;
+    engine events add every statement the call issues to that record. The last
+    max_records calls are kept for the diagnostics panel, and running totals
+    per query are kept for the Prometheus export.
+    """
+    def __init__(self, max_records=INSTRUMENTATION_MAX_RECORDS, explain=False, analyze=False):
+        self.records = deque(maxlen=max_records)
+        self.totals = {}
+        self.explain = explain
+        self.analyze = analyze  # MySQL EXPLAIN ANALYZE - runs the statement again for real timings
+        self.engines = []
+        self.lock = threading.Lock()
+        self.local = threading.local()
+
+    @property
+    def engine(self):
+        # replicas have the primary's schema, so EXPLAIN plans are taken on the first engine watched
+        return self.engines[0] if self.engines else None
+
+    def watch(self, *engines):
+        """Attach the statement hooks to each engine"""
+        for engine in engines:
+            self.engines.append(engine)
+            event.listen(engine, 'before_cursor_execute', self._before_execute)
+            event.listen(engine, 'after_cursor_execute', self._after_execute)
+            event.listen(engine, 'handle_error', self._on_error)
+
+    def unwatch(self):
+        for engine in self.engines:
+            event.remove(engine, 'before_cursor_execute', self._before_execute)
+            event.remove(engine, 'after_cursor_execute', self._after_execute)
+            event.remove(engine, 'handle_error', self._on_error)
+        self.engines = []
+
+    @contextmanager
+    def active(self, record):
+        """Attribute statements run by this thread to record"""
+        previous = getattr(self.local, 'record', None)
+        self.local.record = record
+        try:
+            yield
+        finally:
+            self.local.record = previous
+
+    def start(self, name, params):
+        return {
+            'time': datetime.now().isoformat(timespec='seconds'),
+            'query': name,
+            'params': {key: _json_value(value) for key, value in params.items()},
+            'started': time.perf_counter(),
+            'first_row_ms': None,
+            'total_ms': None,
+            'rows': 0,
+            'statements': [],
+            'error': None,
+        }
+
+    def first_row(self, record):
+        if record['first_row_ms'] is None:
+            record['first_row_ms'] = round((time.perf_counter() - record['started']) * 1000, 3)
+
+    def finish(self, record):
+        """Close a record, capture EXPLAIN plans if enabled, and add it to the totals"""
+        record['total_ms'] = round((time.perf_counter() - record.pop('started')) * 1000, 3)
+        if record['first_row_ms'] is None:
+            record['first_row_ms'] = record['total_ms']
+        if self.explain:
+            for statement in record['statements']:
+                statement['explain'] = self._explain(statement)
+        self.local.last = record
+        with self.lock:
+            self.records.append(record)
+            totals = self.totals.setdefault(record['query'], {
+                'calls': 0, 'errors': 0, 'rows': 0, 'statements': 0, 'seconds': 0.0, 'max_seconds': 0.0})
+            totals['calls'] += 1
+            totals['errors'] += record['error'] is not None
+            totals['rows'] += record['rows']
+            totals['statements'] += len(record['statements'])
+            totals['seconds'] += record['total_ms'] / 1000
+            totals['max_seconds'] = max(totals['max_seconds'], record['total_ms'] / 1000)
+
+    def last_record(self):
+        """The last record this thread finished"""
+        return getattr(self.local, 'last', None)
+
+    def recent(self):
+        """Most recent records first"""
+        with self.lock:
+            return list(reversed(self.records))
+
+    def _before_execute(self, conn, cursor, statement, parameters, context, executemany):
+        # statements on one connection never overlap, so one start time per connection is enough
+        conn.info['instrumentation_started'] = time.perf_counter()
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.pop('instrumentation_started', time.perf_counter())
+        record = getattr(self.local, 'record', None)
+        if record is None:
+            return
+        record['statements'].append({
+            'sql': statement,
+            'params': _json_value(parameters),
+            'execute_ms': round((time.perf_counter() - started) * 1000, 3),
+            # -1 for server-side cursors, whose rows are only counted as they are fetched
+            'rowcount': cursor.rowcount,
+        })
+
+    def _on_error(self, context):
+        record = getattr(self.local, 'record', None)
+        if record is not None:
+            record['error'] = str(context.original_exception)
+
+    def _explain(self, statement):
+        """EXPLAIN a SELECT on a separate connection, after the query has finished"""
+        if not statement['sql'].lstrip().upper().startswith(('SELECT', 'WITH')):
+            return None
+        dialect = self.engine.dialect.name
+        if dialect == 'sqlite':
+            prefix = 'EXPLAIN QUERY PLAN '
+        elif dialect == 'mysql' and self.analyze:
+            prefix = 'EXPLAIN ANALYZE '
+        else:
+            prefix = 'EXPLAIN '
+        params = statement['params']
+        try:
+            with self.engine.connect() as connection:
+                rows = connection.exec_driver_sql(
+                    prefix + statement['sql'], tuple(params) if isinstance(params, list) else params)
+                return [{key: _json_value(value) for key, value in row._mapping.items()}
+                        for row in rows]
+        except Exception as e:
+            return [{'error': str(e)}]
+
+    def export_jsonl(self, path=INSTRUMENTATION_LOG_FILE):
+        """Append the recorded calls to a JSON lines file"""
+        with open(path, 'a', encoding='utf-8') as f:
+            for record in reversed(self.recent()):
+                f.write(json.dumps(record) + '\n')
+        return path
+
+    def export_prometheus(self, path=INSTRUMENTATION_METRICS_FILE):
+        """Write the per-query totals in the Prometheus text exposition format"""
+        with self.lock:
+            totals = {name: dict(values) for name, values in self.totals.items()}
+        metrics = [
+            ('urms_query_calls_total', 'counter', 'Query calls', 'calls'),
+            ('urms_query_errors_total', 'counter', 'Query calls that raised a database error', 'errors'),
+            ('urms_query_rows_total', 'counter', 'Rows returned', 'rows'),
+            ('urms_query_statements_total', 'counter', 'SQL statements issued', 'statements'),
+            ('urms_query_seconds_total', 'counter', 'Time spent in query calls', 'seconds'),
+            ('urms_query_max_seconds', 'gauge', 'Slowest single query call', 'max_seconds'),
+        ]
+        lines = []
+        for metric, kind, description, field in metrics:
+            lines.append(f"# HELP {metric} {description}")
+            lines.append(f"# TYPE {metric} {kind}")
+            for name, values in sorted(totals.items()):
+                lines.append(f'{metric}{{query="{name}"}} {values[field]:g}')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+        return path
+
+
+def _json_value(value):
+    """Bind parameters and plan values as something json.dumps accepts"""
+    if isinstance(value, (list, tuple)):
+        return [_json_value(item) for item in value]
+    if isinstance(value, dict):
+        return {str(key): _json_value(item) for key, item in value.items()}
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+class InstrumentedDatabaseQueries:
+    """Wraps a DatabaseQueries (or CachedDatabaseQueries) and records every query_* call
+
+    stream_ methods are timed until the last row has been pulled; cached calls
+    show up with no statements.
+    """
+    def __init__(self, queries, instrumentation):
+        self.queries = queries
+        self.instrumentation = instrumentation
+
+    def __getattr__(self, name):
+        attr = getattr(self.queries, name)
+        base_name = name[len('stream_'):] if name.startswith('stream_') else name
+        if not base_name.startswith('query_'):
+            return attr
+        if name.startswith('stream_'):
+            return lambda *args, **kwargs: self._stream(name, attr, args, kwargs)
+        return lambda *args, **kwargs: self._call(name, attr, args, kwargs)
+
+    def _params(self, name, args, kwargs):
+        arguments = inspect.signature(getattr(DatabaseQueries, name)).bind(None, *args, **kwargs)
+        return dict(list(arguments.arguments.items())[1:])
+
+    def _call(self, name, method, args, kwargs):
+        record = self.instrumentation.start(name, self._params(name, args, kwargs))
+        try:
+            with self.instrumentation.active(record):
+                results = method(*args, **kwargs)
+            # bulk variants return {key: rows}
+            record['rows'] = sum(map(len, results.values())) if isinstance(results, dict) \
+                else len(results)
+            return results
+        finally:
+            self.instrumentation.finish(record)
+
+    def _stream(self, name, method, args, kwargs):
+        record = self.instrumentation.start(name, self._params(name, args, kwargs))
+        try:
+            with self.instrumentation.active(record):
+                rows = iter(method(*args, **kwargs))
+            done = object()
+            while True:
+                # only the pulls run statements - the consumer's work between rows is not ours
+                with self.instrumentation.active(record):
+                    row = next(rows, done)
+                if row is done:
+                    break
+                self.instrumentation.first_row(record)
+                record['rows'] += 1
+                yield row
+        finally:
+            self.instrumentation.finish(record)
@@ -0,0 +1,683 @@
+"""SQLAlchemy models, academic terms and the data steps of the schema migrations"""
+
+import time
+import sqlalchemy
+from sqlalchemy import (
+    Column, Integer, String, Text, Date, DECIMAL, ForeignKey, Index, PrimaryKeyConstraint,
+    TIMESTAMP, func, text, insert, event, update, bindparam, or_, select
+)
+from sqlalchemy.orm import declarative_base, relationship
+from datetime import datetime, date
+import re
+import unicodedata
+
+
+# declarative base of every model below
+Base = declarative_base()
+
+
+# NAME SEARCH NORMALIZATION
+def normalize_name(name):
+    """Accent- and case-fold a name for searching ('Prof. Émile Noëther' -> 'prof emile noether')"""
+    if not name:
+        return ''
+    decomposed = unicodedata.normalize('NFKD', name)
+    stripped = ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+    # punctuation becomes a space, then runs of spaces collapse into one
+    return ' '.join(re.sub(r'[^\w\s]', ' ', stripped.casefold()).split())
+
+
+def _name_search_default(context):
+    """Column default filling Name_Search from Name on insert"""
+    return normalize_name(context.get_current_parameters().get('Name'))
+
+
+def _name_search_indexes(prefix):
+    """The Name_Search indexes of migration 002 - the ngram FULLTEXT one only on MySQL"""
+    return (Index(f'idx_{prefix}_name_search', 'Name_Search'),
+            Index(f'ft_{prefix}_name_search', 'Name_Search', mysql_prefix='FULLTEXT',
+                  mysql_with_parser='ngram').ddl_if(dialect='mysql'))
+
+# ACADEMIC TERMS
+# Term_ID = academic year start * 10 + term number, so 'Fall 2025' is 20251 and
+# 'Spring 2026' (same academic year) is 20252 - ids sort in calendar order and
+# one academic year is one contiguous range, which is what the partitions use
+TERM_SEASONS = [
+    # (season, term number, start (month, day), end (month, day), calendar year offset)
+    ('Fall', 1, (9, 1), (12, 31), 0),
+    ('Spring', 2, (1, 1), (5, 31), 1),
+    ('Summer', 3, (6, 1), (8, 31), 1),
+]
+CURRENT_SEMESTER = 'Fall 2025'  # the GUI's default and the generator's current term
+UNKNOWN_TERM_ID = 0             # enrollments without a semester, e.g. those added by migrate-grades
+TERM_PARTITION_FIRST_YEAR = 2022  # earlier academic years share the first partition
+TERM_PARTITION_LAST_YEAR = 2026   # later ones share pmax - the partitions of migration 005
+
+
+def term_id(season, academic_year):
+    """Term_ID of a season in the academic year starting in academic_year"""
+    for name, number, start, end, offset in TERM_SEASONS:
+        if name.lower() == season.lower():
+            return academic_year * 10 + number
+    return None
+
+
+def parse_term(semester, academic_year=None):
+    """Term_ID from enrollment text: 'Fall 2025', or 'Fall' with Academic_year '2024-2025'"""
+    if not semester:
+        return None
+    match = re.match(r'\s*([A-Za-z]+)\s*(\d{4})?\s*$', semester)
+    if not match:
+        return None
+    season, year = match.groups()
+    offsets = {name.lower(): offset for name, number, start, end, offset in TERM_SEASONS}
+    if season.lower() not in offsets:
+        return None
+    if year:
+        # calendar year of the term -> academic year it belongs to
+        return term_id(season, int(year) - offsets[season.lower()])
+    if academic_year and re.match(r'\s*\d{4}', academic_year):
+        return term_id(season, int(academic_year.strip()[:4]))
+    return None
+
+
+def term_details(term):
+    """Name, start date, end date and academic year of a Term_ID"""
+    academic_year, number = divmod(term, 10)
+    for name, season_number, start, end, offset in TERM_SEASONS:
+        if season_number == number:
+            year = academic_year + offset
+            return {'Term_ID': term, 'Name': f"{name} {year}",
+                    'Start_date': date(year, *start), 'End_date': date(year, *end),
+                    'Academic_year': f"{academic_year}-{academic_year + 1}"}
+    return {'Term_ID': term, 'Name': 'Unknown', 'Start_date': None, 'End_date': None,
+            'Academic_year': None}
+
+
+def term_partitions(first_year, last_year):
+    """RANGE partition clause for Course_Enrollments - one partition per academic year"""
+    partitions = [f"PARTITION p{first_year - 1} VALUES LESS THAN ({first_year * 10})"]
+    partitions += [f"PARTITION p{year} VALUES LESS THAN ({(year + 1) * 10})"
+                   for year in range(first_year, last_year + 1)]
+    partitions.append("PARTITION pmax VALUES LESS THAN MAXVALUE")
+    return f"RANGE (Term_ID) ({', '.join(partitions)})"
+
+# DATABASE MODELS (SQLAlchemy ORM)
+class Department(Base):
+    __tablename__ = 'Departments'
+    Department_ID = Column(Integer, primary_key=True, autoincrement=True)
+    Name = Column(String(100), nullable=False)
+    Faculty = Column(String(100), nullable=False)
+    Research_Areas = Column(Text)
+    created_at = Column(TIMESTAMP, default=datetime.now)
+    Name_Search = Column(String(100), default=_name_search_default)  # normalize_name(Name)
+
+    __table_args__ = _name_search_indexes('departments')
+
+class Program(Base):
+    __tablename__ = 'Programs'
+    Program_ID = Column(Integer, primary_key=True, autoincrement=True)
+    Name = Column(String(150), nullable=False)
+    Degree_awarded = Column(String(100), nullable=False)
+    Program_Duration = Column(Text)
+    Course_Requirements = Column(Text)
+    Enrollment_details = Column(Text)
+    created_at = Column(TIMESTAMP, default=datetime.now)
+
+class Course(Base):
+    __tablename__ = 'Courses'
+    Course_ID = Column(Integer, primary_key=True, autoincrement=True)
+    Course_Code = Column(String(20), nullable=False, unique=True)
+    Name = Column(String(150), nullable=False)
+    Description = Column(Text)
+    Department_ID = Column(Integer, ForeignKey('Departments.Department_ID'))
+    Level = Column(String(20))
+    Credits = Column(Integer, nullable=False)
+    Prerequisites = Column(Text)
+    Schedule = Column(String(100))
+    Material = Column(Text)
+    created_at = Column(TIMESTAMP, default=datetime.now)
+
+class Lecturer(Base):
+    __tablename__ = 'Lecturers'
+    Lecturer_ID = Column(Integer, primary_key=True, autoincrement=True)
+    Name = Column(String(255), nullable=False)
+    Department_ID = Column(Integer, ForeignKey('Departments.Department_ID'))
+    Academic_Qualifications = Column(Text)
+    Expertise = Column(Text)
+    Course_load = Column(Text)
+    Research_interests = Column(Text)
+    Name_Search = Column(String(255), default=_name_search_default)  # normalize_name(Name)
+
+    __table_args__ = (Index('idx_lecturers_department', 'Department_ID'),) + _name_search_indexes('lecturers')
+
+class NonAcademicStaff(Base):
+    __tablename__ = 'Non_academic_staff'
+    Staff_ID = Column(Integer, primary_key=True, autoincrement=True)
+    Name = Column(String(255), nullable=False)
+    Job_Title = Column(String(100))
+    Department_ID = Column(Integer, ForeignKey('Departments.Department_ID'))
+    Employment_type = Column(String(100))
+    Contact_details = Column(Text)
+    Salary = Column(DECIMAL(12, 2))
+    Emergency_contact_info = Column(String(255))
+
+    __table_args__ = (Index('idx_staff_department', 'Department_ID'),)
+
+class Student(Base):
+    __tablename__ = 'Students'
+    Student_id = Column(Integer, primary_key=True, autoincrement=True)
+    Name = Column(String(100), nullable=False)
+    Date_of_birth = Column(Date, nullable=False)
+    Contact_info = Column(String(150))
+    Program_id = Column(Integer, ForeignKey('Programs.Program_ID'))
+    Year_of_study = Column(Integer)
+    Current_Grades = Column(Text)
+    Disciplinary_records = Column(Text)
+    Graduation_status = Column(String(20), default='Active')
+    Advisor_id = Column(Integer, ForeignKey('Lecturers.Lecturer_ID'))
+    created_at = Column(TIMESTAMP, default=datetime.now)
+    
+    # relationships
+    program = relationship('Program')
+
+    __table_args__ = (Index('idx_students_year', 'Year_of_study'),)
+
+class ResearchProject(Base):
+    __tablename__ = 'Research_Projects'
+    Project_ID = Column(Integer, primary_key=True, autoincrement=True)
+    Title = Column(String(255), nullable=False)
+    Principal_Investigator = Column(Integer, ForeignKey('Lecturers.Lecturer_ID'))
+    Funding_sources = Column(Text)
+    Outcomes = Column(Text)
+
+    __table_args__ = (Index('idx_projects_investigator', 'Principal_Investigator'),)
+
+class ResearchTeamMember(Base):
+    __tablename__ = 'Research_Team_Members'
+    Project_ID = Column(Integer, ForeignKey('Research_Projects.Project_ID', ondelete='CASCADE'),
+                        primary_key=True)
+    Lecturer_ID = Column(Integer, ForeignKey('Lecturers.Lecturer_ID', ondelete='CASCADE'),
+                         primary_key=True)
+
+class Publication(Base):
+    __tablename__ = 'Publications'
+    Publication_ID = Column(Integer, primary_key=True, autoincrement=True)
+    Title = Column(String(255), nullable=False)
+    Publication_year = Column(Integer)  # YEAR in Database_Tables_Creations.sql
+    Publication_type = Column(String(100))
+    Lecturer_ID = Column(Integer, ForeignKey('Lecturers.Lecturer_ID', ondelete='SET NULL'))
+    Project_ID = Column(Integer, ForeignKey('Research_Projects.Project_ID', ondelete='SET NULL'))
+
+# query 7 metric -> Research_Leaderboard column
+LEADERBOARD_METRICS = {
+    'projects': 'Projects_led',
+    'team': 'Team_memberships',
+    'publications': 'Publications',
+}
+
+class ResearchLeaderboard(Base):
+    __tablename__ = 'Research_Leaderboard'
+    # per-lecturer research counts for query 7, kept in step by the triggers
+    # from research_leaderboard_triggers() - rebuild_research_leaderboard() recounts
+    Lecturer_ID = Column(Integer, primary_key=True, autoincrement=False)
+    Department_ID = Column(Integer)
+    Projects_led = Column(Integer, nullable=False, default=0, server_default='0')
+    Team_memberships = Column(Integer, nullable=False, default=0, server_default='0')
+    Publications = Column(Integer, nullable=False, default=0, server_default='0')
+
+    # top N by a metric, overall or within a department, is a range scan of one of these
+    __table_args__ = tuple(
+        Index(f'idx_leaderboard_{metric}', column) for metric, column in LEADERBOARD_METRICS.items()
+    ) + tuple(
+        Index(f'idx_leaderboard_department_{metric}', 'Department_ID', column)
+        for metric, column in LEADERBOARD_METRICS.items()
+    )
+
+class Term(Base):
+    __tablename__ = 'Terms'
+    Term_ID = Column(Integer, primary_key=True, autoincrement=False)  # see term_id()
+    Name = Column(String(20), nullable=False, unique=True)
+    Start_date = Column(Date)
+    End_date = Column(Date)
+    Academic_year = Column(String(10))
+
+class CourseEnrollment(Base):
+    __tablename__ = 'Course_Enrollments'
+    # no foreign keys: MySQL does not allow them on partitioned tables (migration 005) -
+    # enrollment_cascade_triggers() stand in for their ON DELETE CASCADE
+    Student_id = Column(Integer, primary_key=True)
+    Course_id = Column(Integer, primary_key=True)
+    Term_ID = Column(Integer, primary_key=True, autoincrement=False, default=UNKNOWN_TERM_ID)
+    Enrollment_date = Column(Date, default=date.today)
+    Semester = Column(String(20))
+    Academic_year = Column(String(10))
+    Status = Column(String(20), default='Enrolled')
+
+    # query 3 by term, query 1 by course
+    __table_args__ = (
+        Index('idx_enrollments_term_student', 'Term_ID', 'Student_id'),
+        Index('idx_enrollments_course_student', 'Course_id', 'Student_id'),
+        {'mysql_partition_by': term_partitions(TERM_PARTITION_FIRST_YEAR, TERM_PARTITION_LAST_YEAR)},
+    )
+
+class CourseInstructor(Base):
+    __tablename__ = 'Course_Instructors'
+    Course_Instructor_ID = Column(Integer, autoincrement=True, unique=True)
+    Course_ID = Column(Integer, ForeignKey('Courses.Course_ID'), primary_key=True)
+    Lecturer_ID = Column(Integer, ForeignKey('Lecturers.Lecturer_ID'), primary_key=True)
+
+    # the primary key of Database_Tables_Creations.sql, and migration 003's index for joins from Courses
+    __table_args__ = (PrimaryKeyConstraint('Lecturer_ID', 'Course_ID'),
+                      Index('idx_instructors_course_lecturer', 'Course_ID', 'Lecturer_ID'))
+
+class StudentGrade(Base):
+    __tablename__ = 'Student_Grades'
+    Student_id = Column(Integer, primary_key=True)
+    Course_id = Column(Integer, primary_key=True)
+    Term_ID = Column(Integer, primary_key=True, autoincrement=False, default=UNKNOWN_TERM_ID)
+    Grade = Column(DECIMAL(5, 2), nullable=False)
+    Letter_grade = Column(String(5))
+    # one grade per enrollment, so a course taken again keeps both grades - the
+    # foreign key to Course_Enrollments went with its partitioning (migration 005),
+    # migrate_current_grades adds the enrollment and enrollment_cascade_triggers()
+    # delete the grades of deleted enrollments, students and courses
+
+class SchemaVersion(Base):
+    __tablename__ = 'Schema_Version'
+    Version = Column(Integer, primary_key=True)
+    Description = Column(String(255))
+    Applied_at = Column(TIMESTAMP, default=datetime.now)
+
+# SCHEMA VERSION
+# one entry per file in migrations/ - the schema this code expects
+SCHEMA_MIGRATIONS = [
+    (1, 'Student_Grades table'),
+    (2, 'Name_Search columns and indexes'),
+    (3, 'Indexes for the query workload'),
+    (4, 'Terms table and Course_Enrollments.Term_ID'),
+    (5, 'Course_Enrollments partitioned by academic year'),
+    (6, 'Research_Leaderboard summary table and triggers'),
+]
+SCHEMA_VERSION = SCHEMA_MIGRATIONS[-1][0]
+
+# what works differently until each migration is applied - listed by the startup check
+MIGRATION_FALLBACKS = {
+    1: "Query 2 and cohort analytics parse Students.Current_Grades instead of Student_Grades",
+    2: "Queries 1, 6 and 10 and their bulk versions scan Name with LIKE instead of Name_Search",
+    3: "Queries 2 and 3 run without their indexes",
+    4: "Query 3 and the semester list compare Semester text instead of Term_ID",
+    5: "Query 3 reads every academic year of Course_Enrollments instead of one partition",
+    6: "Query 7 counts projects, team memberships and publications on every run",
+}
+
+
+def check_schema_version(session):
+    """Return the database's schema version - a single query on a normal start
+
+    Only the very first start against a database does more: an empty database
+    gets every table (already at SCHEMA_VERSION), one built by
+    Database_Tables_Creations.sql just gets Schema_Version at version 0.
+    """
+    try:
+        return session.execute(text("SELECT MAX(Version) FROM Schema_Version")).scalar() or 0
+    except Exception:
+        session.rollback()
+
+    bind = session.get_bind()
+    if sqlalchemy.inspect(bind).has_table(Student.__tablename__):
+        # existing tables - migrations still have to be applied
+        SchemaVersion.__table__.create(bind, checkfirst=True)
+        return 0
+
+    Base.metadata.create_all(bind)
+    session.execute(insert(SchemaVersion), [{'Version': version, 'Description': description}
+                                            for version, description in SCHEMA_MIGRATIONS])
+    return SCHEMA_VERSION
+
+# keep Name_Search in step when a name is changed through the ORM
+@event.listens_for(Department, 'before_update')
+@event.listens_for(Lecturer, 'before_update')
+def _refresh_name_search(mapper, connection, target):
+    target.Name_Search = normalize_name(target.Name)
+
+
+def backfill_name_search(session, batch_size=1000):
+    """Fill Name_Search for every lecturer and department (run once after migration 002)"""
+    for model, key in ((Lecturer, Lecturer.Lecturer_ID), (Department, Department.Department_ID)):
+        table = model.__table__
+        statement = update(table).where(
+            table.c[key.key] == bindparam('row_id')
+        ).values(Name_Search=bindparam('name_search'))
+
+        last_id = 0
+        updated = 0
+        while True:
+            rows = session.query(key, model.Name).filter(key > last_id) \
+                .order_by(key).limit(batch_size).all()
+            if not rows:
+                break
+            session.execute(statement, [{'row_id': row_id, 'name_search': normalize_name(name)}
+                                        for row_id, name in rows])
+            session.commit()
+            updated += len(rows)
+            last_id = rows[-1][0]
+        print(f"Name_Search filled for {updated} {table.name}")
+
+# TERM BACKFILL
+def ensure_terms(session, term_ids):
+    """Add the Terms rows for term_ids that are not there yet"""
+    statement = insert(Term).prefix_with('IGNORE', dialect='mysql') \
+        .prefix_with('OR IGNORE', dialect='sqlite')
+    rows = [term_details(term) for term in sorted(set(term_ids))]
+    if rows:
+        session.execute(statement, rows)
+
+
+def backfill_enrollment_terms(session, batch_size=1000):
+    """Fill Course_Enrollments.Term_ID from Semester/Academic_year (run once after migration 004)
+
+    Enrollments whose semester cannot be read get UNKNOWN_TERM_ID; the
+    enrollment date is not used, it defaults to the day the row was written.
+    Student_Grades.Term_ID is filled afterwards, from the grade's enrollment.
+    """
+    table = CourseEnrollment.__table__
+    statement = update(table).where(
+        table.c.Student_id == bindparam('student_id'), table.c.Course_id == bindparam('course_id')
+    ).values(Term_ID=bindparam('term_id'))
+    ensure_terms(session, [UNKNOWN_TERM_ID])
+
+    updated = 0
+    unknown = 0
+    while True:
+        # every batch is updated before the next is read, so no keyset is needed
+        rows = session.query(CourseEnrollment.Student_id, CourseEnrollment.Course_id,
+                             CourseEnrollment.Semester, CourseEnrollment.Academic_year
+                             ).filter(CourseEnrollment.Term_ID.is_(None)).limit(batch_size).all()
+        if not rows:
+            break
+        params = []
+        for student_id, course_id, semester, academic_year in rows:
+            term = parse_term(semester, academic_year)
+            if term is None:
+                term = UNKNOWN_TERM_ID
+                unknown += 1
+            params.append({'student_id': student_id, 'course_id': course_id, 'term_id': term})
+        ensure_terms(session, [row['term_id'] for row in params])
+        session.execute(statement, params)
+        session.commit()
+        updated += len(rows)
+    print(f"Term_ID filled for {updated} enrollments ({unknown} without a readable semester)")
+
+    # a grade belongs to its enrollment - the latest one, as grades were one per course until now
+    grades = StudentGrade.__table__
+    enrollment_term = select(func.max(table.c.Term_ID)).where(
+        table.c.Student_id == grades.c.Student_id, table.c.Course_id == grades.c.Course_id
+    ).scalar_subquery()
+    graded = session.execute(update(grades).where(grades.c.Term_ID.is_(None)).values(
+        Term_ID=func.coalesce(enrollment_term, UNKNOWN_TERM_ID))).rowcount
+    session.commit()
+    print(f"Term_ID filled for {graded} grades")
+    return updated
+
+# RESEARCH LEADERBOARD
+# (source column, Research_Leaderboard column) - one row in the source is one point
+LEADERBOARD_SOURCES = [
+    (ResearchProject.__table__.c.Principal_Investigator, 'Projects_led'),
+    (ResearchTeamMember.__table__.c.Lecturer_ID, 'Team_memberships'),
+    (Publication.__table__.c.Lecturer_ID, 'Publications'),
+]
+
+
+def _row_trigger(dialect, name, timing, table, body, condition=None):
+    if dialect == 'mysql':
+        if condition:
+            body = f"IF {condition} THEN {body} END IF;"
+        return f"CREATE TRIGGER {name} {timing} ON {table} FOR EACH ROW BEGIN {body} END"
+    when = f" WHEN {condition}" if condition else ''
+    return f"CREATE TRIGGER {name} {timing} ON {table} FOR EACH ROW{when} BEGIN {body} END"
+
+
+def research_leaderboard_triggers(dialect):
+    """CREATE TRIGGER statements that keep Research_Leaderboard up to date (mysql or sqlite)
+
+    Every insert, delete or update of a project, team membership or
+    publication moves its lecturer's count by one, so query 7 never has to
+    aggregate. MySQL does not fire triggers for foreign key cascades, which is
+    why it gets an extra trigger for the team members a deleted project takes
+    with it.
+    """
+    insert_ignore = 'INSERT IGNORE' if dialect == 'mysql' else 'INSERT OR IGNORE'
+    changed = ("NOT (OLD.{0} <=> NEW.{0})" if dialect == 'mysql' else "OLD.{0} IS NOT NEW.{0}")
+
+    def increment(lecturer, column):
+        return (f"{insert_ignore} INTO Research_Leaderboard (Lecturer_ID, Department_ID) "
+                f"SELECT Lecturer_ID, Department_ID FROM Lecturers WHERE Lecturer_ID = {lecturer}; "
+                f"UPDATE Research_Leaderboard SET {column} = {column} + 1 "
+                f"WHERE Lecturer_ID = {lecturer};")
+
+    def decrement(lecturer, column):
+        return (f"UPDATE Research_Leaderboard SET {column} = {column} - 1 "
+                f"WHERE Lecturer_ID = {lecturer};")
+
+    statements = []
+    for source, column in LEADERBOARD_SOURCES:
+        table = source.table.name
+        prefix = f"trg_{table.lower()}_leaderboard"
+        statements += [
+            _row_trigger(dialect, f"{prefix}_insert", 'AFTER INSERT', table,
+                         increment(f"NEW.{source.name}", column)),
+            _row_trigger(dialect, f"{prefix}_delete", 'AFTER DELETE', table,
+                         decrement(f"OLD.{source.name}", column)),
+            _row_trigger(dialect, f"{prefix}_update", 'AFTER UPDATE', table,
+                         decrement(f"OLD.{source.name}", column)
+                         + ' ' + increment(f"NEW.{source.name}", column),
+                         changed.format(source.name)),
+        ]
+
+    # lecturers moving department or leaving
+    statements += [
+        _row_trigger(dialect, 'trg_lecturers_leaderboard_update', 'AFTER UPDATE', 'Lecturers',
+                     "UPDATE Research_Leaderboard SET Department_ID = NEW.Department_ID "
+                     "WHERE Lecturer_ID = NEW.Lecturer_ID;",
+                     changed.format('Department_ID')),
+        _row_trigger(dialect, 'trg_lecturers_leaderboard_delete', 'AFTER DELETE', 'Lecturers',
+                     "DELETE FROM Research_Leaderboard WHERE Lecturer_ID = OLD.Lecturer_ID;"),
+    ]
+    if dialect == 'mysql':
+        # runs before ON DELETE CASCADE removes the project's team members
+        statements.append(_row_trigger(
+            dialect, 'trg_research_projects_leaderboard_cascade', 'BEFORE DELETE', 'Research_Projects',
+            "UPDATE Research_Leaderboard SET Team_memberships = Team_memberships - 1 "
+            "WHERE Lecturer_ID IN (SELECT Lecturer_ID FROM Research_Team_Members "
+            "WHERE Project_ID = OLD.Project_ID);"))
+    return statements
+
+
+@event.listens_for(Base.metadata, 'after_create')
+def _create_leaderboard_triggers(target, connection, tables=(), **kw):
+    """Add the triggers when create_all makes Research_Leaderboard (migration 006 does it otherwise)"""
+    dialect = connection.dialect.name
+    if ResearchLeaderboard.__table__ not in tables or dialect not in ('mysql', 'sqlite'):
+        return
+    for statement in research_leaderboard_triggers(dialect):
+        connection.exec_driver_sql(statement)
+
+
+def research_leaderboard_counts():
+    """SELECT of every lecturer's research counts, aggregated from the source tables"""
+    counts = []
+    for source, column in LEADERBOARD_SOURCES:
+        counts.append((select(source.label('Lecturer_ID'), func.count().label(column))
+                       .where(source.isnot(None)).group_by(source).subquery(), column))
+
+    lecturers = Lecturer.__table__
+    statement = select(lecturers.c.Lecturer_ID, lecturers.c.Department_ID,
+                       *[func.coalesce(counted.c[column], 0).label(column) for counted, column in counts])
+    joined = lecturers
+    for counted, column in counts:
+        joined = joined.outerjoin(counted, counted.c.Lecturer_ID == lecturers.c.Lecturer_ID)
+    return statement.select_from(joined).where(
+        or_(*[counted.c.Lecturer_ID.isnot(None) for counted, column in counts]))
+
+
+def rebuild_research_leaderboard(session):
+    """Recount Research_Leaderboard from scratch (migration 006 does this once)
+
+    Only needed if the counts have drifted - e.g. rows changed while the
+    triggers were dropped. Runs in one transaction, so query 7 sees either the
+    old or the new counts.
+    """
+    table = ResearchLeaderboard.__table__
+    started = time.perf_counter()
+    session.execute(table.delete())
+    session.execute(table.insert().from_select(
+        ['Lecturer_ID', 'Department_ID'] + list(LEADERBOARD_METRICS.values()),
+        research_leaderboard_counts()))
+    session.commit()
+    rows = session.query(func.count()).select_from(table).scalar()
+    print(f"Research_Leaderboard rebuilt: {rows} lecturers in {time.perf_counter() - started:.2f}s")
+    return rows
+
+# ENROLLMENT CASCADES
+def enrollment_cascade_triggers(dialect):
+    """CREATE TRIGGER statements deleting the enrollments and grades of deleted students and courses
+
+    Course_Enrollments and Student_Grades lost their foreign keys, and with them
+    ON DELETE CASCADE, when Course_Enrollments was partitioned (migration 005).
+    A deleted enrollment takes its grade with it, as the key from Student_Grades did.
+    """
+    statements = [_row_trigger(
+        dialect, 'trg_course_enrollments_grades_delete', 'AFTER DELETE', 'Course_Enrollments',
+        "DELETE FROM Student_Grades WHERE Student_id = OLD.Student_id "
+        "AND Course_id = OLD.Course_id AND Term_ID = OLD.Term_ID;")]
+    for table, key, column in (('Students', 'Student_id', 'Student_id'),
+                               ('Courses', 'Course_ID', 'Course_id')):
+        statements.append(_row_trigger(
+            dialect, f"trg_{table.lower()}_enrollments_delete", 'AFTER DELETE', table,
+            f"DELETE FROM Student_Grades WHERE {column} = OLD.{key}; "
+            f"DELETE FROM Course_Enrollments WHERE {column} = OLD.{key};"))
+    return statements
+
+
+@event.listens_for(Base.metadata, 'after_create')
+def _create_enrollment_triggers(target, connection, tables=(), **kw):
+    """Add the triggers when create_all makes Course_Enrollments (migration 005 does it otherwise)"""
+    dialect = connection.dialect.name
+    if CourseEnrollment.__table__ not in tables or dialect not in ('mysql', 'sqlite'):
+        return
+    for statement in enrollment_cascade_triggers(dialect):
+        connection.exec_driver_sql(statement)
+
+# GRADE PARSING AND MIGRATION
+# letter grades found in Students.Current_Grades, as percentages
+LETTER_GRADE_PERCENT = {
+    'A+': 97, 'A': 93, 'A-': 90,
+    'B+': 87, 'B': 83, 'B-': 80,
+    'C+': 77, 'C': 73, 'C-': 70,
+    'D+': 67, 'D': 63, 'D-': 60,
+    'F': 50
+}
+
+
+def parse_grade(value):
+    """Turn a grade ('A-', '72', '68.5') into a percentage, or None if it is not a grade"""
+    value = value.strip().upper()
+    if value in LETTER_GRADE_PERCENT:
+        return float(LETTER_GRADE_PERCENT[value])
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def parse_current_grades(current_grades):
+    """Parse Students.Current_Grades text into (course_code, percent, letter_grade) tuples
+
+    Entries look like 'CS101: A, MATH101: 72'. Entries without a course code get
+    course_code None, entries that are not a grade at all are skipped.
+    """
+    parsed = []
+    if not current_grades:
+        return parsed
+    for entry in current_grades.split(','):
+        if ':' in entry:
+            course_code, value = entry.split(':', 1)
+            course_code = course_code.strip() or None
+        else:
+            course_code, value = None, entry
+        percent = parse_grade(value)
+        if percent is None:
+            continue
+        letter = value.strip().upper()
+        parsed.append((course_code, percent, letter if letter in LETTER_GRADE_PERCENT else None))
+    return parsed
+
+
+def migrate_current_grades(session, batch_size=1000):
+    """One-off copy of Students.Current_Grades into Student_Grades
+
+    Students are read in primary key order, batch_size at a time, and every batch
+    is written with two executemany inserts. A grade for a course the student has
+    no Course_Enrollments row for gets a 'Completed' enrollment, so every grade is
+    linked to an enrollment. Safe to run again - existing rows are left alone.
+    """
+    course_ids = {code: course_id for code, course_id in
+                  session.query(Course.Course_Code, Course.Course_ID).all()}
+
+    # INSERT IGNORE on MySQL, INSERT OR IGNORE on SQLite
+    insert_enrollments = insert(CourseEnrollment).prefix_with('IGNORE', dialect='mysql') \
+        .prefix_with('OR IGNORE', dialect='sqlite')
+    insert_grades = insert(StudentGrade).prefix_with('IGNORE', dialect='mysql') \
+        .prefix_with('OR IGNORE', dialect='sqlite')
+    # the semester of these grades is not known
+    ensure_terms(session, [UNKNOWN_TERM_ID])
+
+    stats = {'students': 0, 'grades': 0, 'skipped': 0}
+    last_id = 0
+    while True:
+        students = session.query(Student.Student_id, Student.Current_Grades).filter(
+            Student.Student_id > last_id, Student.Current_Grades.isnot(None)
+        ).order_by(Student.Student_id).limit(batch_size).all()
+        if not students:
+            break
+
+        # enrollments in any term - the primary key includes Term_ID, so INSERT IGNORE alone
+        # would add a second, unknown-term enrollment next to the real one; the grade goes
+        # with the latest of them
+        enrolled = {(student_id, course_id): term for student_id, course_id, term in session.query(
+            CourseEnrollment.Student_id, CourseEnrollment.Course_id, func.max(CourseEnrollment.Term_ID)
+        ).filter(
+            CourseEnrollment.Student_id.between(students[0].Student_id, students[-1].Student_id)
+        ).group_by(CourseEnrollment.Student_id, CourseEnrollment.Course_id).all()}
+
+        enrollments = []
+        grades = []
+        for student_id, current_grades in students:
+            seen = set()
+            for course_code, percent, letter in parse_current_grades(current_grades):
+                course_id = course_ids.get(course_code)
+                if course_id is None or course_id in seen:
+                    stats['skipped'] += 1
+                    continue
+                seen.add(course_id)
+                term = enrolled.get((student_id, course_id))
+                if term is None:
+                    term = UNKNOWN_TERM_ID
+                    enrollments.append({'Student_id': student_id, 'Course_id': course_id,
+                                        'Term_ID': term, 'Status': 'Completed'})
+                grades.append({'Student_id': student_id, 'Course_id': course_id, 'Term_ID': term,
+                               'Grade': percent, 'Letter_grade': letter})
+
+        if enrollments:
+            session.execute(insert_enrollments, enrollments)
+        if grades:
+            session.execute(insert_grades, grades)
+        session.commit()
+
+        stats['students'] += len(students)
+        stats['grades'] += len(grades)
+        last_id = students[-1].Student_id
+        print(f"Migrated grades for {stats['students']} students ({stats['grades']} grades)")
+
+    return stats
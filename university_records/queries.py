@@ -0,0 +1,655 @@
+"""The core queries and their precompiled statements"""
+
+import sqlalchemy
+from sqlalchemy import Integer, text, bindparam, or_, select
+
+from .config import BULK_KEY_CHUNK_SIZE, NGRAM_TOKEN_SIZE, STREAM_CHUNK_SIZE
+from .models import (
+    Base, Course, CourseEnrollment, CourseInstructor, Department, LEADERBOARD_METRICS, Lecturer,
+    NonAcademicStaff, Program, ResearchLeaderboard, SCHEMA_VERSION, Student, StudentGrade,
+    normalize_name, parse_current_grades, parse_term, research_leaderboard_counts
+)
+from .analytics import GradeCohort
+from .results import ResultSet
+
+
+# QUERY FUNCTIONS
+def _escape_like(value):
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def _key_chunks(keys, size=BULK_KEY_CHUNK_SIZE):
+    for start in range(0, len(keys), size):
+        yield keys[start:start + size]
+
+
+def _bulk_result_sets(statement, rows_by_key):
+    """{key: [rows]} of a bulk query as {key: ResultSet}"""
+    columns = statement.selected_columns.keys()
+    return {key: ResultSet(columns, rows) for key, rows in rows_by_key.items()}
+
+# PRECOMPILED STATEMENTS
+# The per-call queries are Core select()s with bound parameters, built once per
+# variant and run straight on the session's connection - no ORM Query is put
+# together per call, SQLAlchemy's compiled cache is hit with the same statement
+# object every time, and rows come back as plain named tuples without the ORM
+# result processing.
+_precompiled = {}
+
+
+def precompiled(builder, **options):
+    """builder(**options), built on first use and reused afterwards"""
+    key = (builder.__name__, tuple(sorted(options.items())))
+    statement = _precompiled.get(key)
+    if statement is None:
+        statement = _precompiled[key] = builder(**options)
+    return statement
+
+
+def _empty_result(builder, **options):
+    """A ResultSet with no rows and the columns of precompiled(builder, **options)"""
+    return ResultSet(precompiled(builder, **options).selected_columns.keys())
+
+
+def _name_search_select(table_name, key_name, fulltext):
+    """key_name of the rows whose Name_Search matches :search (FULLTEXT) or :pattern (LIKE)"""
+    table = Base.metadata.tables[table_name]
+    if fulltext:
+        condition = text(f"MATCH({table_name}.Name_Search) AGAINST (:search IN BOOLEAN MODE)")
+    else:
+        condition = table.c.Name_Search.like(bindparam('pattern'), escape='\\')
+    return select(table.c[key_name]).where(condition)
+
+
+def _name_like_select(table_name, key_name):
+    """key_name of the rows whose Name contains :pattern, any case - before migration 002"""
+    table = Base.metadata.tables[table_name]
+    return select(table.c[key_name]).where(table.c.Name.ilike(bindparam('pattern'), escape='\\'))
+
+
+def _query_1_select(course=None, lecturers=False, with_lecturer_id=False):
+    """Query 1 - course is 'one' (:course_code) or 'many' (:course_codes), lecturers adds :lecturer_ids"""
+    students, enrollments, courses = Student.__table__, CourseEnrollment.__table__, Course.__table__
+    instructors, lecturers_table = CourseInstructor.__table__, Lecturer.__table__
+    columns = [students.c.Name, students.c.Contact_info, courses.c.Course_Code,
+               courses.c.Name.label('Course_Name'), lecturers_table.c.Name.label('Lecturer_Name')]
+    if with_lecturer_id:
+        columns.append(instructors.c.Lecturer_ID)
+    statement = select(*columns).select_from(
+        students.join(enrollments, students.c.Student_id == enrollments.c.Student_id)
+        .join(courses, enrollments.c.Course_id == courses.c.Course_ID)
+        .join(instructors, courses.c.Course_ID == instructors.c.Course_ID)
+        .join(lecturers_table, instructors.c.Lecturer_ID == lecturers_table.c.Lecturer_ID))
+    if course == 'one':
+        statement = statement.where(courses.c.Course_Code == bindparam('course_code'))
+    elif course == 'many':
+        statement = statement.where(courses.c.Course_Code.in_(bindparam('course_codes', expanding=True)))
+    if lecturers:
+        statement = statement.where(
+            instructors.c.Lecturer_ID.in_(bindparam('lecturer_ids', expanding=True)))
+    return statement
+
+
+def _enrollment_term_condition(by_term):
+    """Course_Enrollments rows of :term_id (or the :semester string, before migration 004)"""
+    enrollments = CourseEnrollment.__table__
+    # an integer Term_ID lets MySQL prune Course_Enrollments to one partition
+    return (enrollments.c.Term_ID == bindparam('term_id') if by_term
+            else enrollments.c.Semester == bindparam('semester'))
+
+
+def _query_3_select(by_term):
+    """Query 3 - students with no enrollment for :term_id (or the :semester string)"""
+    students, enrollments, programs = Student.__table__, CourseEnrollment.__table__, Program.__table__
+    enrolled_students = select(enrollments.c.Student_id).where(
+        _enrollment_term_condition(by_term)).distinct().subquery()
+    return select(
+        students.c.Name, students.c.Contact_info, students.c.Year_of_study,
+        programs.c.Name.label('Program_Name')
+    ).select_from(
+        students.outerjoin(enrolled_students, students.c.Student_id == enrolled_students.c.Student_id)
+        .join(programs, students.c.Program_id == programs.c.Program_ID)
+    ).where(enrolled_students.c.Student_id.is_(None))
+
+
+def _enrollments_by_term_select(by_term):
+    """Term enrollments - every enrollment of :term_id (or the :semester string), with student and course"""
+    students, enrollments, courses = Student.__table__, CourseEnrollment.__table__, Course.__table__
+    return select(
+        students.c.Student_id, students.c.Name, courses.c.Course_Code,
+        courses.c.Name.label('Course_Name'), enrollments.c.Semester, enrollments.c.Status,
+        enrollments.c.Enrollment_date
+    ).select_from(
+        enrollments.join(students, enrollments.c.Student_id == students.c.Student_id)
+        .join(courses, enrollments.c.Course_id == courses.c.Course_ID)
+    ).where(_enrollment_term_condition(by_term)) \
+        .order_by(enrollments.c.Student_id, enrollments.c.Course_id)
+
+
+def _query_6_select(with_department_id=False):
+    """Query 6 - courses taught by lecturers in :department_ids"""
+    courses, instructors = Course.__table__, CourseInstructor.__table__
+    lecturers, departments = Lecturer.__table__, Department.__table__
+    columns = [courses.c.Course_Code, courses.c.Name.label('Course_Name'), courses.c.Credits,
+               lecturers.c.Name.label('Lecturer_Name'), departments.c.Name.label('Department')]
+    if with_department_id:
+        columns.append(lecturers.c.Department_ID)
+    return select(*columns).select_from(
+        courses.join(instructors, courses.c.Course_ID == instructors.c.Course_ID)
+        .join(lecturers, instructors.c.Lecturer_ID == lecturers.c.Lecturer_ID)
+        .join(departments, lecturers.c.Department_ID == departments.c.Department_ID)
+    ).where(lecturers.c.Department_ID.in_(bindparam('department_ids', expanding=True)))
+
+
+def _query_7_select(metric, leaderboard, by_department):
+    """Query 7 - top :limit lecturers by metric, from Research_Leaderboard or aggregated live"""
+    if leaderboard:
+        counts = ResearchLeaderboard.__table__
+    else:
+        # not migrated yet - aggregate the same counts on the fly
+        counts = research_leaderboard_counts().subquery()
+    lecturers, departments = Lecturer.__table__, Department.__table__
+    column = counts.c[LEADERBOARD_METRICS[metric]]
+    statement = select(
+        lecturers.c.Name,
+        departments.c.Name.label('Department'),
+        counts.c.Projects_led.label('Project_Count'),
+        counts.c.Team_memberships.label('Team_Memberships'),
+        counts.c.Publications.label('Publication_Count')
+    ).select_from(
+        counts.join(lecturers, lecturers.c.Lecturer_ID == counts.c.Lecturer_ID)
+        .join(departments, counts.c.Department_ID == departments.c.Department_ID)
+    ).where(column > 0)
+    if by_department:
+        statement = statement.where(
+            counts.c.Department_ID.in_(bindparam('department_ids', expanding=True)))
+    # same order as the (Department_ID, metric) indexes, which end in the primary key
+    return statement.order_by(column.desc(), counts.c.Lecturer_ID.desc()) \
+        .limit(bindparam('limit', type_=Integer))
+
+
+def _query_10_select(with_department_id=False):
+    """Query 10 - non-academic staff in :department_ids"""
+    staff, departments = NonAcademicStaff.__table__, Department.__table__
+    columns = [staff.c.Name, staff.c.Job_Title, staff.c.Employment_type, staff.c.Contact_details,
+               departments.c.Name.label('Department')]
+    if with_department_id:
+        columns.append(staff.c.Department_ID)
+    return select(*columns).select_from(
+        staff.join(departments, staff.c.Department_ID == departments.c.Department_ID)
+    ).where(staff.c.Department_ID.in_(bindparam('department_ids', expanding=True)))
+
+
+class DatabaseQueries:
+    """The core queries
+
+    query_* methods print database errors, count them in failures and return
+    an empty result. The stream_* versions raise them instead, so a stream that
+    stopped early is never taken for a complete result by the cache, exports or the grid.
+    """
+    def __init__(self, session, analytics_session=None, schema_version=SCHEMA_VERSION):
+        self.session = session
+        # aggregate queries (2, 7, cohort analytics) read the local snapshot when there is one
+        self.analytics = analytics_session if analytics_session is not None else session
+        # queries fall back to the older tables and columns on a database that is not migrated yet
+        self.schema_version = schema_version
+        self.failures = 0
+
+    def _execute(self, statement, params, session=None):
+        """Run a precompiled statement on the session's connection - Core rows, no ORM"""
+        return (session if session is not None else self.session).connection().execute(
+            statement, params)
+
+    def _stream_statement(self, statement, params, chunk_size, session=None):
+        """Same as _execute but through a server-side cursor (PyMySQL SSCursor), chunk_size rows at a time"""
+        # yield_per turns on stream_results, so rows are never all held in memory
+        connection = (session if session is not None else self.session).connection()
+        for row in connection.execution_options(yield_per=chunk_size).execute(statement, params):
+            yield row
+
+    def _stream_text(self, sql, chunk_size, params=None, session=None):
+        """Same as _stream_statement but for a raw SQL string"""
+        result = (session if session is not None else self.session).execute(
+            text(sql), params or {},
+            execution_options={'stream_results': True, 'yield_per': chunk_size}
+        )
+        for row in result:
+            yield row
+
+    def _resolve_name_ids(self, model, key, name):
+        """Turn fuzzy name input into matching primary keys using the Name_Search index
+
+        On MySQL this is an ngram FULLTEXT phrase search, so any part of a name
+        matches (like the old LIKE '%name%') without a full table scan. Before
+        migration 002 there is no Name_Search, and it is the old LIKE on Name.
+        """
+        if self.schema_version < 2:
+            name = (name or '').strip()
+            if not name:
+                return []
+            statement = precompiled(_name_like_select, table_name=model.__tablename__,
+                                    key_name=key.key)
+            return self._execute(statement, {'pattern': f'%{_escape_like(name)}%'}).scalars().all()
+        search = normalize_name(name)
+        if not search:
+            return []
+        dialect = self.session.get_bind().dialect.name
+        if dialect == 'mysql' and len(search) >= NGRAM_TOKEN_SIZE:
+            statement = precompiled(_name_search_select, table_name=model.__tablename__,
+                                    key_name=key.key, fulltext=True)
+            params = {'search': f'"{search}"'}
+        else:
+            # embedded databases and one-letter input
+            statement = precompiled(_name_search_select, table_name=model.__tablename__,
+                                    key_name=key.key, fulltext=False)
+            params = {'pattern': f'%{_escape_like(search)}%'}
+        return self._execute(statement, params).scalars().all()
+
+    def resolve_lecturer_ids(self, lecturer_name):
+        """Lecturer_IDs whose name contains lecturer_name (case and accent insensitive)"""
+        return self._resolve_name_ids(Lecturer, Lecturer.Lecturer_ID, lecturer_name)
+
+    def resolve_department_ids(self, department_name):
+        """Department_IDs whose name contains department_name (case and accent insensitive)"""
+        return self._resolve_name_ids(Department, Department.Department_ID, department_name)
+
+    def _query_1_statement(self, course_code, lecturer_name):
+        """(statement, parameters), or None when nothing can match"""
+        # work with only one or both parameters
+        if not course_code and not lecturer_name:
+            return None
+        params = {}
+        if course_code:
+            params['course_code'] = course_code
+        if lecturer_name:
+            # resolve the name first, then join on integer keys
+            params['lecturer_ids'] = self.resolve_lecturer_ids(lecturer_name)
+            if not params['lecturer_ids']:
+                return None
+        statement = precompiled(_query_1_select, course='one' if course_code else None,
+                                lecturers=bool(lecturer_name))
+        return statement, params
+
+    def query_1_students_in_course_by_lecturer(self, course_code=None, lecturer_name=None):
+        """Find all students enrolled in a specific course taught by a particular lecturer"""
+        try:
+            query = self._query_1_statement(course_code, lecturer_name)
+            if query is not None:
+                results = ResultSet.from_result(self._execute(*query))
+                return results
+            else:
+                return _empty_result(_query_1_select)
+                
+        except Exception as e:
+            print(f"Query 1 error: {e}")
+            self.failures += 1
+            return _empty_result(_query_1_select)
+
+    def stream_query_1_students_in_course_by_lecturer(self, course_code=None, lecturer_name=None,
+                                                      chunk_size=STREAM_CHUNK_SIZE):
+        """Streaming version of query 1 - yields rows instead of building a list"""
+        query = self._query_1_statement(course_code, lecturer_name)
+        if query is not None:
+            yield from self._stream_statement(*query, chunk_size)
+
+    # averages are worked out by MySQL, only qualifying students are sent back
+    QUERY_2_SQL = """
+    SELECT s.Name, p.Name as Program, ROUND(AVG(g.Grade), 2) as Average_Grade,
+           s.Year_of_study as Year, s.Contact_info as Contact
+    FROM Students s
+    JOIN Programs p ON s.Program_id = p.Program_ID
+    JOIN Student_Grades g ON g.Student_id = s.Student_id
+    WHERE s.Year_of_study = :year
+    GROUP BY s.Student_id, s.Name, p.Name, s.Year_of_study, s.Contact_info
+    HAVING AVG(g.Grade) > :threshold
+    ORDER BY Average_Grade DESC
+    """
+
+    QUERY_2_COLUMNS = ('Name', 'Program', 'Average_Grade', 'Year', 'Contact')
+
+    def _has_student_grades(self):
+        """Whether Student_Grades exists (migration 001) and migrate-grades has filled it"""
+        if not sqlalchemy.inspect(self.analytics.connection()).has_table(StudentGrade.__tablename__):
+            return False
+        return self.analytics.query(StudentGrade.Student_id).limit(1).first() is not None
+
+    def _query_2_from_current_grades(self, threshold, year, chunk_size=STREAM_CHUNK_SIZE):
+        """Query 2 rows averaged from the Students.Current_Grades text, best first"""
+        query = self.analytics.query(
+            Student.Name, Program.Name, Student.Year_of_study, Student.Contact_info,
+            Student.Current_Grades
+        ).join(Program, Student.Program_id == Program.Program_ID
+        ).filter(Student.Year_of_study == year, Student.Current_Grades.isnot(None))
+        rows = []
+        for name, program, year_of_study, contact, current_grades in query.yield_per(chunk_size):
+            grades = [percent for _, percent, _ in parse_current_grades(current_grades)]
+            if grades and sum(grades) / len(grades) > threshold:
+                rows.append((name, program, round(sum(grades) / len(grades), 2), year_of_study, contact))
+        rows.sort(key=lambda row: row[2], reverse=True)
+        return rows
+
+    def query_2_high_performing_final_year_students(self, threshold=70, year=4):
+        """List all students with average grade above 70% who are in their final year
+
+        Uses the Student_Grades table, or the Current_Grades text until
+        `python code.py migrate-grades` has filled it.
+        """
+        try:
+            if not self._has_student_grades():
+                return ResultSet(self.QUERY_2_COLUMNS, self._query_2_from_current_grades(threshold, year))
+            results = ResultSet.from_result(self.analytics.execute(
+                text(self.QUERY_2_SQL), {'year': year, 'threshold': threshold}
+            ))
+            return results
+        except Exception as e:
+            print(f"Query 2 error: {e}")
+            self.failures += 1
+            return ResultSet(self.QUERY_2_COLUMNS)
+
+    def stream_query_2_high_performing_final_year_students(self, threshold=70, year=4,
+                                                          chunk_size=STREAM_CHUNK_SIZE):
+        """Streaming version of query 2 - yields rows instead of building a list"""
+        if not self._has_student_grades():
+            yield from self._query_2_from_current_grades(threshold, year, chunk_size)
+            return
+        yield from self._stream_text(self.QUERY_2_SQL, chunk_size,
+                                     {'year': year, 'threshold': threshold}, self.analytics)
+
+    def _term_statement(self, builder, semester):
+        """builder's statement and parameters for one term - by Term_ID from migration 004 on"""
+        term = parse_term(semester) if self.schema_version >= 4 else None
+        if term is not None:
+            return precompiled(builder, by_term=True), {'term_id': term}
+        return precompiled(builder, by_term=False), {'semester': semester}
+
+    def query_3_students_not_enrolled(self, semester='Fall 2025'):
+        """Identify students who haven't registered for any courses in the current semester"""
+        try:
+            results = ResultSet.from_result(self._execute(*self._term_statement(_query_3_select, semester)))
+            return results
+        except Exception as e:
+            print(f"Query 3 error: {e}")
+            self.failures += 1
+            return _empty_result(_query_3_select, by_term=True)
+
+    def stream_query_3_students_not_enrolled(self, semester='Fall 2025', chunk_size=STREAM_CHUNK_SIZE):
+        """Streaming version of query 3 - yields rows instead of building a list"""
+        yield from self._stream_statement(*self._term_statement(_query_3_select, semester), chunk_size)
+
+    def query_enrollments_by_term(self, semester='Fall 2025'):
+        """Every enrollment of one term, with student and course"""
+        try:
+            return ResultSet.from_result(
+                self._execute(*self._term_statement(_enrollments_by_term_select, semester)))
+        except Exception as e:
+            print(f"Term enrollments error: {e}")
+            self.failures += 1
+            return _empty_result(_enrollments_by_term_select, by_term=True)
+
+    def stream_query_enrollments_by_term(self, semester='Fall 2025', chunk_size=STREAM_CHUNK_SIZE):
+        """Streaming version of the term enrollments - for exporting a whole term"""
+        yield from self._stream_statement(
+            *self._term_statement(_enrollments_by_term_select, semester), chunk_size)
+
+    def _query_6_statement(self, department_name):
+        department_ids = self.resolve_department_ids(department_name)
+        if not department_ids:
+            return None
+        return precompiled(_query_6_select), {'department_ids': department_ids}
+
+    def query_6_courses_by_department(self, department_name):
+        """List all courses taught by lecturers in a specific department"""
+        try:
+            query = self._query_6_statement(department_name)
+            if query is None:
+                return _empty_result(_query_6_select)
+            results = ResultSet.from_result(self._execute(*query))
+            return results
+        except Exception as e:
+            print(f"Query 6 error: {e}")
+            self.failures += 1
+            return _empty_result(_query_6_select)
+
+    def stream_query_6_courses_by_department(self, department_name, chunk_size=STREAM_CHUNK_SIZE):
+        """Streaming version of query 6 - yields rows instead of building a list"""
+        query = self._query_6_statement(department_name)
+        if query is not None:
+            yield from self._stream_statement(*query, chunk_size)
+
+    _leaderboard_binds = {}  # engine -> whether it has Research_Leaderboard
+
+    def _has_leaderboard(self):
+        """Whether the analytics database has Research_Leaderboard (migration 006), checked once"""
+        bind = self.analytics.get_bind()
+        if bind not in self._leaderboard_binds:
+            self._leaderboard_binds[bind] = sqlalchemy.inspect(bind).has_table(
+                ResearchLeaderboard.__tablename__)
+        return self._leaderboard_binds[bind]
+
+    def _query_7_statement(self, limit, metric='projects', department_name=None):
+        if metric not in LEADERBOARD_METRICS:
+            raise ValueError(f"Unknown metric {metric!r}, expected one of {', '.join(LEADERBOARD_METRICS)}")
+        params = {'limit': limit}
+        if department_name:
+            params['department_ids'] = self.resolve_department_ids(department_name)
+            if not params['department_ids']:
+                return None
+        statement = precompiled(_query_7_select, metric=metric, leaderboard=self._has_leaderboard(),
+                                by_department=bool(department_name))
+        return statement, params
+
+    def query_7_top_research_supervisors(self, limit=10, metric='projects', department_name=None):
+        """Top lecturers by research projects led, team memberships or publications
+
+        metric is 'projects', 'team' or 'publications'; department_name
+        optionally narrows the ranking to matching departments.
+        """
+        try:
+            query = self._query_7_statement(limit, metric, department_name)
+            if query is None:
+                return self._query_7_empty()
+            results = ResultSet.from_result(self._execute(*query, session=self.analytics))
+            return results
+        except Exception as e:
+            print(f"Query 7 error: {e}")
+            self.failures += 1
+            return self._query_7_empty()
+
+    @staticmethod
+    def _query_7_empty():
+        # the columns are the same for every metric and source, and an unknown metric still gets them
+        return _empty_result(_query_7_select, metric='projects', leaderboard=True, by_department=False)
+
+    def stream_query_7_top_research_supervisors(self, limit=10, metric='projects', department_name=None,
+                                                chunk_size=STREAM_CHUNK_SIZE):
+        """Streaming version of query 7 - yields rows instead of building a list"""
+        query = self._query_7_statement(limit, metric, department_name)
+        if query is not None:
+            yield from self._stream_statement(*query, chunk_size, session=self.analytics)
+
+    def _query_10_statement(self, department_name):
+        department_ids = self.resolve_department_ids(department_name)
+        if not department_ids:
+            return None
+        return precompiled(_query_10_select), {'department_ids': department_ids}
+
+    def query_10_staff_by_department(self, department_name):
+        """Find all staff members employed in a specific department"""
+        try:
+            query = self._query_10_statement(department_name)
+            if query is None:
+                return _empty_result(_query_10_select)
+            results = ResultSet.from_result(self._execute(*query))
+            return results
+        except Exception as e:
+            print(f"Query 10 error: {e}")
+            self.failures += 1
+            return _empty_result(_query_10_select)
+
+    def stream_query_10_staff_by_department(self, department_name, chunk_size=STREAM_CHUNK_SIZE):
+        """Streaming version of query 10 - yields rows instead of building a list"""
+        query = self._query_10_statement(department_name)
+        if query is not None:
+            yield from self._stream_statement(*query, chunk_size)
+
+    # Bulk variants of queries 1, 6 and 10: many keys in one set-based query
+    # (IN-lists of BULK_KEY_CHUNK_SIZE keys), results grouped by the key they were asked for
+    def _resolve_many_name_ids(self, model, key, names):
+        """{name: matching primary keys} for many names with one Name_Search lookup"""
+        if self.schema_version < 2:
+            # the old case-insensitive LIKE on Name, before migration 002
+            column = model.Name
+            searches = {name: (name or '').strip().casefold() for name in names}
+        else:
+            column = model.Name_Search
+            searches = {name: normalize_name(name) for name in names}
+        wanted = sorted({search for search in searches.values() if search})
+        if not wanted:
+            return {name: [] for name in names}
+        dialect = self.session.get_bind().dialect.name
+        if self.schema_version < 2:
+            condition = or_(*[column.ilike(f'%{_escape_like(search)}%', escape='\\')
+                              for search in wanted])
+        elif dialect == 'mysql' and all(len(search) >= NGRAM_TOKEN_SIZE for search in wanted):
+            # phrases without operators are OR-ed - one FULLTEXT lookup for every name
+            condition = text(
+                f"MATCH({model.__tablename__}.Name_Search) AGAINST (:search IN BOOLEAN MODE)"
+            ).bindparams(search=' '.join(f'"{search}"' for search in wanted))
+        else:
+            condition = or_(*[column.like(f'%{_escape_like(search)}%', escape='\\')
+                              for search in wanted])
+        rows = self.session.query(key, column).filter(condition).all()
+        # the same containment test as LIKE '%name%', to tell the names apart again
+        return {name: [row_id for row_id, value in rows
+                       if search and search in (value or '').casefold()]
+                for name, search in searches.items()}
+
+    def _ids_by_key(self, ids_by_name):
+        """Invert {name: ids} into {id: names}"""
+        names_by_id = {}
+        for name, ids in ids_by_name.items():
+            for row_id in ids:
+                names_by_id.setdefault(row_id, []).append(name)
+        return names_by_id
+
+    def query_1_students_by_course_bulk(self, course_codes, lecturer_name=None):
+        """Query 1 for many course codes at once - {course code: rows}"""
+        codes = list(dict.fromkeys(code.strip() for code in course_codes if code and code.strip()))
+        results = {code: [] for code in codes}
+        # course codes compare case-insensitively in MySQL
+        keys_of = {}
+        for code in codes:
+            keys_of.setdefault(code.casefold(), []).append(code)
+        statement = precompiled(_query_1_select, course='many', lecturers=bool(lecturer_name))
+        try:
+            params = {}
+            if lecturer_name:
+                params['lecturer_ids'] = self.resolve_lecturer_ids(lecturer_name)
+                if not params['lecturer_ids']:
+                    return _bulk_result_sets(statement, results)
+            for chunk in _key_chunks(codes):
+                for row in self._execute(statement, dict(params, course_codes=chunk)):
+                    for code in keys_of[row.Course_Code.casefold()]:
+                        results[code].append(row)
+            return _bulk_result_sets(statement, results)
+        except Exception as e:
+            print(f"Query 1 bulk error: {e}")
+            self.failures += 1
+            # every requested key is still there, with no rows
+            return _bulk_result_sets(statement, {code: [] for code in codes})
+
+    def query_1_students_by_lecturer_bulk(self, lecturer_names, course_code=None):
+        """Query 1 for many lecturer names at once - {lecturer name: rows}"""
+        statement = precompiled(_query_1_select, course='one' if course_code else None,
+                                lecturers=True, with_lecturer_id=True)
+        try:
+            names_by_id = self._ids_by_key(
+                self._resolve_many_name_ids(Lecturer, Lecturer.Lecturer_ID, lecturer_names))
+            results = {name: [] for name in lecturer_names}
+            params = {'course_code': course_code} if course_code else {}
+            for chunk in _key_chunks(list(names_by_id)):
+                for row in self._execute(statement, dict(params, lecturer_ids=chunk)):
+                    for name in names_by_id[row.Lecturer_ID]:
+                        results[name].append(row)
+            return _bulk_result_sets(statement, results)
+        except Exception as e:
+            print(f"Query 1 bulk error: {e}")
+            self.failures += 1
+            return _bulk_result_sets(statement, {name: [] for name in lecturer_names})
+
+    def query_6_courses_by_department_bulk(self, department_names):
+        """Query 6 for many department names at once - {department name: rows}"""
+        statement = precompiled(_query_6_select, with_department_id=True)
+        try:
+            names_by_id = self._ids_by_key(self._resolve_many_name_ids(
+                Department, Department.Department_ID, department_names))
+            results = {name: [] for name in department_names}
+            for chunk in _key_chunks(list(names_by_id)):
+                for row in self._execute(statement, {'department_ids': chunk}):
+                    for name in names_by_id[row.Department_ID]:
+                        results[name].append(row)
+            return _bulk_result_sets(statement, results)
+        except Exception as e:
+            print(f"Query 6 bulk error: {e}")
+            self.failures += 1
+            return _bulk_result_sets(statement, {name: [] for name in department_names})
+
+    def query_10_staff_by_department_bulk(self, department_names):
+        """Query 10 for many department names at once - {department name: rows}"""
+        statement = precompiled(_query_10_select, with_department_id=True)
+        try:
+            names_by_id = self._ids_by_key(self._resolve_many_name_ids(
+                Department, Department.Department_ID, department_names))
+            results = {name: [] for name in department_names}
+            for chunk in _key_chunks(list(names_by_id)):
+                for row in self._execute(statement, {'department_ids': chunk}):
+                    for name in names_by_id[row.Department_ID]:
+                        results[name].append(row)
+            return _bulk_result_sets(statement, results)
+        except Exception as e:
+            print(f"Query 10 bulk error: {e}")
+            self.failures += 1
+            return _bulk_result_sets(statement, {name: [] for name in department_names})
+
+    def query_cohort_analytics(self, year=None, thresholds=range(50, 95, 5)):
+        """Cohort-wide grade statistics: program averages, percentiles, histogram, threshold sweep"""
+        try:
+            cohort = GradeCohort.load(self.analytics, year)
+            results = [{'Statistic': 'Students', 'Group': 'All', 'Value': len(cohort)}]
+            for program, (size, average) in sorted(cohort.program_averages().items()):
+                results.append({'Statistic': 'Program average', 'Group': f"{program} ({size})",
+                                'Value': round(average, 2)})
+            for point, value in cohort.percentiles().items():
+                results.append({'Statistic': 'Percentile', 'Group': f"P{point}",
+                                'Value': round(value, 2)})
+            for low, high, count in cohort.histogram():
+                results.append({'Statistic': 'Grade histogram', 'Group': f"{low:g}-{high:g}",
+                                'Value': count})
+            for threshold, count in cohort.threshold_sweep(thresholds):
+                results.append({'Statistic': 'Students above', 'Group': f"> {threshold:g}",
+                                'Value': count})
+            return ResultSet.of(results)
+        except Exception as e:
+            print(f"Cohort analytics error: {e}")
+            self.failures += 1
+            return ResultSet(('Statistic', 'Group', 'Value'))
+
+    def get_available_courses(self):
+        """Get list of available course codes"""
+        try:
+            results = self.session.query(Course.Course_Code).distinct().all()
+            return [row[0] for row in results]
+        except Exception as e:
+            print(f"Error getting courses: {e}")
+            self.failures += 1
+            return ["CS101", "MATH201", "ENG305", "CS499", "LIT102"]  # 返回默認值
+
+    def get_available_lecturers(self):
+        """Get list of available lecturer names"""
+        try:
+            results = self.session.query(Lecturer.Name).distinct().all()
+            return [row[0] for row in results]
+        except Exception as e:
+            print(f"Error getting lecturers: {e}")
+            self.failures += 1
+            return ["Dr. Alan Turing", "Prof. Ada Lovelace", "Dr. Isaac Newton"]  # 返回默認值
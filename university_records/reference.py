@@ -0,0 +1,170 @@
+"""Autocomplete reference data - course codes, lecturer and department names, terms"""
+
+import time
+from sqlalchemy.engine import make_url
+import hashlib
+import json
+import os
+import threading
+
+from .config import REFERENCE_CACHE_FILE, REFERENCE_FULL_REFRESH_SECONDS
+from .models import (
+    Course, CourseEnrollment, Department, Lecturer, SCHEMA_VERSION, Term, UNKNOWN_TERM_ID,
+    normalize_name, parse_term
+)
+
+
+# REFERENCE DATA CACHE
+class PrefixTrie:
+    """Character trie mapping search prefixes to display values"""
+    def __init__(self):
+        self.root = {}
+
+    def insert(self, key, value):
+        node = self.root
+        for ch in key:
+            node = node.setdefault(ch, {})
+        node.setdefault(None, []).append(value)  # the None key holds values ending here
+
+    def search(self, prefix, limit=10):
+        """Up to limit distinct values stored under keys starting with prefix"""
+        node = self.root
+        for ch in prefix:
+            node = node.get(ch)
+            if node is None:
+                return []
+        found = []
+        stack = [node]
+        while stack and len(found) < limit:
+            node = stack.pop()
+            for value in node.get(None, ()):
+                if value not in found:
+                    found.append(value)
+            stack.extend(child for ch, child in sorted(node.items(), key=lambda item: str(item[0]),
+                                                       reverse=True) if ch is not None)
+        return found[:limit]
+
+
+def reference_cache_path(database_url, path=REFERENCE_CACHE_FILE):
+    """Warm-start file for one database, so values of different databases never mix"""
+    if database_url is None:
+        return path
+    url = make_url(database_url).render_as_string(hide_password=True)
+    root, extension = os.path.splitext(path)
+    return f"{root}.{hashlib.sha1(url.encode('utf-8')).hexdigest()[:12]}{extension}"
+
+
+class ReferenceDataCache:
+    """Course codes, lecturer names, department names and semesters held in memory
+
+    Loaded once (or warm-started from a local JSON file), then refreshed
+    incrementally: only rows with an ID above the last one seen are fetched.
+    Renames and deletions only show up in a full reload, which replaces the
+    values and runs every REFERENCE_FULL_REFRESH_SECONDS (or on refresh(full=True)).
+    Each kind has a PrefixTrie for type-ahead; every word of a name is indexed,
+    so 'tur' finds 'Dr. Alan Turing'.
+    """
+    # kind -> (model, id column, value column)
+    SOURCES = {
+        'courses': (Course, Course.Course_ID, Course.Course_Code),
+        'lecturers': (Lecturer, Lecturer.Lecturer_ID, Lecturer.Name),
+        'departments': (Department, Department.Department_ID, Department.Name),
+    }
+
+    def __init__(self, path=REFERENCE_CACHE_FILE):
+        self.path = path
+        self.lock = threading.Lock()
+        self.values = {'courses': {}, 'lecturers': {}, 'departments': {}, 'semesters': []}
+        self.tries = {kind: PrefixTrie() for kind in self.values}
+        self.loaded_at = None
+        self.full_refresh_at = None   # time.time() of the last full reload
+
+    def get(self, kind):
+        """Sorted values of one kind"""
+        with self.lock:
+            values = self.values[kind]
+            return sorted(values.values() if isinstance(values, dict) else values)
+
+    def complete(self, kind, prefix, limit=10):
+        """Values of kind matching what the user has typed so far"""
+        prefix = normalize_name(prefix)
+        if not prefix:
+            return []
+        with self.lock:
+            trie = self.tries[kind]
+        return trie.search(prefix, limit)
+
+    def refresh(self, session, full=None, schema_version=SCHEMA_VERSION):
+        """Fetch rows added since the last refresh, or everything again when a full reload is due"""
+        if full is None:
+            full = self.full_refresh_at is None or \
+                time.time() - self.full_refresh_at > REFERENCE_FULL_REFRESH_SECONDS
+        with self.lock:
+            if full:
+                values = {kind: {} for kind in self.SOURCES}
+            else:
+                values = {kind: (dict(v) if isinstance(v, dict) else list(v))
+                          for kind, v in self.values.items()}
+
+        for kind, (model, key, column) in self.SOURCES.items():
+            known = values[kind]
+            last_id = max(known) if known else 0
+            for row_id, value in session.query(key, column).filter(key > last_id).all():
+                known[row_id] = value
+
+        # the Terms table is short, so it is simply re-read
+        if schema_version >= 4:
+            values['semesters'] = [row[0] for row in session.query(Term.Name)
+                                   .filter(Term.Term_ID != UNKNOWN_TERM_ID)
+                                   .order_by(Term.Term_ID.desc()).all()]
+        else:
+            # no Terms table before migration 004 - the semesters enrollments mention, latest first
+            semesters = [row[0] for row in session.query(CourseEnrollment.Semester).distinct()
+                         if row[0]]
+            values['semesters'] = sorted(semesters, key=lambda semester: parse_term(semester) or 0,
+                                         reverse=True)
+        self._replace(values)
+        if full:
+            self.full_refresh_at = time.time()
+
+    def save(self):
+        """Persist to the local file for a warm start next time"""
+        with self.lock:
+            data = {'values': {kind: (list(v.items()) if isinstance(v, dict) else v)
+                               for kind, v in self.values.items()},
+                    'full_refresh_at': self.full_refresh_at}
+        try:
+            with open(self.path, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+        except OSError as e:
+            print(f"Could not save reference data: {e}")
+
+    def load_file(self):
+        """Warm start from the local file - returns False if there is none"""
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+            kinds = data['values']
+        except (OSError, ValueError, KeyError):
+            return False
+        values = {kind: (dict(kinds.get(kind, [])) if kind in self.SOURCES else kinds.get(kind, []))
+                  for kind in self.values}
+        self._replace(values)
+        # the file may be older than the reload interval - then the next refresh is a full one
+        self.full_refresh_at = data.get('full_refresh_at')
+        return True
+
+    def _replace(self, values):
+        """Swap in new values and tries at once, so readers never see a half-built trie"""
+        tries = {}
+        for kind, kind_values in values.items():
+            trie = PrefixTrie()
+            for value in (kind_values.values() if isinstance(kind_values, dict) else kind_values):
+                words = normalize_name(value).split()
+                for i in range(len(words)):
+                    trie.insert(' '.join(words[i:]), value)
+            tries[kind] = trie
+        with self.lock:
+            self.values = values
+            self.tries = tries
+            self.loaded_at = time.time()
@@ -0,0 +1,206 @@
+"""Column-oriented query results"""
+
+from array import array
+from collections import namedtuple
+
+from .config import STREAM_CHUNK_SIZE
+
+
+# RESULT SETS
+# Query results are held column by column: whole-number and float columns in
+# array.array, everything else in one list per column, with repeated values
+# (departments, programs, course names, dates) stored once. That drops the Row or
+# dict every row used to cost. Slices share the columns instead of copying
+# them, so paging and chunked export are free.
+_row_types = {}
+
+
+def _row_type(columns):
+    """Named tuple class for a column list - rows keep _fields like SQLAlchemy rows"""
+    row_type = _row_types.get(columns)
+    if row_type is None:
+        row_type = _row_types[columns] = namedtuple('ResultRow', columns, rename=True)
+    return row_type
+
+
+def _column_array(values, kinds):
+    """values as an array.array when they are all ints or all floats, else None"""
+    if kinds == {int}:
+        try:
+            return array('q', values)
+        except OverflowError:
+            return None
+    if kinds == {float}:
+        return array('d', values)
+    return None
+
+
+class ResultSet:
+    """Query results stored as columns, read back as named tuple rows
+
+    Behaves like a read-only list of rows: len(), iteration, indexing and
+    slicing. A slice is a view on the same columns. Only a ResultSet that is
+    not a slice can be extended.
+    """
+    __slots__ = ('columns', '_data', '_shared', '_start', '_stop', '_view', '_row')
+
+    def __init__(self, columns, rows=()):
+        self.columns = tuple(columns)
+        self._data = [None] * len(self.columns)   # array.array or list per column
+        # per list column, the values seen so far - None once they turn out to be mostly unique
+        self._shared = [{} for _ in self.columns]
+        self._start = 0
+        self._stop = 0
+        self._view = False
+        self._row = _row_type(self.columns)
+        self.extend(rows)
+
+    @classmethod
+    def of(cls, rows):
+        """A ResultSet of any list of result rows - SQLAlchemy rows, dicts or objects"""
+        if isinstance(rows, ResultSet):
+            return rows
+        rows = list(rows)
+        if not rows:
+            return cls(())
+        columns = result_columns(rows[0])
+        return cls(columns, [result_values(row, columns) for row in rows])
+
+    @classmethod
+    def from_result(cls, result, chunk_size=STREAM_CHUNK_SIZE):
+        """Fetch a SQLAlchemy result chunk_size rows at a time - only one chunk of Row objects exists at once"""
+        results = cls(result.keys())
+        for rows in result.partitions(chunk_size):
+            results.extend(rows)
+        return results
+
+    def extend(self, rows):
+        """Add rows (tuples, SQLAlchemy rows or dicts) at the end"""
+        if self._view:
+            raise ValueError("A slice of a ResultSet cannot be extended")
+        rows = rows if isinstance(rows, list) else list(rows)
+        if not rows:
+            return
+        if isinstance(rows[0], dict):
+            rows = [tuple(row.get(column) for column in self.columns) for row in rows]
+        for index, values in enumerate(zip(*rows)):
+            self._data[index] = self._extend_column(index, values)
+        self._stop += len(rows)
+
+    def _extend_column(self, index, values):
+        column = self._data[index]
+        kinds = set(map(type, values))
+        if column is None:
+            column = _column_array(values, kinds)
+            if column is not None:
+                return column
+            column = []
+        elif isinstance(column, array):
+            added = _column_array(values, kinds)
+            if added is not None and added.typecode == column.typecode:
+                column.extend(added)
+                return column
+            # a NULL, or floats among whole numbers - fall back to a list
+            column = list(column)
+
+        shared = self._shared[index]
+        if shared is not None:
+            try:
+                values = list(map(shared.setdefault, values, values))
+            except TypeError:
+                # unhashable values
+                shared = self._shared[index] = None
+            # names and contact details are all different - sharing them only costs memory
+            if shared is not None and len(shared) > (len(column) + len(values)) // 2:
+                self._shared[index] = None
+        column.extend(values)
+        return column
+
+    def column(self, name):
+        """Values of one column - array columns come back as a memoryview, without copying"""
+        column = self._data[self.columns.index(name)]
+        if column is None:
+            return []
+        if isinstance(column, array):
+            return memoryview(column)[self._start:self._stop]
+        return column[self._start:self._stop]
+
+    def sorted_by(self, name, key=None, reverse=False):
+        """A new ResultSet ordered on one column - key is applied to that column's values"""
+        values = self._data[self.columns.index(name)]
+        order = range(self._start, self._stop)
+        if values is not None:
+            order = sorted(order, key=(lambda i: key(values[i])) if key else values.__getitem__,
+                           reverse=reverse)
+        results = ResultSet(self.columns)
+        for index, column in enumerate(self._data):
+            if column is not None:
+                picked = map(column.__getitem__, order)
+                results._data[index] = array(column.typecode, picked) if isinstance(column, array) \
+                    else list(picked)
+        results._shared = [None] * len(self.columns)
+        results._stop = len(order)
+        return results
+
+    def dicts(self):
+        """The rows as a list of dicts - for JSON"""
+        return [dict(zip(self.columns, row)) for row in self]
+
+    def __len__(self):
+        return self._stop - self._start
+
+    def __iter__(self):
+        if not self.columns or self._start == self._stop:
+            return iter(())
+        indexes = range(self._start, self._stop)
+        return map(self._row._make, zip(*[map(column.__getitem__, indexes)
+                                          for column in self._data]))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return ResultSet(self.columns, [self[i] for i in range(start, stop, step)])
+            view = object.__new__(ResultSet)
+            view.columns = self.columns
+            view._data = self._data
+            view._shared = self._shared
+            view._start = self._start + start
+            view._stop = self._start + max(start, stop)
+            view._view = True
+            view._row = self._row
+            return view
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("ResultSet index out of range")
+        return self._row._make(column[self._start + index] for column in self._data)
+
+    def __repr__(self):
+        return f"<ResultSet {len(self)} rows x {len(self.columns)} columns>"
+
+
+# RESULT ROWS
+# columns shown for result objects that are neither dicts nor SQLAlchemy rows
+RESULT_ATTRIBUTES = ['Name', 'Course_Code', 'Course_Name', 'Lecturer_Name',
+                     'Program', 'Average_Grade', 'Year_of_study', 'Contact_info',
+                     'Job_Title', 'Employment_type', 'Contact_details', 'Department']
+
+
+def result_columns(row):
+    """Work out the column names for a result row"""
+    if isinstance(row, dict):
+        return list(row.keys())
+    if hasattr(row, '_fields'):
+        # SQLAlchemy result tuple
+        return list(row._fields)
+    return [attr for attr in RESULT_ATTRIBUTES if hasattr(row, attr)]
+
+
+def result_values(row, columns):
+    """Turn a result row into a plain tuple ordered like columns"""
+    if isinstance(row, dict):
+        return tuple(row.get(column) for column in columns)
+    if hasattr(row, '_fields'):
+        return tuple(row)
+    return tuple(getattr(row, column, None) for column in columns)
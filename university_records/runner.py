@@ -0,0 +1,238 @@
+"""Background query execution for the GUI"""
+
+import time
+from sqlalchemy import func, text
+from concurrent.futures import ThreadPoolExecutor
+import queue
+
+from .config import QUERY_POLL_MS, QUERY_TIMEOUT_SECONDS, QUERY_WORKERS, RESULTS_PAGE_SIZE
+from .queries import DatabaseQueries
+from .cache import CachedDatabaseQueries
+from .instrumentation import InstrumentedDatabaseQueries
+
+
+# BACKGROUND QUERY EXECUTION
+class QueryJob:
+    """A single query submitted to the QueryRunner"""
+    def __init__(self, name, func, on_done, on_error, timeout, on_chunk=None, read_only=True):
+        self.name = name
+        self.func = func
+        self.read_only = read_only  # False sends the job to the primary, never a replica
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_chunk = on_chunk
+        self.chunks = queue.Queue()  # streamed rows waiting for the Tk main loop
+        self.timeout = timeout
+        self.future = None
+        self.started_at = None      # set by the worker once the query really starts
+        self.connection_id = None   # MySQL connection id, used to kill the statement
+        self.engine = None          # primary or replica the statement runs on
+        self.cancelled = False
+        self.timed_out = False
+
+    def elapsed(self):
+        if self.started_at is None:
+            return 0.0
+        return time.monotonic() - self.started_at
+
+
+class QueryRunner:
+    """Runs DatabaseQueries calls on worker threads so the Tk window never blocks.
+
+    Every job gets its own short-lived session from the DatabaseManager
+    (sessions are not thread safe, the pool is).
+    Results are handed back to the Tk main loop with root.after(), so callbacks
+    can safely touch widgets.
+    """
+    def __init__(self, root, database, max_workers=QUERY_WORKERS,
+                 timeout=QUERY_TIMEOUT_SECONDS, on_status=None, cache=None, instrumentation=None):
+        self.root = root
+        self.database = database
+        self.cache = cache
+        self.instrumentation = instrumentation
+        self.timeout = timeout
+        self.on_status = on_status
+        self.executor = ThreadPoolExecutor(max_workers=max_workers,
+                                           thread_name_prefix='query-worker')
+        self.jobs = []
+        self.polling = False
+
+    def is_running(self, name):
+        return any(job.name == name for job in self.jobs)
+
+    def submit(self, name, func, on_done, on_error=None, timeout=None, on_chunk=None,
+               read_only=True):
+        """Run func(queries) in the background - returns None if name is already running
+
+        With on_chunk, func must return an iterable (e.g. a stream_query_* generator);
+        rows are passed to on_chunk in pages while the query is still running and
+        on_done receives the total row count. Jobs that write must pass
+        read_only=False so they run on the primary.
+        """
+        # people double-click Execute during busy periods - don't pile up calls
+        if self.is_running(name):
+            self._report_status(f"{name} is already running...")
+            return None
+
+        job = QueryJob(name, func, on_done, on_error, timeout or self.timeout, on_chunk, read_only)
+        job.future = self.executor.submit(self._run_job, job)
+        self.jobs.append(job)
+        self._report_status()
+        if not self.polling:
+            self.polling = True
+            self.root.after(QUERY_POLL_MS, self._poll)
+        return job
+
+    def cancel(self, job=None):
+        """Cancel one job, or every in-flight job when job is None"""
+        for running_job in list(self.jobs):
+            if job is None or running_job is job:
+                self._cancel_job(running_job)
+        self._report_status()
+
+    def shutdown(self):
+        """Kill anything still running and stop the worker threads"""
+        self.cancel()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run_job(self, job):
+        """Worker thread body - never touches Tk widgets"""
+        with self.database.session_scope(read_only=job.read_only) as session, \
+                self.database.analytics_scope() as analytics:
+            limited = False
+            try:
+                job.started_at = time.monotonic()
+                connection = session.connection()
+                job.engine = connection.engine
+                if connection.dialect.name == 'mysql':
+                    job.connection_id = connection.execute(text("SELECT CONNECTION_ID()")).scalar()
+                    # server-side limit as well, so the statement dies even if the GUI is gone
+                    connection.execute(text(f"SET SESSION MAX_EXECUTION_TIME = {int(job.timeout * 1000)}"))
+                    limited = True
+                if job.cancelled:
+                    return None
+                queries = DatabaseQueries(session, analytics, self.database.get_schema_version())
+                if self.cache is not None:
+                    queries = CachedDatabaseQueries(queries, self.cache)
+                if self.instrumentation is not None:
+                    queries = InstrumentedDatabaseQueries(queries, self.instrumentation)
+                results = job.func(queries)
+                if job.on_chunk is not None:
+                    results = self._stream_job(job, results)
+                return results
+            finally:
+                # the connection goes back to the pool - it must not be killed any more
+                job.connection_id = None
+                if limited:
+                    self._reset_execution_time(connection)
+
+    @staticmethod
+    def _reset_execution_time(connection):
+        """Drop the job's MAX_EXECUTION_TIME before the pooled connection is reused"""
+        try:
+            connection.execute(text("SET SESSION MAX_EXECUTION_TIME = DEFAULT"))
+        except Exception as e:
+            # e.g. the transaction failed - don't hand the limit to the next user of the connection
+            print(f"Could not reset MAX_EXECUTION_TIME, discarding the connection: {e}")
+            connection.invalidate()
+
+    def _stream_job(self, job, results):
+        """Hand streamed rows to the main loop one page at a time"""
+        count = 0
+        chunk = []
+        for row in results:
+            if job.cancelled:
+                break
+            chunk.append(row)
+            if len(chunk) >= RESULTS_PAGE_SIZE:
+                job.chunks.put(chunk)
+                count += len(chunk)
+                chunk = []
+        if chunk:
+            job.chunks.put(chunk)
+            count += len(chunk)
+        return count
+
+    def _deliver_chunks(self, job):
+        while not job.cancelled:
+            try:
+                chunk = job.chunks.get_nowait()
+            except queue.Empty:
+                return
+            job.on_chunk(chunk)
+
+    def _cancel_job(self, job):
+        if job.cancelled:
+            return
+        job.cancelled = True
+        if job.future.cancel():
+            # never started, nothing to kill
+            return
+        self._kill_statement(job.connection_id, job.engine)
+
+    def _kill_statement(self, connection_id, engine):
+        """Kill the server-side statement running on connection_id (MySQL only)"""
+        if connection_id is None:
+            return
+        try:
+            # connection ids are per server - kill on the replica the job was routed to
+            with engine.connect() as connection:
+                connection.execute(text(f"KILL QUERY {int(connection_id)}"))
+        except Exception as e:
+            print(f"Error cancelling query: {e}")
+
+    def _poll(self):
+        """Check running jobs from the Tk main loop"""
+        for job in list(self.jobs):
+            if job.on_chunk is not None:
+                self._deliver_chunks(job)
+            if not job.cancelled and job.elapsed() > job.timeout:
+                job.timed_out = True
+                self._cancel_job(job)
+            # cancelled jobs are released straight away - their result is thrown away
+            if job.cancelled or job.future.done():
+                self.jobs.remove(job)
+                self._finish_job(job)
+
+        self._report_status()
+        if self.jobs:
+            self.root.after(QUERY_POLL_MS, self._poll)
+        else:
+            self.polling = False
+
+    def _finish_job(self, job):
+        if job.timed_out:
+            self._report_error(job, TimeoutError(
+                f"{job.name} exceeded the {job.timeout:g}s time limit and was stopped"))
+            return
+        if job.cancelled:
+            return
+        error = job.future.exception()
+        if error is not None:
+            self._report_error(job, error)
+            return
+        if job.on_chunk is not None:
+            self._deliver_chunks(job)
+        job.on_done(job.future.result())
+
+    def _report_error(self, job, error):
+        print(f"{job.name} error: {error}")
+        if job.on_error:
+            job.on_error(error)
+
+    def _report_status(self, message=None):
+        if not self.on_status:
+            return
+        if message is None:
+            if self.jobs:
+                message = "Running: " + ", ".join(
+                    f"{job.name} ({job.elapsed():.1f}s)" for job in self.jobs)
+            else:
+                message = "Ready"
+            if self.cache is not None:
+                stats = self.cache.stats()
+                message += f"  |  cache: {stats['hits']} hits, {stats['misses']} misses"
+            pool = self.database.pool_stats()
+            if 'checkedout' in pool:
+                message += f"  |  pool: {pool['checkedout']} in use, {pool['avg_wait_ms']:.1f} ms avg wait"
+        self.on_status(message, bool(self.jobs))
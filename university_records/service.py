@@ -0,0 +1,222 @@
+"""HTTP/JSON query service - python code.py serve"""
+
+from concurrent.futures import ThreadPoolExecutor
+import http
+import inspect
+import json
+import urllib.parse
+
+from .config import (
+    QUERY_WORKERS, SERVICE_HOST, SERVICE_MAX_PAGE_SIZE, SERVICE_MAX_PENDING, SERVICE_PAGE_SIZE,
+    SERVICE_PORT
+)
+from .results import ResultSet
+from .queries import DatabaseQueries
+from .cache import CachedDatabaseQueries, QueryCache, _normalize_cache_value
+from .export import _json_default
+
+
+# QUERY SERVICE
+# the queries the HTTP service exposes
+SERVICE_QUERIES = [
+    'query_1_students_in_course_by_lecturer',
+    'query_2_high_performing_final_year_students',
+    'query_3_students_not_enrolled',
+    'query_6_courses_by_department',
+    'query_7_top_research_supervisors',
+    'query_10_staff_by_department',
+]
+
+# numeric request parameters - every other parameter is passed on as the string it arrived as
+SERVICE_PARAMETER_TYPES = {
+    'page': int,
+    'page_size': int,
+    'limit': int,
+    'year': int,
+    'threshold': float,
+}
+
+
+class QueryService:
+    """HTTP/JSON front end for DatabaseQueries on asyncio - standard library only
+
+    GET /queries lists the queries and their parameters, GET /queries/<name>?...
+    runs one and returns a page of its rows (page, page_size), GET /health
+    shows the pool, cache and request counters.
+
+    Queries run on a fixed set of worker threads, each on its own short-lived
+    session, so however many clients are connected at most `workers` database
+    connections are in use. Identical requests that arrive while one is
+    running wait for its result instead of running again (single-flight), and
+    results go through a QueryCache so the following pages come from memory.
+    Once max_pending distinct queries are waiting, new ones are answered with
+    503 and Retry-After rather than queueing without bound.
+    """
+    def __init__(self, database, workers=QUERY_WORKERS, max_pending=SERVICE_MAX_PENDING, cache=None):
+        import asyncio  # only needed by the service - keeps it off the GUI's startup path
+        self.asyncio = asyncio
+        self.database = database
+        self.workers = workers
+        self.max_pending = max_pending
+        self.cache = cache if cache is not None else QueryCache()
+        self.cache.watch(database.engine)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='service-worker')
+        self.signatures = {name: inspect.signature(getattr(DatabaseQueries, name))
+                           for name in SERVICE_QUERIES}
+        # only touched from the event loop thread
+        self.in_flight = {}     # (query, parameters) -> future shared by identical requests
+        self.requests = 0
+        self.coalesced = 0
+        self.rejected = 0
+
+    def run(self, host=SERVICE_HOST, port=SERVICE_PORT):
+        """Serve until interrupted"""
+        try:
+            self.asyncio.run(self.serve(host, port))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+    async def serve(self, host=SERVICE_HOST, port=SERVICE_PORT):
+        server = await self.asyncio.start_server(self._handle_connection, host, port)
+        print(f"Query service on http://{host}:{port}/queries ({self.workers} workers)")
+        async with server:
+            await server.serve_forever()
+
+    async def _handle_connection(self, reader, writer):
+        """One client connection - HTTP/1.1 keep-alive, one request at a time"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                if headers.get('content-length'):
+                    await reader.readexactly(int(headers['content-length']))
+
+                request_line = request_line.decode('latin-1')
+                status, body, extra_headers = await self.respond(request_line)
+                keep_alive = (request_line.rstrip().endswith('HTTP/1.1')
+                              and headers.get('connection', '').lower() != 'close')
+                self._write(writer, status, body, extra_headers, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, self.asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _write(writer, status, body, extra_headers, keep_alive):
+        payload = json.dumps(body, default=_json_default).encode('utf-8')
+        lines = [f"HTTP/1.1 {status} {http.HTTPStatus(status).phrase}",
+                 "Content-Type: application/json; charset=utf-8",
+                 f"Content-Length: {len(payload)}",
+                 f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        lines += [f"{name}: {value}" for name, value in extra_headers.items()]
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + payload)
+
+    async def respond(self, request_line):
+        """(status, JSON body, extra headers) for one request line"""
+        try:
+            method, target, _ = request_line.split()
+        except ValueError:
+            return 400, {'error': "Malformed request line"}, {}
+        if method != 'GET':
+            return 405, {'error': "Only GET is supported"}, {'Allow': 'GET'}
+
+        url = urllib.parse.urlsplit(target)
+        path = url.path.rstrip('/')
+        if path == '/health':
+            return 200, self.health(), {}
+        if path == '/queries':
+            return 200, {'queries': {name: [parameter for parameter in signature.parameters
+                                             if parameter != 'self']
+                                      for name, signature in self.signatures.items()}}, {}
+        if path.startswith('/queries/'):
+            return await self.run_query(path[len('/queries/'):],
+                                        urllib.parse.parse_qsl(url.query, keep_blank_values=True))
+        return 404, {'error': f"Not found: {url.path}"}, {}
+
+    async def run_query(self, name, pairs):
+        """Run (or join) one query and return the requested page of rows"""
+        self.requests += 1
+        if name not in self.signatures:
+            return 404, {'error': f"Unknown query {name!r}", 'queries': SERVICE_QUERIES}, {}
+        # course codes and names stay strings even when they look like numbers
+        params = {}
+        for parameter, value in pairs:
+            kind = SERVICE_PARAMETER_TYPES.get(parameter, str)
+            try:
+                params[parameter] = kind(value)
+            except ValueError:
+                expected = 'a whole number' if kind is int else 'a number'
+                return 400, {'error': f"{parameter} must be {expected}, got {value!r}"}, {}
+        page = params.pop('page', 1)
+        page_size = params.pop('page_size', SERVICE_PAGE_SIZE)
+        if page < 1 or not 1 <= page_size <= SERVICE_MAX_PAGE_SIZE:
+            return 400, {'error': f"page must be 1 or more and page_size 1 to "
+                                  f"{SERVICE_MAX_PAGE_SIZE}"}, {}
+        try:
+            self.signatures[name].bind(None, **params)
+        except TypeError as e:
+            return 400, {'error': str(e)}, {}
+
+        # pages of the same query share one execution
+        key = (name, json.dumps({parameter: _normalize_cache_value(parameter, value)
+                                 for parameter, value in params.items()},
+                                sort_keys=True, default=str))
+        future = self.in_flight.get(key)
+        if future is None:
+            if len(self.in_flight) >= self.max_pending:
+                self.rejected += 1
+                return 503, {'error': "Too many queries in progress, try again shortly"}, \
+                    {'Retry-After': '1'}
+            future = self.asyncio.get_running_loop().run_in_executor(self.executor, self._execute,
+                                                                name, params)
+            self.in_flight[key] = future
+            future.add_done_callback(lambda _: self.in_flight.pop(key, None))
+        else:
+            self.coalesced += 1
+
+        try:
+            # shielded - a client that disconnects must not cancel the others' result
+            rows = await self.asyncio.shield(future)
+        except ValueError as e:
+            # parameters the query itself rejects, e.g. an unknown query 7 metric
+            return 400, {'error': str(e)}, {}
+        except Exception as e:
+            return 500, {'error': str(e)}, {}
+        start = (page - 1) * page_size
+        return 200, {'query': name, 'params': params, 'page': page, 'page_size': page_size,
+                     'total_rows': len(rows), 'pages': -(-len(rows) // page_size),
+                     'rows': rows[start:start + page_size].dicts()}, {}
+
+    def _execute(self, name, params):
+        """Worker thread: run the query - only the page a request asks for becomes dicts
+
+        Runs the stream_ version, which raises database errors (the list
+        version returns an empty result, or query 2's sample rows).
+        """
+        with self.database.queries() as queries:
+            stream = getattr(CachedDatabaseQueries(queries, self.cache), f"stream_{name}")
+            return ResultSet.of(stream(**params))
+
+    def health(self):
+        return {
+            'workers': self.workers,
+            'pending_queries': len(self.in_flight),
+            'requests': self.requests,
+            'coalesced': self.coalesced,
+            'rejected': self.rejected,
+            'pool': self.database.pool_stats(),
+            'cache': self.cache.stats(),
+        }
@@ -0,0 +1,297 @@
+"""Synthetic data at a chosen scale - python code.py generate --students N"""
+
+import time
+from sqlalchemy import func, insert
+from datetime import date
+import random
+
+from .models import (
+    CURRENT_SEMESTER, Course, CourseEnrollment, CourseInstructor, Department,
+    LETTER_GRADE_PERCENT, Lecturer, NonAcademicStaff, Program, Publication, ResearchProject,
+    ResearchTeamMember, Student, StudentGrade, ensure_terms, normalize_name, parse_term,
+    term_details
+)
+
+
+# SYNTHETIC DATA GENERATION
+PAST_SEMESTERS = ['Fall 2022', 'Spring 2023', 'Fall 2023', 'Spring 2024', 'Fall 2024', 'Spring 2025']
+FACULTIES = ['Faculty of Science and Technology', 'Faculty of Arts and Humanities',
+             'Faculty of Business', 'Faculty of Social Sciences', 'Faculty of Health']
+LECTURER_TITLES = ['Dr.', 'Prof.', 'Dr.', 'Dr.', 'Assoc. Prof.']
+DEPARTMENT_SUBJECTS = [
+    'Computer Science', 'Mathematics', 'Physics', 'Chemistry', 'Biology', 'English Literature',
+    'History', 'Business Administration', 'Psychology', 'Economics', 'Philosophy', 'Sociology',
+    'Mechanical Engineering', 'Electrical Engineering', 'Civil Engineering', 'Nursing',
+    'Medicine', 'Law', 'Music', 'Fine Art', 'Geography', 'Politics', 'Linguistics',
+    'Education', 'Architecture', 'Statistics', 'Environmental Science', 'Media Studies',
+]
+
+
+class SyntheticDataGenerator:
+    """Builds consistent fake data for every ORM model at a chosen scale
+
+    Everything is sized from the number of students (1k to millions). Rows are
+    produced lazily and written with batched executemany inserts in foreign key
+    order, so memory stays flat however large the scale. A seeded random
+    generator makes runs repeatable; Zipf-like weights give realistic skew
+    (a few very popular courses, a few very busy supervisors).
+    """
+    def __init__(self, students=1000, seed=42, batch_size=5000):
+        self.students = students
+        self.seed = seed
+        self.batch_size = batch_size
+        self.random = random.Random(seed)
+
+        # sizes derived from the student count
+        self.departments = max(8, min(60, students // 2000))
+        self.programs = self.departments * 2
+        self.courses = max(30, students // 40)
+        self.lecturers = max(20, students // 25)
+        self.staff = max(10, students // 50)
+        self.projects = max(10, self.lecturers // 2)
+        self.publications = self.projects * 3
+        self.counts = {}
+
+    @staticmethod
+    def _skewed_weights(n, exponent=1.1):
+        """Cumulative Zipf weights - item i is picked about 1/(i+1)^exponent as often"""
+        total = 0.0
+        weights = []
+        for rank in range(1, n + 1):
+            total += 1.0 / rank ** exponent
+            weights.append(total)
+        return weights
+
+    def _pick(self, items, cum_weights):
+        return self.random.choices(items, cum_weights=cum_weights)[0]
+
+    def _names(self, fake, count):
+        """Pool of fake first and last names - combining them is much faster than fake.name()"""
+        return ([fake.first_name() for _ in range(count)],
+                [fake.last_name() for _ in range(count)])
+
+    def generate(self, session):
+        """Insert every table and print rows/sec for each"""
+        from faker import Faker  # only needed when generating data
+
+        fake = Faker()
+        fake.seed_instance(self.seed)
+        first_names, last_names = self._names(fake, 500)
+        full_name = lambda: f"{self.random.choice(first_names)} {self.random.choice(last_names)}"
+
+        started = time.perf_counter()
+        ids = {model: (session.query(func.max(key)).scalar() or 0) for model, key in (
+            (Department, Department.Department_ID), (Program, Program.Program_ID),
+            (Course, Course.Course_ID), (Lecturer, Lecturer.Lecturer_ID),
+            (NonAcademicStaff, NonAcademicStaff.Staff_ID), (Student, Student.Student_id),
+            (ResearchProject, ResearchProject.Project_ID),
+            (Publication, Publication.Publication_ID),
+            (CourseInstructor, CourseInstructor.Course_Instructor_ID))}
+
+        # departments and programs
+        department_ids = list(range(ids[Department] + 1, ids[Department] + self.departments + 1))
+        department_names = {}
+        def departments():
+            for i, department_id in enumerate(department_ids):
+                subject = DEPARTMENT_SUBJECTS[i % len(DEPARTMENT_SUBJECTS)]
+                # past the end of the list, subjects repeat with a number
+                name = subject if i < len(DEPARTMENT_SUBJECTS) \
+                    else f"{subject} {i // len(DEPARTMENT_SUBJECTS) + 1}"
+                department_names[department_id] = name
+                yield {'Department_ID': department_id, 'Name': name,
+                       'Name_Search': normalize_name(name),
+                       'Faculty': self.random.choice(FACULTIES),
+                       'Research_Areas': ', '.join(fake.words(4)).title()}
+        self._insert(session, Department, departments())
+        department_weights = self._skewed_weights(len(department_ids), 0.8)
+
+        program_ids = list(range(ids[Program] + 1, ids[Program] + self.programs + 1))
+        def programs():
+            for program_id in program_ids:
+                department = department_names[self.random.choice(department_ids)]
+                degree = self.random.choice(['BSc', 'BA', 'MSc', 'MA', 'PhD'])
+                yield {'Program_ID': program_id, 'Name': f"{degree} {department} {program_id}",
+                       'Degree_awarded': degree,
+                       'Program_Duration': '3 years' if degree in ('BSc', 'BA') else '1-4 years'}
+        self._insert(session, Program, programs())
+        program_weights = self._skewed_weights(len(program_ids), 0.7)
+
+        # courses, lecturers and who teaches what
+        course_ids = list(range(ids[Course] + 1, ids[Course] + self.courses + 1))
+        course_codes = {}
+        course_departments = {}
+        def courses():
+            for course_id in course_ids:
+                department_id = self._pick(department_ids, department_weights)
+                prefix = ''.join(ch for ch in department_names[department_id].upper()
+                                 if ch.isalpha())[:4]
+                code = f"{prefix}{course_id:04d}"
+                course_codes[course_id] = code
+                course_departments[course_id] = department_id
+                yield {'Course_ID': course_id, 'Course_Code': code,
+                       'Name': fake.catch_phrase()[:150], 'Department_ID': department_id,
+                       'Level': self.random.choice(['100', '200', '300', '400', '500']),
+                       'Credits': self.random.choice([10, 15, 20, 30]),
+                       'Schedule': f"{self.random.choice(['Mon', 'Tue', 'Wed', 'Thu', 'Fri'])} "
+                                   f"{self.random.randint(9, 17)}:00"}
+        self._insert(session, Course, courses())
+        course_weights = self._skewed_weights(len(course_ids))
+
+        lecturer_ids = list(range(ids[Lecturer] + 1, ids[Lecturer] + self.lecturers + 1))
+        lecturers_by_department = {}
+        def lecturers():
+            for lecturer_id in lecturer_ids:
+                department_id = self._pick(department_ids, department_weights)
+                lecturers_by_department.setdefault(department_id, []).append(lecturer_id)
+                name = f"{self.random.choice(LECTURER_TITLES)} {full_name()}"
+                yield {'Lecturer_ID': lecturer_id, 'Name': name, 'Name_Search': normalize_name(name),
+                       'Department_ID': department_id,
+                       'Academic_Qualifications': self.random.choice(['PhD', 'PhD, MSc', 'DPhil']),
+                       'Expertise': ', '.join(fake.words(3)).title()}
+        self._insert(session, Lecturer, lecturers())
+
+        def instructors():
+            instructor_id = ids[CourseInstructor]
+            for course_id in course_ids:
+                pool = lecturers_by_department.get(course_departments[course_id]) or lecturer_ids
+                for lecturer_id in set(self.random.choices(pool, k=self.random.randint(1, 2))):
+                    instructor_id += 1
+                    yield {'Course_Instructor_ID': instructor_id, 'Course_ID': course_id,
+                           'Lecturer_ID': lecturer_id}
+        self._insert(session, CourseInstructor, instructors())
+
+        def staff():
+            for staff_id in range(ids[NonAcademicStaff] + 1, ids[NonAcademicStaff] + self.staff + 1):
+                yield {'Staff_ID': staff_id, 'Name': full_name(), 'Job_Title': fake.job()[:100],
+                       'Department_ID': self._pick(department_ids, department_weights),
+                       'Employment_type': self.random.choice(['Full-time', 'Full-time', 'Part-time',
+                                                              'Contract']),
+                       'Contact_details': fake.email(),
+                       'Salary': round(self.random.uniform(22000, 85000), 2)}
+        self._insert(session, NonAcademicStaff, staff())
+
+        # research projects - a few lecturers supervise most of them
+        lecturer_weights = self._skewed_weights(len(lecturer_ids), 1.2)
+        project_ids = list(range(ids[ResearchProject] + 1, ids[ResearchProject] + self.projects + 1))
+        investigators = {}
+        def projects():
+            for project_id in project_ids:
+                investigators[project_id] = self._pick(lecturer_ids, lecturer_weights)
+                yield {'Project_ID': project_id, 'Title': fake.catch_phrase()[:255],
+                       'Principal_Investigator': investigators[project_id],
+                       'Funding_sources': f"{fake.company()} (${self.random.randint(5, 900) * 1000:,})"}
+        self._insert(session, ResearchProject, projects())
+
+        # project teams and publications, skewed towards the same busy lecturers
+        def team_members():
+            for project_id in project_ids:
+                team = {self._pick(lecturer_ids, lecturer_weights)
+                        for _ in range(self.random.randint(1, 4))}
+                team.discard(investigators[project_id])
+                for lecturer_id in sorted(team):
+                    yield {'Project_ID': project_id, 'Lecturer_ID': lecturer_id}
+        self._insert(session, ResearchTeamMember, team_members())
+
+        def publications():
+            for publication_id in range(ids[Publication] + 1, ids[Publication] + self.publications + 1):
+                # about a third are not tied to a project
+                project_id = self.random.choice(project_ids) if self.random.random() < 0.7 else None
+                yield {'Publication_ID': publication_id, 'Title': fake.catch_phrase()[:255],
+                       'Publication_year': self.random.randint(2015, 2025),
+                       'Publication_type': self.random.choice(['Journal Article', 'Journal Article',
+                                                               'Conference Paper', 'Book Chapter']),
+                       'Lecturer_ID': self._pick(lecturer_ids, lecturer_weights),
+                       'Project_ID': project_id}
+        self._insert(session, Publication, publications())
+
+        # students with their enrollments and grades, written together batch by batch
+        self._insert_students(session, ids[Student], program_ids, program_weights, lecturer_ids,
+                              course_ids, course_codes, course_weights, full_name)
+
+        elapsed = time.perf_counter() - started
+        total = sum(self.counts.values())
+        print(f"Generated {total:,} rows in {elapsed:.1f}s ({total / elapsed:,.0f} rows/sec)")
+        return dict(self.counts)
+
+    def _insert_students(self, session, last_student_id, program_ids, program_weights,
+                         lecturer_ids, course_ids, course_codes, course_weights, full_name):
+        letters = list(LETTER_GRADE_PERCENT)
+        letter_weights = self._skewed_weights(len(letters), 0.3)
+        current_term = term_details(parse_term(CURRENT_SEMESTER))
+        past_terms = [term_details(parse_term(semester)) for semester in PAST_SEMESTERS]
+        ensure_terms(session, [term['Term_ID'] for term in past_terms + [current_term]])
+        started = time.perf_counter()
+        students, enrollments, grades = [], [], []
+        for student_id in range(last_student_id + 1, last_student_id + self.students + 1):
+            year = self.random.choices([1, 2, 3, 4, 5], weights=[28, 26, 24, 20, 2])[0]
+            taken = {self._pick(course_ids, course_weights) for _ in range(self.random.randint(3, 7))}
+
+            # most students are enrolled this semester, the rest show up in query 3
+            current = self.random.random() < 0.85
+            graded = []
+            for i, course_id in enumerate(sorted(taken)):
+                if current and i < 3:
+                    enrollments.append({'Student_id': student_id, 'Course_id': course_id,
+                                        'Term_ID': current_term['Term_ID'],
+                                        'Semester': CURRENT_SEMESTER,
+                                        'Academic_year': current_term['Academic_year'],
+                                        'Status': 'Enrolled'})
+                    continue
+                letter = self._pick(letters, letter_weights)
+                term = past_terms[self.random.randrange(len(past_terms))]
+                enrollments.append({'Student_id': student_id, 'Course_id': course_id,
+                                    'Term_ID': term['Term_ID'], 'Semester': term['Name'],
+                                    'Academic_year': term['Academic_year'],
+                                    'Status': 'Completed'})
+                grades.append({'Student_id': student_id, 'Course_id': course_id,
+                               'Term_ID': term['Term_ID'],
+                               'Grade': LETTER_GRADE_PERCENT[letter], 'Letter_grade': letter})
+                graded.append(f"{course_codes[course_id]}: {letter}")
+
+            name = full_name()
+            students.append({
+                'Student_id': student_id, 'Name': name,
+                'Date_of_birth': date(2007 - year - self.random.randint(0, 3),
+                                      self.random.randint(1, 12), self.random.randint(1, 28)),
+                'Contact_info': f"{name.lower().replace(' ', '.')}{student_id}@student.edu",
+                'Program_id': self._pick(program_ids, program_weights),
+                'Year_of_study': year, 'Current_Grades': ', '.join(graded) or None,
+                'Graduation_status': 'Active',
+                'Advisor_id': self.random.choice(lecturer_ids)})
+
+            if len(students) >= self.batch_size:
+                self._flush_students(session, students, enrollments, grades)
+                students, enrollments, grades = [], [], []
+        if students:
+            self._flush_students(session, students, enrollments, grades)
+
+        elapsed = time.perf_counter() - started
+        rows = sum(self.counts.get(t, 0) for t in ('Students', 'Course_Enrollments', 'Student_Grades'))
+        print(f"  Students + enrollments + grades: {rows:,} rows, {rows / elapsed:,.0f} rows/sec")
+
+    def _flush_students(self, session, students, enrollments, grades):
+        for model, rows in ((Student, students), (CourseEnrollment, enrollments), (StudentGrade, grades)):
+            if rows:
+                session.execute(insert(model), rows)
+                self.counts[model.__tablename__] = self.counts.get(model.__tablename__, 0) + len(rows)
+        session.commit()
+
+    def _insert(self, session, model, rows):
+        """executemany in batch_size chunks"""
+        started = time.perf_counter()
+        count = 0
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                session.execute(insert(model), batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            session.execute(insert(model), batch)
+            count += len(batch)
+        session.commit()
+
+        elapsed = time.perf_counter() - started
+        self.counts[model.__tablename__] = count
+        print(f"  {model.__tablename__}: {count:,} rows, {count / elapsed if elapsed else 0:,.0f} rows/sec")